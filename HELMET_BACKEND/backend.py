@@ -1,21 +1,33 @@
-from fastapi import FastAPI, HTTPException, WebSocket
+from fastapi import FastAPI, HTTPException, WebSocket, Depends, Query
 import asyncio
+import base64
 import json
-import mysql.connector
-import os
+import aiomysql
+from aiomysql import Error
+from contextlib import asynccontextmanager
+from datetime import datetime
 from dotenv import load_dotenv
-from mysql.connector import Error
-from typing import Optional
+from typing import Optional, List
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 
-from HELMET_MCP.mcp.db_client import connect_db_mcp
+from HELMET_MCP.mcp.db_client import connect_db_mcp, close_db_mcp
 from run_supervisor import run_supervisor_agent
+from src.config.async_db import create_pool, get_pool, close_pool, get_db_connection
 
 load_dotenv()
 
 
-app = FastAPI(title="Simple Tasks API", version="1.0.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Pool de connexions créé une seule fois, hors du chemin des requêtes
+    await create_pool()
+    yield
+    await close_db_mcp()
+    await close_pool()
+
+
+app = FastAPI(title="Simple Tasks API", version="1.0.0", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -25,32 +37,40 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-DB_CONFIG = {
-    "host": os.getenv("TIDB_HOST"),
-    "port": os.getenv("TIDB_PORT"),
-    "database": os.getenv("TIDB_DATABASE"),
-    "user": os.getenv("TIDB_USER"),
-    "password": os.getenv("TIDB_PASSWORD"),
-}
-
-connected_clients = set()
+# Client WebSocket -> numéro de séquence du dernier message envoyé
+# Le client compare chaque "seq" au précédent : un trou => resynchronisation complète
+connected_clients: dict = {}
 
 
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
     await websocket.accept()
-    connected_clients.add(websocket)
+    connected_clients[websocket] = 0
+    await websocket.send_text(json.dumps({"type": "hello", "seq": 0}))
     try:
         while True:
             await websocket.receive_text()
     except:
-        connected_clients.remove(websocket)
+        connected_clients.pop(websocket, None)
+
+
+async def _send_to_client(client: WebSocket, message: dict):
+    if client not in connected_clients:
+        return  # Déconnecté pendant la diffusion
+    connected_clients[client] += 1
+    try:
+        await client.send_text(
+            json.dumps({**message, "seq": connected_clients[client]}, default=str)
+        )
+    except Exception:
+        # Socket mort sans que receive_text ait échoué : le client n'est plus suivi
+        connected_clients.pop(client, None)
 
 
 async def notify_clients(message):
     if connected_clients:
         await asyncio.gather(
-            *[client.send_text(json.dumps(message)) for client in connected_clients],
+            *[_send_to_client(client, message) for client in list(connected_clients)],
             return_exceptions=True,
         )
 
@@ -76,22 +96,126 @@ class MessageResponse(BaseModel):
     type: str
 
 
+class ChangeEvent(BaseModel):
+    entity: str
+    id: int
+    op: str  # 'create', 'update' ou 'delete'
+    changed_fields: List[str] = []
+    version: Optional[int] = None
+    data: Optional[dict] = None
+
+
 class DataCreate(BaseModel):
     ding: str
+    event: Optional[ChangeEvent] = None
+
+
+class DataBatch(BaseModel):
+    events: List[DataCreate]
 
 
 class PromptSupervisor(BaseModel):
     message: str
 
 
-def get_db_connection():
-    """Crée une connexion à la base de données"""
+DEFAULT_PAGE_SIZE = 500
+MAX_PAGE_SIZE = 1000
+
+# Colonnes de chaque table (lues une fois) pour valider le paramètre fields=
+_table_columns: dict = {}
+
+
+async def get_table_columns(connection, table: str) -> List[str]:
+    if table not in _table_columns:
+        async with connection.cursor() as cursor:
+            await cursor.execute(f"SHOW COLUMNS FROM {table}")
+            _table_columns[table] = [row[0] for row in await cursor.fetchall()]
+    return _table_columns[table]
+
+
+def encode_page_cursor(values: list) -> str:
+    """Curseur opaque contenant les valeurs de la clé de tri de la dernière ligne"""
+    raw = json.dumps(
+        [v.isoformat(sep=" ") if isinstance(v, datetime) else v for v in values]
+    )
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_page_cursor(cursor: str, size: int) -> list:
     try:
-        connection = mysql.connector.connect(**DB_CONFIG)
-        return connection
-    except Error as e:
-        print(f"Erreur de connexion MySQL: {e}")
-        return None
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+    except Exception:
+        raise HTTPException(status_code=400, detail="Curseur de pagination invalide")
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(status_code=400, detail="Curseur de pagination invalide")
+    return values
+
+
+async def fetch_page(
+    connection,
+    table: str,
+    key_columns: List[str],
+    fields: Optional[str],
+    cursor: Optional[str],
+    limit: int,
+    updated_since: Optional[datetime] = None,
+) -> dict:
+    """
+    Pagination par clé (keyset) triée sur key_columns, avec projection de colonnes.
+    Retourne les lignes et le curseur de la page suivante (None sur la dernière page).
+    """
+    columns = await get_table_columns(connection, table)
+
+    if fields:
+        requested = [f.strip() for f in fields.split(",") if f.strip()]
+        unknown = [f for f in requested if f not in columns]
+        if unknown:
+            raise HTTPException(
+                status_code=400, detail=f"Colonnes inconnues pour {table}: {unknown}"
+            )
+        # Les colonnes de la clé de tri sont toujours renvoyées (curseur)
+        selected = list(dict.fromkeys(key_columns + requested))
+    else:
+        selected = columns
+
+    conditions = []
+    params = []
+
+    if updated_since is not None:
+        conditions.append("updated_at >= %s")
+        params.append(updated_since)
+
+    if cursor:
+        values = decode_page_cursor(cursor, len(key_columns))
+        if len(key_columns) == 1:
+            conditions.append(f"{key_columns[0]} > %s")
+            params.append(values[0])
+        else:
+            first, second = key_columns
+            conditions.append(f"({first} > %s OR ({first} = %s AND {second} > %s))")
+            params.extend([values[0], values[0], values[1]])
+
+    where_clause = " AND ".join(conditions) if conditions else "1=1"
+    query = f"""
+    SELECT {", ".join(selected)}
+    FROM {table}
+    WHERE {where_clause}
+    ORDER BY {", ".join(key_columns)}
+    LIMIT %s
+    """
+    # Une ligne de plus pour savoir s'il existe une page suivante
+    params.append(limit + 1)
+
+    async with connection.cursor(aiomysql.DictCursor) as db_cursor:
+        await db_cursor.execute(query, params)
+        rows = await db_cursor.fetchall()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_page_cursor([rows[-1][k] for k in key_columns])
+
+    return {"rows": rows, "next_cursor": next_cursor}
 
 
 @app.get("/")
@@ -100,21 +224,26 @@ def root():
 
 
 @app.get("/all_users")
-def get_all_users_ids():
-    connection = get_db_connection()
-    if not connection:
-        raise HTTPException(
-            status_code=500, detail="Erreur de connexion à la base de données"
-        )
-
+async def get_all_users_ids(
+    fields: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    updated_since: Optional[datetime] = None,
+    connection=Depends(get_db_connection),
+):
     try:
-        cursor = connection.cursor(dictionary=True)
-        cursor.execute("SELECT * FROM Users")
-        users = cursor.fetchall()
-        cursor.close()
-        connection.close()
+        page = await fetch_page(
+            connection,
+            "Users",
+            ["updated_at", "id"],
+            fields,
+            cursor,
+            limit,
+            updated_since,
+        )
+        users = page["rows"]
 
-        return {"users": users, "count": len(users)}
+        return {"users": users, "count": len(users), "next_cursor": page["next_cursor"]}
     except Error as e:
         raise HTTPException(
             status_code=500,
@@ -123,21 +252,26 @@ def get_all_users_ids():
 
 
 @app.get("/tasks")
-def get_all_tasks():
-    connection = get_db_connection()
-    if not connection:
-        raise HTTPException(
-            status_code=500, detail="Erreur de connexion à la base de données"
-        )
-
+async def get_all_tasks(
+    fields: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    updated_since: Optional[datetime] = None,
+    connection=Depends(get_db_connection),
+):
     try:
-        cursor = connection.cursor(dictionary=True)
-        cursor.execute("SELECT * FROM Tasks")
-        tasks = cursor.fetchall()
-        cursor.close()
-        connection.close()
+        page = await fetch_page(
+            connection,
+            "Tasks",
+            ["updated_at", "id"],
+            fields,
+            cursor,
+            limit,
+            updated_since,
+        )
+        tasks = page["rows"]
 
-        return {"tasks": tasks, "count": len(tasks)}
+        return {"tasks": tasks, "count": len(tasks), "next_cursor": page["next_cursor"]}
 
     except Error as e:
         raise HTTPException(
@@ -147,19 +281,11 @@ def get_all_tasks():
 
 
 @app.get("/tasks/{task_id}")
-def get_task_by_id(task_id: int):
-    connection = get_db_connection()
-    if not connection:
-        raise HTTPException(
-            status_code=500, detail="Erreur de connexion à la base de données"
-        )
-
+async def get_task_by_id(task_id: int, connection=Depends(get_db_connection)):
     try:
-        cursor = connection.cursor(dictionary=True)
-        cursor.execute("SELECT * FROM Tasks WHERE id = %s", (task_id,))
-        task = cursor.fetchone()
-        cursor.close()
-        connection.close()
+        async with connection.cursor(aiomysql.DictCursor) as cursor:
+            await cursor.execute("SELECT * FROM Tasks WHERE id = %s", (task_id,))
+            task = await cursor.fetchone()
 
         if not task:
             raise HTTPException(
@@ -176,21 +302,30 @@ def get_task_by_id(task_id: int):
 
 
 @app.get("/notifications")
-def get_notifications():
-    connection = get_db_connection()
-    if not connection:
-        raise HTTPException(
-            status_code=500, detail="Erreur de connexion à la base de données"
-        )
-
+async def get_notifications(
+    fields: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    updated_since: Optional[datetime] = None,
+    connection=Depends(get_db_connection),
+):
     try:
-        cursor = connection.cursor(dictionary=True)
-        cursor.execute("SELECT * FROM Notifications")
-        notifications = cursor.fetchall()
-        cursor.close()
-        connection.close()
+        page = await fetch_page(
+            connection,
+            "Notifications",
+            ["updated_at", "id"],
+            fields,
+            cursor,
+            limit,
+            updated_since,
+        )
+        notifications = page["rows"]
 
-        return {"notifications": notifications, "count": len(notifications)}
+        return {
+            "notifications": notifications,
+            "count": len(notifications),
+            "next_cursor": page["next_cursor"],
+        }
     except Error as e:
         raise HTTPException(
             status_code=500,
@@ -199,15 +334,10 @@ def get_notifications():
 
 
 @app.get("/messages/{client_id}/{conversation_id}")
-def get_conversation_messages(client_id: str, conversation_id: str):
-    connection = get_db_connection()
-    if not connection:
-        raise HTTPException(
-            status_code=500, detail="Erreur de connexion à la base de données"
-        )
-
+async def get_conversation_messages(
+    client_id: str, conversation_id: str, connection=Depends(get_db_connection)
+):
     try:
-        cursor = connection.cursor(dictionary=True)
         query = """
         SELECT 
             id,
@@ -221,10 +351,9 @@ def get_conversation_messages(client_id: str, conversation_id: str):
         WHERE client_id = %s AND conversation_id = %s 
         ORDER BY timestamp ASC
         """
-        cursor.execute(query, (client_id, conversation_id))
-        messages = cursor.fetchall()
-        cursor.close()
-        connection.close()
+        async with connection.cursor(aiomysql.DictCursor) as cursor:
+            await cursor.execute(query, (client_id, conversation_id))
+            messages = await cursor.fetchall()
 
         for message in messages:
             if message["timestamp"]:
@@ -240,37 +369,28 @@ def get_conversation_messages(client_id: str, conversation_id: str):
 
 
 @app.post("/messages")
-def create_message(message: MessageCreate):
+async def create_message(message: MessageCreate, connection=Depends(get_db_connection)):
     """Crée un nouveau message"""
-    connection = get_db_connection()
-    if not connection:
-        raise HTTPException(
-            status_code=500, detail="Erreur de connexion à la base de données"
-        )
-
     try:
-        cursor = connection.cursor()
         query = """
         INSERT INTO messages (client_id, conversation_id, text, audio_url, audio_duration, sender, type)
         VALUES (%s, %s, %s, %s, %s, %s, %s)
         """
-        cursor.execute(
-            query,
-            (
-                message.client_id,
-                message.conversation_id,
-                message.text,
-                message.audioUrl,
-                message.audioDuration,
-                message.sender,
-                message.type,
-            ),
-        )
-
-        message_id = cursor.lastrowid
-        connection.commit()
-        cursor.close()
-        connection.close()
+        async with connection.cursor() as cursor:
+            await cursor.execute(
+                query,
+                (
+                    message.client_id,
+                    message.conversation_id,
+                    message.text,
+                    message.audioUrl,
+                    message.audioDuration,
+                    message.sender,
+                    message.type,
+                ),
+            )
+            message_id = cursor.lastrowid
+        await connection.commit()
 
         return {"message": "Message créé avec succès", "id": message_id}
 
@@ -287,29 +407,45 @@ async def call_supervisor(data: PromptSupervisor):
     return {"status": "success", "result": result}
 
 
+async def broadcast_update(data: DataCreate):
+    # Avec un événement structuré, les clients appliquent le delta sans recharger la table
+    if data.event is not None:
+        await notify_clients({"type": "delta", "ding": data.ding, **data.event.model_dump()})
+    else:
+        await notify_clients({"type": "ding", "ding": data.ding})
+
+
 @app.post("/notify_db_update")
 async def notify_db_update(data: DataCreate):
-    await notify_clients(data.model_dump())
+    await broadcast_update(data)
     return {"status": "notification sent"}
 
 
+@app.post("/notify_db_update/batch")
+async def notify_db_update_batch(data: DataBatch):
+    # Envoi dans l'ordre pour conserver des numéros de séquence croissants
+    for item in data.events:
+        await broadcast_update(item)
+    return {"status": "notification sent", "count": len(data.events)}
+
+
 @app.get("/health")
-def health_check():
+async def health_check():
     """Vérification de la santé de l'API et de la connexion DB"""
-    connection = get_db_connection()
-    if not connection:
+    # Pool du lifespan : pas de nouvelle tentative de création à chaque sonde
+    pool = get_pool()
+    if pool is None:
         return {"status": "unhealthy", "database": "disconnected"}
 
     try:
-        cursor = connection.cursor()
-        cursor.execute("SELECT 1")
-        cursor.fetchone()
-        cursor.close()
-        connection.close()
+        async with pool.acquire() as connection:
+            async with connection.cursor() as cursor:
+                await cursor.execute("SELECT 1")
+                await cursor.fetchone()
 
         return {"status": "healthy", "database": "connected"}
 
-    except Error as e:
+    except Exception as e:
         return {"status": "unhealthy", "database": f"error: {str(e)}"}
 
 
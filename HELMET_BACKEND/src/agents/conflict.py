@@ -70,9 +70,13 @@ def create_conflict_agent():
 
     AVAILABLE TOOLS:
     - find_best_workers_for_task: Semantic search and matching for optimal worker assignment
+    - find_best_workers_for_tasks: Same matching for SEVERAL tasks in one call (use for cascades)
     - (MCP) search_similar_tasks: Semantic search to find tasks based on description/context
     - (MCP) get_users_for_context: Retrieve filtered user data (id, name, role, skills)
     - (MCP) get_tasks: Retrieve task data with advanced filters (your main data gathering tool)
+    - (MCP) detect_conflicts: Deterministic worker / zone (15 min buffer) / equipment overlaps in ONE call
+    - (MCP) get_dependency_impact: All successor tasks of a delayed task with their shifted dates and slack in ONE call
+    - (MCP) propose_schedule: Ranked feasible rescheduling/restaffing plans as update_task steps (worker unavailable, zone blocked, tasks to move)
     - (MCP) get_table_schemas: Get database table schemas
     - (MCP) get_skill_categories: Get skill categories to match workers with tasks
     - (MCP) get_user_roles: Get user roles and permissions
@@ -108,6 +112,7 @@ def create_conflict_agent():
     TARGET TASK:
     - Use: get_tasks(task_id="X") to get full task details
     DEPENDENCY CHAIN:
+    - Use: get_dependency_impact(task_id="X", delay_hours=N) - returns the whole cascade at once
     - Analyze task dependencies to identify successor tasks
     - Use get_tasks to fetch all dependent tasks that might be affected
     - Tasks have a variable dependencies & blocks_tasks
@@ -117,6 +122,7 @@ def create_conflict_agent():
     - Filter to ±4 hours of target time during compilation
     ALTERNATIVE WORKERS:
     - Use: find_best_workers_for_task to find best matches
+    - Several tasks to re-staff: ONE find_best_workers_for_tasks call instead of one call per task
     - Or: get_users_for_context(primary_skill="required_skill", is_active=True)
     - Limit to 5-10 most relevant workers
     ZONE OCCUPANCY:
@@ -145,6 +151,8 @@ def create_conflict_agent():
     - Solution Integration: Include individual update_task actions for each affected dependent task in the main action list
 
     ANALYSIS PROCESS:
+    0. Call detect_conflicts (task_id, worker_id or time window) FIRST - its overlaps are exact,
+       do not recompute them from get_tasks results
     1. Check worker availability at proposed time
     2. Check zone availability at proposed time
     3. Verify worker skills match task requirements (find_best_workers_for_task or get_users_for_context)
@@ -155,6 +163,9 @@ def create_conflict_agent():
     8. GENERATE CONCRETE SOLUTION with dependency updates
 
     SOLUTION GENERATION:
+    For reassignments and rescheduling (injured/absent worker, blocked zone, tasks to move):
+    - Call propose_schedule(..., working_hours="{working_hours}") ONCE
+    - Use plans[0].steps as the solution steps and the next plans as alternatives (copy parameters as-is)
     When conflicts are found, provide a complete solution with:
     1. PRIMARY SOLUTION: Main recommended solution in the "solution" field
     2. MANDATORY ALTERNATIVES: ALWAYS provide at least 2 alternative solutions in the "alternatives" array
@@ -239,8 +250,12 @@ def create_conflict_agent():
                     "get_users_for_context",
                     "get_table_schemas",
                     "get_tasks",
+                    "detect_conflicts",
+                    "get_dependency_impact",
+                    "propose_schedule",
                     "search_similar_tasks",
                     "find_best_workers_for_task",
+                    "find_best_workers_for_tasks",
                 ],
             ),
             # find_best_workers_for_task,
@@ -27,12 +27,13 @@ def create_team_builder_agent():
 
     Available Tools
     - find_best_workers_for_task: Your primary tool - finds workers with skills most similar to task requirements
+    - find_best_workers_for_tasks: Batch version - matches workers for several tasks in one call
     - get_tasks: Retrieves task details including title, description, skill requirements, trade category
 
     Your Workflow
     1. Understand the Request: Identify which tasks need worker assignments
     2. Analyze Tasks: Extract key requirements (skills needed, trade category, complexity)
-    3. Find Matches: Use find_best_workers_for_task with proper task details
+    3. Find Matches: Use find_best_workers_for_task with proper task details (find_best_workers_for_tasks when several tasks need workers)
     4. Evaluate Results: Consider similarity scores, skill overlap, and worker suitability
     5. Propose Assignments: Provide clear, confident worker-task assignments
 
@@ -77,6 +78,7 @@ def create_team_builder_agent():
                 "get_skill_categories",
                 "get_user_roles",
                 "find_best_workers_for_task",
+                "find_best_workers_for_tasks",
             ]
         ),
         prompt=prompt,
@@ -0,0 +1,91 @@
+import os
+import ssl
+from typing import AsyncIterator, Optional
+
+import aiomysql
+from fastapi import HTTPException
+
+# Pool partagé - créé au démarrage de l'application (lifespan FastAPI)
+_pool: Optional[aiomysql.Pool] = None
+
+
+def _build_ssl_context() -> ssl.SSLContext:
+    """Contexte TLS pour TiDB (certificat vérifié, nom d'hôte non vérifié)"""
+    ssl_ca = os.getenv("TIDB_SSL_CA")
+    context = ssl.create_default_context(
+        cafile=ssl_ca if ssl_ca and os.path.exists(ssl_ca) else None
+    )
+    context.check_hostname = False
+    return context
+
+
+async def create_pool() -> Optional[aiomysql.Pool]:
+    """Crée le pool de connexions asynchrones (une seule fois)"""
+    global _pool
+
+    if _pool is not None:
+        return _pool
+
+    try:
+        _pool = await aiomysql.create_pool(
+            host=os.getenv("TIDB_HOST"),
+            port=int(os.getenv("TIDB_PORT", 4000)),
+            user=os.getenv("TIDB_USER"),
+            password=os.getenv("TIDB_PASSWORD"),
+            db=os.getenv("TIDB_DATABASE"),
+            minsize=int(os.getenv("TIDB_POOL_MIN_SIZE", 1)),
+            maxsize=int(os.getenv("TIDB_POOL_SIZE", 10)),
+            pool_recycle=int(os.getenv("TIDB_POOL_MAX_LIFETIME", 1800)),
+            autocommit=True,
+            ssl=_build_ssl_context(),
+        )
+    except Exception as e:
+        print(f"❌ Erreur de création du pool MySQL: {e}")
+        _pool = None
+
+    return _pool
+
+
+def get_pool() -> Optional[aiomysql.Pool]:
+    """Pool créé par le lifespan (None s'il n'a pas pu être créé), sans en créer un nouveau"""
+    return _pool
+
+
+async def close_pool() -> None:
+    """Ferme toutes les connexions du pool"""
+    global _pool
+
+    if _pool is not None:
+        _pool.close()
+        await _pool.wait_closed()
+        _pool = None
+
+
+async def get_db_connection() -> AsyncIterator[aiomysql.Connection]:
+    """Dépendance FastAPI : emprunte une connexion au pool pour la durée de la requête"""
+    pool = await create_pool()
+    if pool is None:
+        raise HTTPException(
+            status_code=500, detail="Erreur de connexion à la base de données"
+        )
+
+    try:
+        connection = await pool.acquire()
+    except Exception as e:
+        print(f"Erreur de connexion MySQL: {e}")
+        raise HTTPException(
+            status_code=500, detail="Erreur de connexion à la base de données"
+        )
+
+    try:
+        yield connection
+    finally:
+        pool.release(connection)
+
+
+__all__ = [
+    "create_pool",
+    "get_pool",
+    "close_pool",
+    "get_db_connection",
+]
@@ -2,7 +2,7 @@
 
 import Image from "next/image";
 import React from "react";
-import { useState, useEffect } from "react"
+import { useState, useEffect, useMemo, useRef } from "react"
 import { UserIcon, FlagIcon, NewspaperIcon } from "@heroicons/react/24/solid";
 import { MapIcon, BellDot, ClipboardEdit, ClipboardCheck, ClipboardCopy, ClipboardList } from "lucide-react";
 import { Inter } from "next/font/google";
@@ -15,9 +15,13 @@ import plan from "../images/plan.png";
 
 const inter = Inter({ subsets: ["latin"] });
 
-export const useWebSocket = (url: string) => {
+// Messages carry a per-client "seq"; a gap means we missed deltas and must resync
+export const useWebSocket = (url: string, onMessage?: (message: any) => void) => {
   const [socket, setSocket] = useState<WebSocket | null>(null);
   const [data, setData] = useState<any>(null);
+  const lastSeq = useRef<number | null>(null);
+  const handler = useRef(onMessage);
+  handler.current = onMessage;
 
   useEffect(() => {
     const ws = new WebSocket(url);
@@ -29,6 +33,18 @@ export const useWebSocket = (url: string) => {
 
     ws.onmessage = (event) => {
       const message = JSON.parse(event.data);
+
+      if (typeof message.seq === "number") {
+        const expected = lastSeq.current === null ? message.seq : lastSeq.current + 1;
+        // A new "hello" after a previous connection also means missed messages
+        const gap = message.seq !== expected || (message.type === "hello" && lastSeq.current !== null);
+        lastSeq.current = message.seq;
+        if (gap) {
+          handler.current?.({ type: "resync" });
+        }
+      }
+
+      handler.current?.(message);
       setData(message);
     };
 
@@ -60,9 +76,53 @@ export const applyChange = (actionList: string) => {
   });
 }
 
-export default function Home() {
-  const { data } = useWebSocket('http://localhost:8000/ws');
+// Columns actually rendered by the task list (keeps /tasks payloads small)
+const TASK_FIELDS = "id,title,assigned_workers,due_date,status,updated_at";
+
+// Pull every page of a paginated endpoint, optionally only rows changed since `updatedSince`
+export const fetchPages = async (
+  endpoint: string,
+  key: string,
+  fields?: string,
+  updatedSince?: string | null
+) => {
+  const rows: any[] = [];
+  let cursor: string | null = null;
+
+  do {
+    const params = new URLSearchParams({ limit: "500" });
+    if (fields) params.set("fields", fields);
+    if (updatedSince) params.set("updated_since", updatedSince);
+    if (cursor) params.set("cursor", cursor);
+
+    const res = await fetch(`http://localhost:8000/${endpoint}?${params}`);
+    if (!res.ok) throw new Error(`HTTP ${res.status}`);
+    const page = await res.json();
+    rows.push(...page[key]);
+    cursor = page.next_cursor;
+  } while (cursor);
+
+  return rows;
+};
 
+// Replace rows by id and append new ones
+export const mergeById = (current: any[], changed: any[]) => {
+  const byId = new Map(current.map((row) => [row.id, row]));
+  for (const row of changed) {
+    byId.set(row.id, row);
+  }
+  return Array.from(byId.values());
+};
+
+// Most recent updated_at among rows (used as the next updated_since)
+const latestUpdate = (rows: any[], previous: string | null) =>
+  rows.reduce(
+    (latest: string | null, row: any) =>
+      row.updated_at && (!latest || row.updated_at > latest) ? row.updated_at : latest,
+    previous
+  );
+
+export default function Home() {
   type Task = {
     id: number;
     title: string;
@@ -76,101 +136,91 @@ export default function Home() {
     action_list: string;
   };
 
-  useEffect(() => {
-    const fetchData = async () => {
-      console.log("Received WebSocket data:", data);
-      try {
-        if (data?.ding === "task") {
-          const res = await fetch("http://localhost:8000/tasks");
-          if (!res.ok) throw new Error(`HTTP ${res.status}`);
-          const { tasks } = await res.json();
-
-          setAllCompletedTasks(tasks.filter((t: Task) => t.status === "completed"));
-          setAllTasks(tasks.filter((t: Task) => t.status !== "completed"));
-        }
+  const [tasks, setTasks] = useState<Task[]>([]);
+  const [notifications, setNotifications] = useState<Notification[]>([]);
+  const lastTaskSync = useRef<string | null>(null);
+  const lastNotificationSync = useRef<string | null>(null);
 
-        if (data?.ding === "notification") {
-          console.log("Fetching notifications due to WebSocket event");
-          const res = await fetch("http://localhost:8000/notifications");
-          if (!res.ok) throw new Error(`HTTP ${res.status}`);
-          const { notifications } = await res.json();
-
-          setAllTrigeredNotifications(
-            notifications.filter((n: Notification) => n.is_triggered)
-          );
-          setAllNotifications(
-            notifications.filter((n: Notification) => !n.is_triggered)
-          );
-        }
-
-        // if (data?.ding === "news") {
-        //   const res = await fetch("http://localhost:8000/news");
-        //   if (!res.ok) throw new Error(`HTTP ${res.status}`);
-        //   const { news } = await res.json();
-        //   setAllNews(news);
-        // }
-      } catch (err) {
-        console.error("Error fetching:", err);
-      }
-    };
+  const syncTasks = async () => {
+    const changed = await fetchPages("tasks", "tasks", TASK_FIELDS, lastTaskSync.current);
+    lastTaskSync.current = latestUpdate(changed, lastTaskSync.current);
+    setTasks((prev) => mergeById(prev, changed));
+  };
 
-    fetchData();
-    console.log("WebSocket data changed:", data);
-  }, [data]);
+  const syncNotifications = async () => {
+    const changed = await fetchPages(
+      "notifications",
+      "notifications",
+      undefined,
+      lastNotificationSync.current
+    );
+    lastNotificationSync.current = latestUpdate(changed, lastNotificationSync.current);
+    setNotifications((prev) => mergeById(prev, changed));
+  };
 
+  // Latest version applied per row ("task:12" -> version) to ignore stale deltas
+  const versions = useRef(new Map<string, number>());
 
-  const [SiteName, setSiteName] = useState("Hoverville Retail Park");
-  const [LocalisationSite, setLocalisationSite] = useState("California, USA");
-  const [MonitorName, setMonitorName] = useState("Monitor 1");
+  const applyDelta = (message: any) => {
+    const key = `${message.entity}:${message.id}`;
+    const previous = versions.current.get(key);
+    if (message.version != null) {
+      if (previous != null && message.version < previous) return;
+      versions.current.set(key, message.version);
+    }
 
-  const [allTasks, setAllTasks] = useState<any[]>([]);
-  const [allCompletedTasks, setAllCompletedTasks] = useState<any[]>([]);
-  const [allNotifications, setAllNotifications] = useState<any[]>([]);
-  const [allTrigeredNotifications, setAllTrigeredNotifications] = useState<any[]>([]);
+    const setRows: any = message.entity === "task" ? setTasks : setNotifications;
+    if (message.op === "delete") {
+      setRows((prev: any[]) => prev.filter((row) => row.id !== message.id));
+    } else if (message.data) {
+      setRows((prev: any[]) => mergeById(prev, [message.data]));
+    }
+  };
 
-  useEffect(() => {
-    async function fetchTasks() {
-      try {
-        const response = await fetch('http://localhost:8000/tasks');
-        if (!response.ok) {
-          throw new Error(`HTTP error! status: ${response.status}`);
-        }
-        const data = await response.json();
-        for (const task of data.tasks) {
-          if (task.status === 'completed') {
-            setAllCompletedTasks(prev => [...prev, task]);
-          } else {
-            setAllTasks(prev => [...prev, task]);
-          }
-        }
-      } catch (error) {
-        console.error('Error fetching tasks:', error);
+  const handleMessage = async (message: any) => {
+    console.log("Received WebSocket data:", message);
+    try {
+      if (message.type === "delta" && (message.entity === "task" || message.entity === "notification")) {
+        applyDelta(message);
+        return;
       }
-    }
 
-    async function fetchNotifications() {
-      try {
-        const response = await fetch('http://localhost:8000/notifications');
-        if (!response.ok) {
-          throw new Error(`HTTP error! status: ${response.status}`);
-        }
-        const data = await response.json();
-        console.log(data);
-        for (const notification of data.notifications) {
-          if (notification.is_triggered) {
-            setAllTrigeredNotifications(prev => [...prev, notification]);
-          } else {
-            setAllNotifications(prev => [...prev, notification]);
-          }
-        }
+      // Gap in the sequence (or legacy ding): pull only rows changed since the last sync
+      if (message.type === "resync" || message.ding === "task") {
+        await syncTasks();
+      }
 
-      } catch (error) {
-        console.error('Error fetching notifications:', error);
+      if (message.type === "resync" || message.ding === "notification") {
+        console.log("Fetching notifications due to WebSocket event");
+        await syncNotifications();
       }
+
+      // if (message.ding === "news") {
+      //   const res = await fetch("http://localhost:8000/news");
+      //   if (!res.ok) throw new Error(`HTTP ${res.status}`);
+      //   const { news } = await res.json();
+      //   setAllNews(news);
+      // }
+    } catch (err) {
+      console.error("Error fetching:", err);
     }
+  };
+
+  useWebSocket('http://localhost:8000/ws', handleMessage);
+
+
+  const [SiteName, setSiteName] = useState("Hoverville Retail Park");
+  const [LocalisationSite, setLocalisationSite] = useState("California, USA");
+  const [MonitorName, setMonitorName] = useState("Monitor 1");
 
-    fetchNotifications();
-    fetchTasks();
+  const allTasks = useMemo(() => tasks.filter((t) => t.status !== "completed"), [tasks]);
+  const allCompletedTasks = useMemo(() => tasks.filter((t) => t.status === "completed"), [tasks]);
+  const allNotifications = useMemo(() => notifications.filter((n) => !n.is_triggered), [notifications]);
+  const allTrigeredNotifications = useMemo(() => notifications.filter((n) => n.is_triggered), [notifications]);
+
+  useEffect(() => {
+    syncNotifications().catch((error) => console.error('Error fetching notifications:', error));
+    syncTasks().catch((error) => console.error('Error fetching tasks:', error));
   }, []);
 
   return (
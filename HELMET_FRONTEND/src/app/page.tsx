@@ -45,11 +45,20 @@ export default function Home() {
       console.log(data.task);
     };
 
+    // /all_users is paginated: follow next_cursor until the last page
     const fetchAllUsersIDs = async () => {
-      const response = await fetch('http://localhost:8000/all_users');
-      const data = await response.json();
-      setOtherUserTest(data.users);
-      console.log(data.users);
+      const users: any[] = [];
+      let cursor: string | null = null;
+      do {
+        const params = new URLSearchParams({ limit: "1000" });
+        if (cursor) params.set("cursor", cursor);
+        const response = await fetch(`http://localhost:8000/all_users?${params}`);
+        const data = await response.json();
+        users.push(...data.users);
+        cursor = data.next_cursor;
+      } while (cursor);
+      setOtherUserTest(users);
+      console.log(users);
     };
 
     fetchAllUsersIDs();
@@ -1,10 +1,77 @@
 # mcp_server.py
 import asyncio
+import threading
 
+import anyio
+import httpx
 from langchain_mcp_adapters.client import MultiServerMCPClient
+from langchain_mcp_adapters.tools import load_mcp_tools
 from langchain_core.tools import BaseTool
 
 
+class BackgroundEventLoop:
+    """Event loop running forever in a daemon thread, owned by the MCP client.
+
+    The MCP session lives on this loop, so every tool call is dispatched here
+    instead of creating a new loop (and a new session) per call.
+    """
+
+    def __init__(self):
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        if self._loop is None:
+            with self._lock:
+                if self._loop is None:
+                    loop = asyncio.new_event_loop()
+                    threading.Thread(
+                        target=loop.run_forever, name="db-mcp-client-loop", daemon=True
+                    ).start()
+                    self._loop = loop
+        return self._loop
+
+    def run(self, coro):
+        """Run a coroutine on the background loop and block until it completes"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+
+    async def arun(self, coro):
+        """Await a coroutine on the background loop from any other event loop"""
+        loop = self.loop
+        if asyncio.get_running_loop() is loop:
+            return await coro
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, loop))
+
+
+background_loop = BackgroundEventLoop()
+
+# Tools that write: never sent twice, a failed call may already have committed
+NON_IDEMPOTENT_TOOLS = {
+    "create_task",
+    "update_task",
+    "create_user",
+    "update_user",
+    "create_notification",
+    "update_notification",
+}
+
+# Errors meaning the session/transport is gone (the call did not reach the tool)
+SESSION_ERRORS = (
+    anyio.ClosedResourceError,
+    anyio.BrokenResourceError,
+    anyio.EndOfStream,
+    ConnectionError,
+    httpx.TransportError,
+)
+
+
+def _is_session_error(error: BaseException) -> bool:
+    if isinstance(error, BaseExceptionGroup):
+        return all(_is_session_error(e) for e in error.exceptions)
+    return isinstance(error, SESSION_ERRORS)
+
+
 class AsyncToSyncTool(BaseTool):
     """Wrapper to make async MCP tools work synchronously with LangGraph"""
 
@@ -18,26 +85,33 @@ class AsyncToSyncTool(BaseTool):
             async_tool=async_tool,
         )
 
-    def _run(self, **kwargs) -> str:
-        """Convert async call to sync using asyncio.run"""
-        # LangChain tools expect input as a dictionary
-        input_data = kwargs
-
+    async def _invoke(self, input_data: dict) -> str:
+        """Call the MCP tool over the shared session (runs on the background loop)"""
+        tool = db_mcp_session_tools.get(self.name, self.async_tool)
         try:
-            asyncio.get_running_loop()
-        except RuntimeError:
-            # No event loop running, we can use asyncio.run
-            return asyncio.run(self.async_tool.ainvoke(input_data))
-        else:
-            # Event loop is running, we need to run in a thread
-            import concurrent.futures
+            return await tool.ainvoke(input_data)
+        except Exception as e:
+            # Only a dropped session (e.g. MCP server restart) is recovered; tool and
+            # server errors propagate
+            if not _is_session_error(e):
+                raise
+            # Reopen once, unless a concurrent call already replaced the session
+            if db_mcp_session_tools.get(self.name) is tool:
+                print(f"🔄 DB MCP session lost ({e!r}), reopening session...")
+                await _open_db_mcp_session()
+            if self.name in NON_IDEMPOTENT_TOOLS:
+                # The write may have been applied before the session dropped
+                raise
+            return await db_mcp_session_tools[self.name].ainvoke(input_data)
 
-            def run_async():
-                return asyncio.run(self.async_tool.ainvoke(input_data))
+    def _run(self, **kwargs) -> str:
+        """Dispatch the call to the client's background event loop"""
+        # LangChain tools expect input as a dictionary
+        return background_loop.run(self._invoke(kwargs))
 
-            with concurrent.futures.ThreadPoolExecutor() as executor:
-                future = executor.submit(run_async)
-                return future.result()
+    async def _arun(self, **kwargs) -> str:
+        """Native async path (used by LangGraph's ainvoke)"""
+        return await background_loop.arun(self._invoke(kwargs))
 
 
 # Global MCP client + cached tools
@@ -45,6 +119,69 @@ db_mcp_client: MultiServerMCPClient | None = None
 db_mcp_tools: list[BaseTool] = []
 db_mcp_tools_for_prompt = []
 
+# Persistent MCP session and its raw tools. The session is entered and exited by
+# one owner task on the background loop (anyio cancel scopes must be exited by the
+# task that entered them); closing it means setting the owner's event.
+db_mcp_session_owner: tuple[asyncio.Task, asyncio.Event] | None = None
+db_mcp_session_tools: dict[str, BaseTool] = {}
+
+# Seconds the owner task gets to exit the session before it is cancelled
+SESSION_CLOSE_TIMEOUT = 10
+
+
+async def _hold_db_mcp_session(ready: asyncio.Future, closing: asyncio.Event) -> None:
+    """Owner task: open the session, hand its tools over, keep it until `closing` is set"""
+    try:
+        async with db_mcp_client.session("db-server") as session:
+            tools = await load_mcp_tools(session)
+            if ready.done():
+                return  # The opener gave up (cancelled): nobody uses this session
+            ready.set_result(tools)
+            await closing.wait()
+    except Exception as e:
+        if not ready.done():
+            ready.set_exception(e)
+        else:
+            print(f"⚠️ DB MCP session closed with error: {e!r}")
+
+
+async def _close_db_mcp_session() -> None:
+    """Ask the owner task to exit the session and wait for it. Must run on background_loop."""
+    global db_mcp_session_owner
+    if db_mcp_session_owner is None:
+        return
+    task, closing = db_mcp_session_owner
+    db_mcp_session_owner = None
+
+    closing.set()
+    _, pending = await asyncio.wait({task}, timeout=SESSION_CLOSE_TIMEOUT)
+    if pending:
+        # Cancellation is delivered inside the owner task, which unwinds its own scopes
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+
+async def _open_db_mcp_session() -> list[BaseTool]:
+    """(Re)open the shared MCP session and load its tools. Must run on background_loop."""
+    global db_mcp_session_owner, db_mcp_session_tools
+    await _close_db_mcp_session()
+
+    loop = asyncio.get_running_loop()
+    ready = loop.create_future()
+    closing = asyncio.Event()
+    task = loop.create_task(_hold_db_mcp_session(ready, closing), name="db-mcp-session")
+    tools = await ready
+
+    db_mcp_session_owner = (task, closing)
+    db_mcp_session_tools = {tool.name: tool for tool in tools}
+    return tools
+
+
+async def close_db_mcp():
+    """Close the shared MCP session (application shutdown)"""
+    if db_mcp_session_owner is not None:
+        await background_loop.arun(_close_db_mcp_session())
+
 
 async def connect_db_mcp():
     """Initialize DB MCP client once and fetch tools."""
@@ -70,7 +207,7 @@ async def connect_db_mcp():
     print("✅ Connected to DB MCP server")
 
     print("🔄 Fetching DB MCP tools...")
-    tools_result = await db_mcp_client.get_tools()
+    tools_result = await background_loop.arun(_open_db_mcp_session())
 
     # Wrap async tools to make them sync-compatible
     db_mcp_tools = [AsyncToSyncTool(tool) for tool in tools_result]
@@ -1,32 +1,264 @@
+import os
+import time
+import queue
+import atexit
+import threading
 import requests
 import json
-from typing import Dict, Any
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, Any, Iterable, List, Optional, Tuple
 
+from metrics import increment, record_timing
 
-def notify_db_update(data: str) -> Dict[str, Any]:
+BACKEND_URL = os.getenv("BACKEND_URL", "http://localhost:8000")
+
+
+class BackendNotifier:
+    """
+    Non-blocking notifier: write tools enqueue events and return immediately.
+
+    - A daemon thread drains a bounded queue (events are dropped when it is full)
+    - Events for the same row arriving within `coalesce_window` are merged
+    - Batches are POSTed over a keep-alive session, with retry and exponential backoff
+    """
+
+    def __init__(
+        self,
+        url: str,
+        max_queue_size: int = 1000,
+        coalesce_window: float = 0.1,
+        max_batch_size: int = 100,
+        max_retries: int = 3,
+        backoff: float = 0.5,
+        timeout: float = 5.0,
+    ):
+        self.url = url
+        self.coalesce_window = coalesce_window
+        self.max_batch_size = max_batch_size
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+
+        self._queue: "queue.Queue[Dict[str, Any]]" = queue.Queue(maxsize=max_queue_size)
+        self._session = requests.Session()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="backend-notifier", daemon=True
+                )
+                self._thread.start()
+
+    def enqueue(self, item: Dict[str, Any]) -> bool:
+        """Queue a notification, returns False if the queue is full (event dropped)"""
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(item)
+            increment("notifier.enqueued")
+            return True
+        except queue.Full:
+            increment("notifier.overflow")
+            print(f"⚠️  Notifier queue full, dropping '{item.get('ding')}' event")
+            return False
+
+    @staticmethod
+    def _coalesce_key(item: Dict[str, Any]) -> Tuple:
+        event = item.get("event")
+        if event is None:
+            return ("ding", item["ding"])
+        return ("event", event["entity"], event["id"])
+
+    @staticmethod
+    def _merge(previous: Dict[str, Any], item: Dict[str, Any]) -> Dict[str, Any]:
+        """Merge two events for the same row (latest data, union of changed fields)"""
+        old, new = previous.get("event"), item.get("event")
+        if old is None or new is None:
+            return item
+        if (new.get("version") or 0) < (old.get("version") or 0):
+            old, new = new, old
+        merged = dict(new)
+        merged["changed_fields"] = list(
+            dict.fromkeys(old["changed_fields"] + new["changed_fields"])
+        )
+        # A row created then updated in the same window is still a creation
+        if old["op"] == "create" and new["op"] != "delete":
+            merged["op"] = "create"
+        return {"ding": item["ding"], "event": merged}
+
+    def _collect_batch(self) -> List[Dict[str, Any]]:
+        """Block for one event, then gather more for up to `coalesce_window` seconds"""
+        pending: Dict[Tuple, Dict[str, Any]] = {}
+
+        first = self._queue.get()
+        pending[self._coalesce_key(first)] = first
+        deadline = time.monotonic() + self.coalesce_window
+
+        while len(pending) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            key = self._coalesce_key(item)
+            if key in pending:
+                increment("notifier.coalesced")
+                pending[key] = self._merge(pending[key], item)
+            else:
+                pending[key] = item
+
+        return list(pending.values())
+
+    def _post(self, batch: List[Dict[str, Any]]) -> bool:
+        payload = json.dumps({"events": batch}, default=str)
+        for attempt in range(self.max_retries + 1):
+            start = time.perf_counter()
+            try:
+                response = self._session.post(
+                    self.url,
+                    data=payload,
+                    headers={"Content-Type": "application/json"},
+                    timeout=self.timeout,
+                )
+                response.raise_for_status()
+                record_timing("notifier.post", time.perf_counter() - start)
+                return True
+            except requests.RequestException as e:
+                record_timing("notifier.post", time.perf_counter() - start)
+                increment("notifier.retries")
+                print(f"Request failed (attempt {attempt + 1}): {e}")
+                if attempt < self.max_retries:
+                    time.sleep(self.backoff * (2**attempt))
+        return False
+
+    def _run(self) -> None:
+        while True:
+            batch = self._collect_batch()
+            try:
+                if self._post(batch):
+                    increment("notifier.batches_sent")
+                    increment("notifier.events_sent", len(batch))
+                else:
+                    increment("notifier.dropped", len(batch))
+                    print(f"❌ Backend notification dropped ({len(batch)} events)")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Wait until every queued event has been handled (True if the queue drained)"""
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if time.monotonic() > deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def stats(self) -> Dict[str, int]:
+        return {"queued": self._queue.qsize(), "max_queue_size": self._queue.maxsize}
+
+
+notifier = BackendNotifier(
+    f"{BACKEND_URL}/notify_db_update/batch",
+    max_queue_size=int(os.getenv("NOTIFIER_QUEUE_SIZE", 1000)),
+    coalesce_window=float(os.getenv("NOTIFIER_COALESCE_MS", 100)) / 1000,
+    max_batch_size=int(os.getenv("NOTIFIER_BATCH_SIZE", 100)),
+    max_retries=int(os.getenv("NOTIFIER_MAX_RETRIES", 3)),
+)
+atexit.register(notifier.flush, 2.0)
+
+
+def notify_db_update(data: str, event: Optional[Dict[str, Any]] = None) -> bool:
     """
-    Send a POST request to notify backend about database updates.
+    Queue a notification for the backend about database updates.
+
+    Returns immediately; delivery happens on the notifier thread.
 
     Args:
-        data: JSON object containing the notification data
+        data: Entity that changed ("task", "notification", ...)
+        event: Optional structured change event (see build_change_event)
 
     Returns:
-        Response from the backend as a dictionary
+        True if the notification was queued, False if it was dropped
+    """
+    item: Dict[str, Any] = {"ding": data}
+    if event is not None:
+        item["event"] = event
+    return notifier.enqueue(item)
+
+
+def _event_version(data: Optional[Dict[str, Any]]) -> int:
+    """Version of a row in epoch milliseconds (updated_at when available)"""
+    updated_at = (data or {}).get("updated_at")
+    if isinstance(updated_at, str):
+        try:
+            updated_at = datetime.fromisoformat(updated_at)
+        except ValueError:
+            updated_at = None
+    if isinstance(updated_at, datetime):
+        return int(updated_at.timestamp() * 1000)
+    return int(time.time() * 1000)
+
 
-    Raises:
-        requests.RequestException: If the request fails
+def serialize_change_row(columns: Iterable[str], values: Iterable[Any]) -> Dict[str, Any]:
     """
-    url = "http://localhost:8000/notify_db_update"
+    Row shaped like the backend list endpoints return it, so dashboards can
+    merge a delta in place of a fetched row: JSON columns stay raw JSON text,
+    datetimes are ISO formatted and decimals are floats.
+    """
+    row: Dict[str, Any] = {}
+    for column, value in zip(columns, values):
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        elif isinstance(value, Decimal):
+            value = float(value)
+        elif isinstance(value, (bytes, bytearray)):
+            value = value.decode("utf-8")
+        row[column] = value
+    return row
 
-    try:
-        response = requests.post(
-            url,
-            json={"ding": data},
-            headers={"Content-Type": "application/json"},
-            timeout=30,
-        )
-        response.raise_for_status()
-        return response.json()
-    except requests.RequestException as e:
-        print(f"Request failed: {e}")
-        raise
+
+def build_change_event(
+    entity: str,
+    entity_id: int,
+    op: str,
+    changed_fields: Optional[Iterable[str]] = None,
+    data: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Build a structured change event.
+
+    Args:
+        entity: "task", "notification", ...
+        entity_id: Primary key of the changed row
+        op: "create", "update" or "delete"
+        changed_fields: Columns modified by the write (all columns on create)
+        data: Row after the write (None on delete)
+    """
+    return {
+        "entity": entity,
+        "id": entity_id,
+        "op": op,
+        "changed_fields": list(changed_fields or []),
+        "version": _event_version(data),
+        "data": data,
+    }
+
+
+def publish_change(
+    entity: str,
+    entity_id: int,
+    op: str,
+    changed_fields: Optional[Iterable[str]] = None,
+    data: Optional[Dict[str, Any]] = None,
+) -> bool:
+    """Queue a structured change event for the backend (delta push to dashboards)"""
+    event = build_change_event(entity, entity_id, op, changed_fields, data)
+    return notify_db_update(entity, event)
@@ -0,0 +1,152 @@
+"""
+Bounded connection pool for the MCP server
+Each tool call borrows its own TiDB connection so concurrent calls run in parallel
+"""
+
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Optional, Dict, Any
+
+from metrics import increment, record_timing
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of mysql.connector connections.
+
+    - At most `size` connections exist at the same time (borrowers wait up to `timeout`)
+    - Connections are pinged before being handed out (health-check-on-borrow)
+    - Connections older than `max_lifetime` seconds are closed and replaced
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], Any],
+        size: int = 10,
+        max_lifetime: float = 1800.0,
+        timeout: float = 10.0,
+    ):
+        self._factory = factory
+        self.size = size
+        self.max_lifetime = max_lifetime
+        self.timeout = timeout
+
+        # LIFO keeps recently used (warm) connections in rotation
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._created_at: Dict[int, float] = {}
+        self._lock = threading.Lock()
+        self._in_use = 0
+
+    def _is_expired(self, connection) -> bool:
+        created_at = self._created_at.get(id(connection), 0.0)
+        return time.monotonic() - created_at > self.max_lifetime
+
+    def _is_healthy(self, connection) -> bool:
+        try:
+            connection.ping(reconnect=False)
+            return True
+        except Exception:
+            return False
+
+    def _discard(self, connection) -> None:
+        self._created_at.pop(id(connection), None)
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def _open(self):
+        connection = self._factory()
+        if connection is not None:
+            self._created_at[id(connection)] = time.monotonic()
+            increment("db_pool.connections_opened")
+        return connection
+
+    def acquire(self, timeout: Optional[float] = None):
+        """Borrow a connection, or return None if none could be obtained"""
+        start = time.perf_counter()
+        if not self._slots.acquire(timeout=self.timeout if timeout is None else timeout):
+            record_timing("db_pool.wait", time.perf_counter() - start)
+            increment("db_pool.timeouts")
+            print("❌ Connection pool exhausted: timed out waiting for a connection")
+            return None
+        record_timing("db_pool.wait", time.perf_counter() - start)
+
+        connection = None
+        try:
+            while connection is None:
+                try:
+                    candidate = self._idle.get_nowait()
+                except queue.Empty:
+                    connection = self._open()
+                    break
+
+                if self._is_expired(candidate):
+                    increment("db_pool.connections_recycled")
+                    self._discard(candidate)
+                elif not self._is_healthy(candidate):
+                    increment("db_pool.connections_broken")
+                    self._discard(candidate)
+                else:
+                    connection = candidate
+        except Exception as e:
+            print(f"❌ Connection pool error: {e}")
+            connection = None
+
+        if connection is None:
+            self._slots.release()
+            return None
+
+        with self._lock:
+            self._in_use += 1
+        increment("db_pool.checkouts")
+        return connection
+
+    def release(self, connection) -> None:
+        """Give a borrowed connection back to the pool"""
+        if connection is None:
+            return
+        with self._lock:
+            self._in_use -= 1
+        try:
+            if not connection.autocommit:
+                connection.rollback()
+            if self._is_expired(connection):
+                increment("db_pool.connections_recycled")
+                self._discard(connection)
+            else:
+                self._idle.put(connection)
+        except Exception:
+            self._discard(connection)
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def connection(self, timeout: Optional[float] = None):
+        """Borrow a connection for the duration of a `with` block (None on failure)"""
+        connection = self.acquire(timeout)
+        try:
+            yield connection
+        finally:
+            self.release(connection)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            in_use = self._in_use
+        return {"size": self.size, "in_use": in_use, "idle": self._idle.qsize()}
+
+    def close(self) -> None:
+        """Close every idle connection"""
+        while True:
+            try:
+                self._discard(self._idle.get_nowait())
+            except queue.Empty:
+                break
+
+
+__all__ = [
+    "ConnectionPool",
+]
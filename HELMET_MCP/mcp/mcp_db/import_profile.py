@@ -0,0 +1,69 @@
+"""
+Import-time profiling of the MCP server modules
+Runs `python -X importtime` in a subprocess on the same modules and summarises
+the slowest imports for the startup log (MCP_IMPORT_PROFILE=1).
+"""
+
+import os
+import sys
+import subprocess
+from typing import Any, Dict, List
+
+
+def parse_importtime(output: str) -> List[Dict[str, Any]]:
+    """Parse `-X importtime` lines: 'import time: self [us] | cumulative | package'"""
+    entries = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # header line
+        name = fields[2][1:]
+        entries.append(
+            {
+                "module": name.strip(),
+                # Nested imports are indented by 2 spaces per level
+                "depth": (len(name) - len(name.lstrip())) // 2,
+                "self_ms": int(fields[0]) / 1000,
+                "cumulative_ms": int(fields[1]) / 1000,
+            }
+        )
+    return entries
+
+
+def profile_imports(modules: List[str], top: int = 15, timeout: float = 120.0) -> List[Dict[str, Any]]:
+    """Import `modules` in a fresh interpreter and return the `top` slowest (cumulative) imports"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "; ".join(f"import {m}" for m in modules)],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True,
+        text=True,
+        timeout=timeout,
+    )
+    # Parents include their children, so a slow package shows with the import chain above it
+    entries = parse_importtime(result.stderr)
+    return sorted(entries, key=lambda entry: entry["cumulative_ms"], reverse=True)[:top]
+
+
+def print_import_profile(modules: List[str], top: int = 15) -> None:
+    """Log the import-time summary (never fails the startup)"""
+    try:
+        entries = profile_imports(modules, top)
+    except Exception as e:
+        print(f"⚠️  Import profiling failed: {e}")
+        return
+
+    print(f"📦 Slowest imports (-X importtime, top {len(entries)}):")
+    for entry in entries:
+        print(
+            f"   {entry['cumulative_ms']:9.1f} ms  (self {entry['self_ms']:7.1f} ms)  "
+            f"{'  ' * entry['depth']}{entry['module']}"
+        )
+
+
+__all__ = [
+    "parse_importtime",
+    "profile_imports",
+    "print_import_profile",
+]
@@ -3,6 +3,8 @@ import mysql.connector
 import os
 from dotenv import load_dotenv
 
+from db_pool import ConnectionPool
+
 load_dotenv()
 
 try:
@@ -30,21 +32,35 @@ def create_db_connection():
         return None
 
 
+# Shared connection pool (connections are opened on demand)
+db_pool = ConnectionPool(
+    create_db_connection,
+    size=int(os.getenv("TIDB_POOL_SIZE", 10)),
+    max_lifetime=float(os.getenv("TIDB_POOL_MAX_LIFETIME", 1800)),
+    timeout=float(os.getenv("TIDB_POOL_TIMEOUT", 10)),
+)
+
+
 def get_db_connection():
-    """Get database connection with reconnection if needed"""
-    global db
-    if db is None or not db.is_connected():
-        print("🔄 Reconnecting to database...")
-        db = create_db_connection()
-    return db
+    """Borrow a database connection from the pool (give it back with release_db_connection)"""
+    return db_pool.acquire()
+
+
+def release_db_connection(connection) -> None:
+    """Return a connection obtained with get_db_connection to the pool"""
+    db_pool.release(connection)
+
 
+def db_connection():
+    """Context manager borrowing a pooled connection (None if unavailable)"""
+    return db_pool.connection()
 
-# Initial connection
-db = create_db_connection()
 
 # Export
 __all__ = [
     "mcp",
-    "db",
+    "db_pool",
     "get_db_connection",
+    "release_db_connection",
+    "db_connection",
 ]
@@ -1,35 +1,111 @@
 from mcp_init import mcp
 import os
+import time
+import importlib
 
-# Users
-import tools.users.repositories.get_users
-import tools.users.repositories.create_user
-import tools.users.repositories.update_user
-import tools.users.repositories.get_users_for_context
+from metrics import record_timing
 
-import tools.users.others.get_user_roles
-import tools.users.others.get_skill_categories
+# Tool modules per group (MCP_TOOL_GROUPS selects which ones are registered)
+TOOL_GROUPS = {
+    # Users
+    "users": [
+        "tools.users.repositories.get_users",
+        "tools.users.repositories.create_user",
+        "tools.users.repositories.update_user",
+        "tools.users.repositories.get_users_for_context",
+        "tools.users.others.get_user_roles",
+        "tools.users.others.get_skill_categories",
+    ],
+    # Tasks
+    "tasks": [
+        "tools.tasks.repositories.get_tasks",
+        "tools.tasks.repositories.create_task",
+        "tools.tasks.repositories.update_task",
+    ],
+    # Scheduling (deterministic analysis over tasks)
+    "scheduling": [
+        "tools.scheduling.repositories.detect_conflicts",
+        "tools.scheduling.repositories.get_dependency_impact",
+        "tools.scheduling.repositories.propose_schedule",
+    ],
+    # Embedding/Vector
+    "vector": [
+        "tools.embedding.repositories.find_best_workers",
+        "tools.embedding.repositories.find_best_workers_for_tasks",
+        "tools.embedding.repositories.search_similar_tasks",
+        "tools.embedding.repositories.search_similar_users",
+        "tools.monitoring.get_vector_index_status",
+    ],
+    # Notifications
+    "notifications": [
+        "tools.notifications.repositories.create_notification",
+    ],
+}
 
-# Tasks
-import tools.tasks.repositories.get_tasks
-import tools.tasks.repositories.create_task
-import tools.tasks.repositories.update_task
+# Always registered: storage and monitoring
+CORE_TOOLS = [
+    "tools.storage.get_table_schemas",
+    "tools.monitoring.get_server_metrics",
+]
 
-# Storage
-import tools.storage.get_table_schemas
 
-# Embedding/Vector
-import tools.embedding.repositories.find_best_workers
-import tools.embedding.repositories.search_similar_tasks
-import tools.embedding.repositories.search_similar_users
+def selected_tool_groups() -> list:
+    """Groups listed in MCP_TOOL_GROUPS (comma-separated, all groups when unset)"""
+    value = os.getenv("MCP_TOOL_GROUPS", "").strip()
+    if not value or value.lower() == "all":
+        return list(TOOL_GROUPS)
 
-# Notifications
-import tools.notifications.repositories.create_notification
+    groups = []
+    for group in (part.strip().lower() for part in value.split(",")):
+        if group in TOOL_GROUPS:
+            groups.append(group)
+        elif group:
+            print(f"⚠️  Unknown tool group '{group}' (expected one of {', '.join(TOOL_GROUPS)})")
+    return groups
+
+
+def register_tools(groups: list) -> list:
+    """Import the tool modules of `groups` (importing a module registers its tools)"""
+    modules = []
+    for group in ["core"] + groups:
+        start = time.perf_counter()
+        group_modules = CORE_TOOLS if group == "core" else TOOL_GROUPS[group]
+        for module in group_modules:
+            importlib.import_module(module)
+        elapsed = time.perf_counter() - start
+        record_timing(f"startup.import.{group}", elapsed)
+        print(f"🧩 Tools '{group}' loaded in {elapsed * 1000:.0f} ms ({len(group_modules)} modules)")
+        modules += group_modules
+    return modules
+
+
+tool_groups = selected_tool_groups()
+tool_modules = register_tools(tool_groups)
 
 
 if __name__ == "__main__":
     port = int(os.getenv("MCP_PORT", 8080))
 
+    # `-X importtime` summary of the registered tool modules (runs a second interpreter)
+    if os.getenv("MCP_IMPORT_PROFILE", "0").lower() in ("1", "true", "yes"):
+        from import_profile import print_import_profile
+
+        print_import_profile(tool_modules)
+
+    # Load the embedding model once before serving (EMBEDDING_WARMUP=0 to defer
+    # to the first vector call); skipped when no vector tools are served
+    if "vector" in tool_groups and os.getenv("EMBEDDING_WARMUP", "1").lower() not in (
+        "0",
+        "false",
+        "no",
+    ):
+        try:
+            from tools.embedding.vector import get_embedding_service
+
+            get_embedding_service().warm_up()
+        except Exception as e:
+            print(f"⚠️  Embedding warm-up failed: {e}")
+
     mcp.run(
         transport="streamable-http",
         host="0.0.0.0",
@@ -0,0 +1,67 @@
+"""
+Lightweight in-process metrics for the MCP server
+Counters and timings are kept in memory and exposed through get_server_metrics
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Any
+
+_lock = threading.Lock()
+_counters: Dict[str, float] = {}
+_timings: Dict[str, Dict[str, float]] = {}
+
+
+def increment(name: str, value: float = 1) -> None:
+    """Increment a named counter"""
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+
+
+def record_timing(name: str, seconds: float) -> None:
+    """Record a duration (in seconds) for a named operation"""
+    with _lock:
+        stats = _timings.get(name)
+        if stats is None:
+            stats = {"count": 0, "total": 0.0, "max": 0.0, "last": 0.0}
+            _timings[name] = stats
+        stats["count"] += 1
+        stats["total"] += seconds
+        stats["last"] = seconds
+        if seconds > stats["max"]:
+            stats["max"] = seconds
+
+
+@contextmanager
+def timed(name: str):
+    """Context manager recording the duration of the wrapped block"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_timing(name, time.perf_counter() - start)
+
+
+def snapshot() -> Dict[str, Any]:
+    """Return a copy of every counter and timing (times in milliseconds)"""
+    with _lock:
+        timings = {
+            name: {
+                "count": stats["count"],
+                "total_ms": round(stats["total"] * 1000, 3),
+                "avg_ms": round(stats["total"] * 1000 / stats["count"], 3),
+                "max_ms": round(stats["max"] * 1000, 3),
+                "last_ms": round(stats["last"] * 1000, 3),
+            }
+            for name, stats in _timings.items()
+        }
+        return {"counters": dict(_counters), "timings": timings}
+
+
+__all__ = [
+    "increment",
+    "record_timing",
+    "timed",
+    "snapshot",
+]
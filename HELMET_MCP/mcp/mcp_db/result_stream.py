@@ -0,0 +1,243 @@
+"""
+Result encoding for the repository read tools
+Rows are read from an unbuffered cursor in small batches and written straight
+into the JSON output, so a big result is never held as tuples + dicts + a
+pretty-printed string at the same time.
+
+Output formats:
+- "full": pretty-printed JSON (indent=2), one object per row
+- "stream": same content as compact JSON, written row by row
+- "ids": "stream" restricted to the identifying fields of the tool
+- "compact": columnar JSON for agents - column names once, rows as arrays,
+  all-null columns dropped, no echoed query_params / message
+
+Every encoded result records its size in bytes and estimated tokens.
+"""
+
+import io
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from metrics import increment
+
+OUTPUT_FORMATS = ["full", "stream", "ids", "compact"]
+
+# Compact separators: only "full" is pretty-printed
+COMPACT = (",", ":")
+
+# Keys left out of the compact format (echo of the request / human-oriented text)
+VERBOSE_KEYS = ("message", "query_params")
+
+# mysql.connector FieldType.JSON
+JSON_FIELD_TYPE = 245
+
+
+def serialize_value(value: Any) -> Any:
+    """JSON-friendly value for a database column (dates -> ISO, Decimal -> float)"""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
+def serialize_row(columns: Sequence[str], row: Sequence[Any]) -> Dict[str, Any]:
+    return {column: serialize_value(value) for column, value in zip(columns, row)}
+
+
+def json_columns(cursor) -> List[str]:
+    """Names of the JSON columns of an executed cursor (returned as strings by the driver)"""
+    return [desc[0] for desc in cursor.description if desc[1] == JSON_FIELD_TYPE]
+
+
+def iter_rows(cursor, batch_size: int = 200) -> Iterator[Sequence[Any]]:
+    """Yield rows from an executed (unbuffered) cursor, `batch_size` at a time"""
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            return
+        yield from rows
+
+
+def close_cursor(db, cursor) -> None:
+    """Close a cursor, draining unread rows first so the pooled connection stays usable"""
+    if cursor is None:
+        return
+    try:
+        if db.unread_result:
+            db.consume_results()
+    except Exception:
+        pass
+    cursor.close()
+
+
+def pick(item: Dict[str, Any], fields: List[str]) -> Dict[str, Any]:
+    return {field: item.get(field) for field in fields}
+
+
+def validate_fields(fields: Optional[List[str]], allowed: Sequence[str]) -> Optional[str]:
+    """Error message for an invalid field projection, None if valid"""
+    if fields is None:
+        return None
+    if not isinstance(fields, list) or not fields:
+        return "fields must be a non-empty list of column names"
+    unknown = [field for field in fields if field not in allowed]
+    if unknown:
+        return f"Unknown field(s) {unknown}. Available fields: {list(allowed)}"
+    return None
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, separators=COMPACT, ensure_ascii=False, default=str)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough LLM token count (~4 characters per token)"""
+    return (len(text) + 3) // 4
+
+
+def record_output(tool: str, output: str, format: str) -> str:
+    """Record the size of a tool result (bytes and estimated tokens) and return it unchanged"""
+    size = len(output.encode("utf-8"))
+    tokens = estimate_tokens(output)
+    increment(f"tool_output.{tool}.calls")
+    increment(f"tool_output.{tool}.bytes", size)
+    increment(f"tool_output.{tool}.tokens", tokens)
+    print(f"📏 {tool}: {size} bytes, ~{tokens} tokens ({format})")
+    return output
+
+
+def stream_json(
+    head: Dict[str, Any],
+    list_key: str,
+    items: Iterable[Dict[str, Any]],
+    tail: Callable[[], Dict[str, Any]],
+) -> str:
+    """
+    Write `{**head, list_key: [items...], **tail()}` incrementally
+
+    `tail` is called once every item has been written, so it can report
+    counts and statistics accumulated while iterating.
+    """
+    out = io.StringIO()
+    out.write("{")
+    for key, value in head.items():
+        out.write(f"{_dumps(key)}:{_dumps(value)},")
+
+    out.write(f"{_dumps(list_key)}:[")
+    for index, item in enumerate(items):
+        if index:
+            out.write(",")
+        out.write(_dumps(item))
+    out.write("]")
+
+    for key, value in tail().items():
+        out.write(f",{_dumps(key)}:{_dumps(value)}")
+    out.write("}")
+    return out.getvalue()
+
+
+def _parse_json_values(item: Dict[str, Any], columns: Sequence[str]) -> Dict[str, Any]:
+    for column in columns:
+        value = item.get(column)
+        if isinstance(value, (str, bytes)):
+            try:
+                item[column] = json.loads(value)
+            except ValueError:
+                pass
+    return item
+
+
+def columnar(items: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    {"columns": [...], "rows": [[...], ...]} with all-null columns dropped
+    and trailing nulls trimmed from each row
+    """
+    columns: List[str] = []
+    positions: Dict[str, int] = {}
+    rows: List[List[Any]] = []
+    for item in items:
+        row: List[Any] = [None] * len(columns)
+        for key, value in item.items():
+            if key not in positions:
+                positions[key] = len(columns)
+                columns.append(key)
+                row.append(None)
+            row[positions[key]] = value
+        rows.append(row)
+
+    keep = [
+        i for i in range(len(columns)) if any(i < len(row) and row[i] is not None for row in rows)
+    ]
+    compact_rows = []
+    for row in rows:
+        values = [row[i] if i < len(row) else None for i in keep]
+        while values and values[-1] is None:
+            values.pop()
+        compact_rows.append(values)
+    return {"columns": [columns[i] for i in keep], "rows": compact_rows}
+
+
+def encode_result(
+    tool: str,
+    format: str,
+    list_key: str,
+    items: Iterable[Dict[str, Any]],
+    tail: Callable[[], Dict[str, Any]],
+    fields: Optional[List[str]] = None,
+    json_fields: Sequence[str] = (),
+) -> str:
+    """
+    Encode a successful read result in the requested format
+
+    Args:
+        tool: Tool name used for the size metrics
+        format: One of OUTPUT_FORMATS ("ids" callers pass their id fields as `fields`)
+        list_key: Key of the row list ("tasks", "users", ...)
+        items: Serialised rows (consumed once, may be a generator over the cursor)
+        tail: Other keys of the result (message, summary, query_params...), called
+            after the rows have been consumed
+        fields: Optional projection applied to every row
+        json_fields: JSON columns decoded in the compact format
+
+    The "full" layout is {"success", **tail(), list_key}; the streamed ones
+    put the rows first and tail() after them.
+    """
+    if fields:
+        items = (pick(item, fields) for item in items)
+
+    if format == "full":
+        rows = list(items)
+        output = json.dumps(
+            {"success": True, **tail(), list_key: rows}, indent=2, ensure_ascii=False
+        )
+    elif format == "compact":
+        if json_fields:
+            items = (_parse_json_values(item, json_fields) for item in items)
+        table = columnar(items)
+        extra = {key: value for key, value in tail().items() if key not in VERBOSE_KEYS}
+        output = _dumps({"success": True, list_key: table, **extra})
+    else:
+        output = stream_json({"success": True}, list_key, items, tail)
+
+    return record_output(tool, output, format)
+
+
+__all__ = [
+    "OUTPUT_FORMATS",
+    "COMPACT",
+    "serialize_value",
+    "serialize_row",
+    "json_columns",
+    "iter_rows",
+    "close_cursor",
+    "pick",
+    "validate_fields",
+    "estimate_tokens",
+    "record_output",
+    "stream_json",
+    "columnar",
+    "encode_result",
+]
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Benchmark des filtres sur tableaux JSON (get_tasks / get_users)
+Compare, via EXPLAIN ANALYZE, la requête sans index (IGNORE INDEX, scan complet)
+et la même requête servie par l'index multi-valué : opérateurs de scan,
+lignes lues et durée.
+
+Usage : python schema/benchmark_json_indexes.py [--worker-id 3] [--skill plumbing_repair]
+"""
+
+import re
+import sys
+import time
+import argparse
+from pathlib import Path
+
+# Add the mcp_db directory to Python path to import mcp_init
+current_dir = Path(__file__).parent.resolve()
+sys.path.insert(0, str(current_dir.parent))
+
+from mcp_init import get_db_connection, release_db_connection
+
+
+def explain_analyze(cursor, query: str, params: tuple) -> dict:
+    """Exécute EXPLAIN ANALYZE et résume les opérateurs de scan"""
+    start = time.perf_counter()
+    cursor.execute(f"EXPLAIN ANALYZE {query}", params)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    columns = [desc[0] for desc in cursor.description]
+    scans = []
+    rows_read = 0
+    for row in cursor.fetchall():
+        plan = dict(zip(columns, row))
+        operator = str(plan.get("id", "")).strip(" └─│├")
+        if "Scan" in operator:
+            act_rows = int(plan.get("actRows") or 0)
+            # Les lectures de lignes par ROWID suivent un IndexRangeScan : pas de double comptage
+            if "RowIDScan" not in operator:
+                rows_read += act_rows
+            scans.append(re.sub(r"_\d+$", "", operator))
+    return {"scans": scans, "rows_read": rows_read, "ms": round(elapsed_ms, 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark des index multi-valués")
+    parser.add_argument("--worker-id", type=int, default=3)
+    parser.add_argument("--skill", default="electrical_installation")
+    parser.add_argument("--trade", default="electricity")
+    args = parser.parse_args()
+
+    cases = [
+        (
+            "get_tasks(assigned_to)",
+            "tasks",
+            "idx_assigned_workers",
+            "%s MEMBER OF (assigned_workers)",
+            (args.worker_id,),
+        ),
+        (
+            "get_users(primary_skill)",
+            "users",
+            "idx_primary_skills",
+            "%s MEMBER OF (primary_skills)",
+            (args.skill,),
+        ),
+        (
+            "get_users(trade_category)",
+            "users",
+            "idx_trade_categories",
+            "%s MEMBER OF (trade_categories)",
+            (args.trade,),
+        ),
+    ]
+
+    db = get_db_connection()
+    if not db:
+        print("❌ Erreur : Impossible de se connecter à la base de données")
+        sys.exit(1)
+
+    cursor = db.cursor(buffered=True)
+    try:
+        for label, table, index, condition, params in cases:
+            baseline = explain_analyze(
+                cursor,
+                f"SELECT id FROM {table} IGNORE INDEX ({index}) WHERE {condition}",
+                params,
+            )
+            indexed = explain_analyze(
+                cursor, f"SELECT id FROM {table} WHERE {condition}", params
+            )
+            print(f"\n📊 {label}")
+            print(
+                f"   sans index : {baseline['rows_read']:>7} lignes lues, "
+                f"{baseline['ms']:>7} ms  {baseline['scans']}"
+            )
+            print(
+                f"   avec index : {indexed['rows_read']:>7} lignes lues, "
+                f"{indexed['ms']:>7} ms  {indexed['scans']}"
+            )
+            if not any("IndexRangeScan" in scan or "IndexMerge" in scan for scan in indexed["scans"]):
+                print(f"   ⚠️  {index} n'est pas utilisé (index absent ? lancer execute_schema.py)")
+    finally:
+        cursor.close()
+        release_db_connection(db)
+
+
+if __name__ == "__main__":
+    main()
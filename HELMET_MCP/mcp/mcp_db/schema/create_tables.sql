@@ -149,6 +149,24 @@
 -- );
 
 ALTER TABLE notifications ADD COLUMN IF NOT EXISTS total_time_saved INT DEFAULT 0;
+ALTER TABLE notifications ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP;
+
+-- Keyset pagination / updated_since filters used by the backend API (ORDER BY updated_at, id)
+-- A NULL updated_at never matches the (updated_at, id) > cursor condition: backfill existing rows first
+UPDATE tasks SET updated_at = COALESCE(created_at, CURRENT_TIMESTAMP) WHERE updated_at IS NULL;
+UPDATE users SET updated_at = COALESCE(created_at, CURRENT_TIMESTAMP) WHERE updated_at IS NULL;
+UPDATE notifications SET updated_at = CURRENT_TIMESTAMP WHERE updated_at IS NULL;
+CREATE INDEX IF NOT EXISTS idx_updated_at_id ON tasks (updated_at, id);
+CREATE INDEX IF NOT EXISTS idx_updated_at_id ON users (updated_at, id);
+CREATE INDEX IF NOT EXISTS idx_updated_at_id ON notifications (updated_at, id);
+
+-- Multi-valued indexes for the JSON array filters of get_tasks / get_users (MEMBER OF)
+-- assigned_workers must only hold integers: execute_schema.py normalises existing rows first
+CREATE INDEX IF NOT EXISTS idx_assigned_workers ON tasks ((CAST(assigned_workers AS UNSIGNED ARRAY)));
+CREATE INDEX IF NOT EXISTS idx_primary_skills ON users ((CAST(primary_skills AS CHAR(128) ARRAY)));
+CREATE INDEX IF NOT EXISTS idx_trade_categories ON users ((CAST(trade_categories AS CHAR(128) ARRAY)));
+CREATE INDEX IF NOT EXISTS idx_certifications ON users ((CAST(certifications AS CHAR(128) ARRAY)));
+CREATE INDEX IF NOT EXISTS idx_safety_training ON users ((CAST(safety_training AS CHAR(128) ARRAY)));
 
 -- CREATE TABLE notifications (
 --    -- Basic identity
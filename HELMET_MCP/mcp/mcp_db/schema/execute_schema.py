@@ -7,14 +7,15 @@ Gère mieux le parsing des requêtes SQL multiples
 import os
 import sys
 import re
+import json
 from pathlib import Path
 
-# Add the src directory to Python path to import db_client
+# Add the mcp_db directory to Python path to import mcp_init
 current_dir = Path(__file__).parent.resolve()
-sys.path.insert(0, str(current_dir))
+sys.path.insert(0, str(current_dir.parent))
 
 try:
-    from src.mcp.mcp_db.mcp_init import get_db_connection
+    from mcp_init import get_db_connection, release_db_connection
 except ImportError:
     print("❌ Erreur : Impossible d'importer get_db_connection")
     print("Assurez-vous que le module db_client est accessible")
@@ -121,11 +122,12 @@ def execute_sql_file(file_path: str) -> bool:
         print("❌ Erreur : Impossible de se connecter à la base de données")
         return False
 
-    cursor = db.cursor(buffered=True)
+    cursor = None
     success_count = 0
     error_count = 0
 
     try:
+        cursor = db.cursor(buffered=True)
         # Exécuter chaque requête individuellement
         for i, statement in enumerate(statements, 1):
             try:
@@ -189,7 +191,94 @@ def execute_sql_file(file_path: str) -> bool:
         return False
 
     finally:
-        cursor.close()
+        if cursor is not None:
+            cursor.close()
+        release_db_connection(db)
+
+
+def _worker_id(value):
+    """ID entier d'un élément de assigned_workers (3, "3" ou {"id": 3}), None si non numérique"""
+    if isinstance(value, dict):
+        value = value.get("id")
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value if value >= 0 else None
+    if isinstance(value, str) and value.strip().isdigit():
+        return int(value.strip())
+    return None
+
+
+def normalize_assigned_workers() -> bool:
+    """
+    Convertit les IDs de tasks.assigned_workers en entiers (["3", 6] -> [3, 6])
+    Requis par l'index multi-valué idx_assigned_workers (CAST ... AS UNSIGNED ARRAY)
+    Les IDs non numériques sont retirés (et signalés) pour que les autres lignes soient converties
+    """
+    db = get_db_connection()
+    if not db:
+        print("❌ Erreur : Impossible de se connecter à la base de données")
+        return False
+
+    cursor = None
+    try:
+        cursor = db.cursor(buffered=True)
+        cursor.execute("SELECT id, assigned_workers FROM tasks")
+        updates = []
+        for task_id, assigned_workers in cursor.fetchall():
+            try:
+                workers = json.loads(assigned_workers) if assigned_workers else []
+            except (TypeError, ValueError):
+                print(f"⚠️  Tâche {task_id} : assigned_workers illisible, remplacé par []")
+                workers = None
+            if workers is not None and not isinstance(workers, list):
+                workers = [workers]
+
+            normalized = []
+            for worker in workers or []:
+                worker_id = _worker_id(worker)
+                if worker_id is None:
+                    print(f"⚠️  Tâche {task_id} : ID de travailleur non numérique retiré ({worker!r})")
+                else:
+                    normalized.append(worker_id)
+            if normalized != workers:
+                updates.append((json.dumps(normalized), task_id))
+
+        if updates:
+            cursor.executemany(
+                "UPDATE tasks SET assigned_workers = %s WHERE id = %s", updates
+            )
+            db.commit()
+        print(f"✅ assigned_workers normalisé ({len(updates)} tâche(s) corrigée(s))")
+        return True
+    except Exception as e:
+        print(f"⚠️  Normalisation de assigned_workers impossible : {e}")
+        return False
+    finally:
+        if cursor is not None:
+            cursor.close()
+        release_db_connection(db)
+
+
+def migrate_vector_indexes() -> bool:
+    """
+    Ajoute les index vectoriels HNSW (TiFlash) sur task_vectors et user_vectors
+    Idempotent : peut être relancé à chaque déploiement
+    """
+    try:
+        from tools.embedding.vector import get_vector_manager
+
+        vector_manager = get_vector_manager()
+        created = vector_manager.ensure_vector_indexes()
+        for table_name, status in vector_manager.vector_index_status().items():
+            print(
+                f"   {table_name} : {status['progress']}% indexé "
+                f"({status['pending_rows']} lignes en attente)"
+            )
+        return all(created.values())
+    except Exception as e:
+        print(f"❌ Erreur création des index vectoriels : {e}")
+        return False
 
 
 def main():
@@ -198,7 +287,7 @@ def main():
     print("=" * 50)
 
     # Chemin vers le fichier SQL
-    sql_file_path = "src/mcp/mcp_db/schema/create_tables.sql"
+    sql_file_path = str(current_dir / "create_tables.sql")
 
     if not os.path.exists(sql_file_path):
         print(f"❌ Fichier {sql_file_path} introuvable")
@@ -216,9 +305,19 @@ def main():
         print("❌ Opération annulée")
         return
 
+    # Les index multi-valués du fichier SQL exigent des IDs entiers
+    print("\n🔢 Normalisation de tasks.assigned_workers...")
+    if not normalize_assigned_workers():
+        print("❌ Schéma non exécuté : idx_assigned_workers échouerait sur les lignes non converties")
+        return
+
     # Exécuter le fichier
     success = execute_sql_file(sql_file_path)
 
+    # Migration : index vectoriels
+    print("\n🧭 Création des index vectoriels HNSW...")
+    success = migrate_vector_indexes() and success
+
     if success:
         print("\n✅ Le schéma de base de données a été créé avec succès !")
         print("\n📊 Vous pouvez maintenant utiliser les outils MCP pour :")
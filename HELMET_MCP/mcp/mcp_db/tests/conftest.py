@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Tests import the server modules the way mcp_server.py does (mcp_db is the import root)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
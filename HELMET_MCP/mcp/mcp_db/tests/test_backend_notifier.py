@@ -0,0 +1,27 @@
+import json
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+pytest.importorskip("requests")
+
+from backend_notifier import build_change_event, serialize_change_row
+
+
+def test_change_row_matches_rest_rows():
+    updated_at = datetime(2025, 9, 6, 16, 30)
+    row = serialize_change_row(
+        ["id", "action_list", "total_time_saved", "updated_at"],
+        (7, '["Move task 3"]', Decimal("1.5"), updated_at),
+    )
+
+    assert row == {
+        "id": 7,
+        "action_list": '["Move task 3"]',
+        "total_time_saved": 1.5,
+        "updated_at": "2025-09-06T16:30:00",
+    }
+    assert json.loads(json.dumps(row)) == row
+    event = build_change_event("notification", 7, "update", ["action_list"], row)
+    assert event["version"] == int(updated_at.timestamp() * 1000)
@@ -0,0 +1,91 @@
+from datetime import datetime
+
+from tools.scheduling.dependencies import (
+    DependencyGraph,
+    DependencyGraphCache,
+    dependency_graph_cache,
+    invalidate_dependency_graph,
+)
+
+
+def _task(task_id, start_hour, due_hour, dependencies=None):
+    return {
+        "id": task_id,
+        "title": f"Task {task_id}",
+        "status": "pending",
+        "start_date": datetime(2025, 9, 8, start_hour),
+        "due_date": datetime(2025, 9, 8, due_hour),
+        "dependencies": dependencies,
+        "blocks_tasks": None,
+    }
+
+
+def _graph():
+    # 1 -> 2 -> 4 is the critical chain, 1 -> 3 -> 4 a parallel branch with 4h of slack,
+    # 5 <-> 6 a cycle
+    return DependencyGraph(
+        [
+            _task(1, 8, 10),
+            _task(2, 10, 16, "[1]"),
+            _task(3, 10, 12, "[1]"),
+            _task(4, 16, 18, "[2, 3]"),
+            _task(5, 8, 9, "[6]"),
+            _task(6, 9, 10, "[5]"),
+        ]
+    )
+
+
+def test_cycle_is_reported_and_left_out_of_the_order():
+    graph = _graph()
+
+    assert graph.cycles() == [[5, 6]]
+    assert graph.order == [1, 2, 3, 4]
+    assert graph.cyclic == {5, 6}
+
+
+def test_slack_on_parallel_branch():
+    graph = _graph()
+
+    assert graph.slack_hours(3) == 4
+    assert graph.slack_hours(2) == 0
+    assert graph.slack_hours(5) is None
+
+
+def test_critical_path():
+    assert _graph().critical_path() == [1, 2, 4]
+
+
+def test_delay_partly_absorbed_by_slack():
+    impacts = {impact["task_id"]: impact for impact in _graph().propagate_delay(3, 6)}
+
+    assert list(impacts) == [3, 4]
+    assert impacts[3]["shift_hours"] == 6
+    # 4h of the delay fit in task 3's slack, task 4 moves by the remaining 2h
+    assert impacts[4]["shift_hours"] == 2
+    assert impacts[4]["new_start_date"] == "2025-09-08T18:00:00"
+
+
+def test_cache_rebuilds_after_invalidate():
+    builds = []
+
+    def loader():
+        builds.append(1)
+        return [_task(1, 8, 10)]
+
+    cache = DependencyGraphCache(ttl=60)
+    first = cache.get(loader)
+    assert cache.get(loader) is first
+    assert len(builds) == 1
+
+    cache.invalidate()
+    assert cache.get(loader) is not first
+    assert len(builds) == 2
+
+
+def test_task_write_invalidates_shared_cache():
+    first = dependency_graph_cache.get(lambda: [_task(1, 8, 10)])
+
+    invalidate_dependency_graph()  # Called by create_task / update_task
+    rebuilt = dependency_graph_cache.get(lambda: [_task(1, 8, 10), _task(2, 10, 12, "[1]")])
+    assert rebuilt is not first
+    assert rebuilt.order == [1, 2]
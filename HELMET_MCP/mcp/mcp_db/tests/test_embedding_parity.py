@@ -0,0 +1,26 @@
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("sqlalchemy")
+pytest.importorskip("dotenv")
+pytest.importorskip("sentence_transformers")
+pytest.importorskip("onnxruntime")
+
+from tools.embedding.parity import (
+    DEFAULT_COSINE_TOLERANCE,
+    DEFAULT_MIN_TOP_K_OVERLAP,
+    SAMPLE_DOCUMENTS,
+    SAMPLE_QUERIES,
+    check_parity,
+    parity_failures,
+)
+
+
+@pytest.mark.parametrize("backend", ["onnx", "onnx-int8"])
+def test_backend_matches_torch(backend):
+    report = check_parity(backend, documents=SAMPLE_DOCUMENTS, queries=SAMPLE_QUERIES, k=5)
+
+    assert report["texts"] == len(SAMPLE_QUERIES) + len(SAMPLE_DOCUMENTS)
+    assert parity_failures(
+        report, backend, DEFAULT_COSINE_TOLERANCE, DEFAULT_MIN_TOP_K_OVERLAP
+    ) == []
@@ -0,0 +1,24 @@
+import pytest
+
+pytest.importorskip("sqlalchemy")
+pytest.importorskip("dotenv")
+
+from tools.embedding.vector import EmbeddingService
+
+
+class FakeModel:
+    def get_sentence_embedding_dimension(self):
+        return 3
+
+
+def test_cache_key_follows_torch_fallback(monkeypatch):
+    service = EmbeddingService("all-MiniLM-L6-v2", backend="onnx")
+
+    def load():
+        if service.backend != "torch":
+            raise ImportError("onnxruntime is not installed")
+        return FakeModel()
+
+    monkeypatch.setattr(service, "_load", load)
+    assert service.cache_key == "all-MiniLM-L6-v2"
+    assert service.backend == "torch"
@@ -0,0 +1,48 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from tools.embedding.local_index import LocalVectorIndex
+
+
+def _index():
+    return LocalVectorIndex("user_vectors", engine_factory=lambda: None)
+
+
+def _assert_consistent(index):
+    assert len(index._ids) == len(index._documents) == len(index._metadatas)
+    assert index._matrix.shape[0] == len(index._ids)
+    for doc_id, position in index._positions.items():
+        assert index._ids[position] == doc_id
+
+
+def test_upsert_new_ids_get_consecutive_positions():
+    index = _index()
+    index.upsert(
+        ["a", "b", "c"],
+        [[1, 0], [0, 1], [1, 1]],
+        ["doc a", "doc b", "doc c"],
+        [{"n": 1}, {"n": 2}, {"n": 3}],
+    )
+    assert index._positions == {"a": 0, "b": 1, "c": 2}
+    _assert_consistent(index)
+
+    index.upsert(["b"], [[1, 0]], ["doc b v2"], [{"n": 20}])
+    _assert_consistent(index)
+    position = index._positions["b"]
+    assert index._documents[position] == "doc b v2"
+    assert index._metadatas[position] == {"n": 20}
+    assert np.allclose(index._matrix[position], [1, 0])
+    assert index._documents[index._positions["c"]] == "doc c"
+
+
+def test_upsert_repeated_new_id_in_one_batch_and_remove():
+    index = _index()
+    index.upsert(["a"], [[1, 0]], ["doc a"], [{}])
+    index.upsert(["b", "b", "c"], [[0, 1], [1, 1], [1, 0]], ["b1", "b2", "c"], [{}, {}, {}])
+    _assert_consistent(index)
+    assert index._documents[index._positions["b"]] == "b2"
+
+    index.remove(["a"])
+    _assert_consistent(index)
+    assert index._ids == ["b", "c"]
@@ -0,0 +1,64 @@
+from datetime import datetime
+
+from tools.scheduling.solver import ScheduleSolver, WorkingHours
+
+
+def _task(task_id, start, due, workers, room, priority=1, dependencies="[]"):
+    return {
+        "id": task_id,
+        "title": f"Task {task_id}",
+        "status": "pending",
+        "priority": priority,
+        "start_date": start,
+        "due_date": due,
+        "max_estimated_hours": 2,
+        "assigned_workers": workers,
+        "required_worker_count": 1,
+        "skill_requirements": '["excavation"]',
+        "trade_category": "excavation",
+        "room": room,
+        "floor": 0,
+        "building_section": "A",
+        "required_equipment": "[]",
+        "dependencies": dependencies,
+        "blocks_tasks": "[]",
+    }
+
+
+WORKERS = {7: {"role": "worker", "primary_skills": '["excavation"]'}}
+
+
+def _at(hour):
+    return datetime(2025, 9, 8, hour, 0)
+
+
+def test_keep_team_waits_for_busy_assigned_worker():
+    tasks = [
+        _task(1, _at(8), _at(10), "[7]", "R1"),
+        # Fixed obstacle: worker 7 busy 10:00-12:00
+        _task(2, _at(10), _at(12), "[7]", "R2"),
+    ]
+    solver = ScheduleSolver(tasks, WORKERS, [1], WorkingHours("06:30-19:30"), not_before=_at(9))
+
+    for strategy in ("keep_team", "earliest_start"):
+        plan = solver.solve(strategy)
+        assert plan.unscheduled == [], strategy
+        placement = plan.placements[1]
+        assert placement.start == _at(12)
+        assert placement.due == _at(14)
+        assert placement.workers == [7]
+
+
+def test_ready_tasks_are_placed_by_priority():
+    tasks = [
+        _task(1, _at(8), _at(10), "[7]", "R1", priority=0),
+        _task(2, _at(8), _at(10), "[7]", "R2", priority=3),
+        _task(3, _at(8), _at(10), "[7]", "R3", priority=1, dependencies="[2]"),
+    ]
+    solver = ScheduleSolver(tasks, WORKERS, [1, 2], WorkingHours("06:30-19:30"))
+
+    assert solver.affected == [2, 3, 1]
+    plan = solver.solve("keep_team")
+    assert plan.placements[2].start == _at(8)
+    assert plan.placements[3].start == _at(10)
+    assert plan.placements[1].start == _at(12)
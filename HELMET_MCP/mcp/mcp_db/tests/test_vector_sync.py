@@ -0,0 +1,105 @@
+import time
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+pytest.importorskip("dotenv")
+
+from tools.vector_sync import VectorSync
+
+
+class FlakyManager:
+    """Vector manager whose task upserts fail `failures` times"""
+
+    def __init__(self, failures):
+        self.failures = failures
+        self.upserted = []
+
+    def upsert_task_vectors(self, rows, batch_size=32):
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("database unavailable")
+        self.upserted.extend(rows)
+        return [f"task_{task_id}" for task_id, _ in rows]
+
+    def delete_task_vectors(self, task_ids):
+        return len(task_ids)
+
+    upsert_user_vectors = upsert_task_vectors
+    delete_user_vectors = delete_task_vectors
+
+
+def _sync(manager, max_retries=3):
+    sync = VectorSync(batch_window=0.01, max_retries=max_retries, retry_backoff=0)
+    sync._vector_manager = manager
+    return sync
+
+
+def test_failed_batch_is_retried():
+    manager = FlakyManager(failures=2)
+    sync = _sync(manager)
+
+    sync.enqueue("task", 1, {"title": "Pose placo"}, "create")
+    assert sync.flush(5)
+    assert manager.upserted == [(1, {"title": "Pose placo"})]
+
+
+def test_retries_are_bounded():
+    manager = FlakyManager(failures=10)
+    sync = _sync(manager, max_retries=2)
+
+    sync.enqueue("task", 1, {"title": "Pose placo"}, "create")
+    assert sync.flush(5)
+    assert manager.upserted == []
+    assert manager.failures == 7
+    assert sync._last_enqueued == {}
+
+
+def test_retry_does_not_override_newer_change():
+    manager = FlakyManager(failures=1)
+    sync = _sync(manager)
+
+    # A newer change of the row was queued while the failing batch was processed
+    sync._last_enqueued[("task", 1)] = 2.0
+    sync._process_batch([("task", 1, {"title": "old"}, "update", 1.0, 0, 0.0)])
+    assert sync._queue.empty()
+
+
+class TaskOutage(FlakyManager):
+    """Task upserts always fail, user upserts succeed"""
+
+    def __init__(self):
+        super().__init__(failures=0)
+
+    def upsert_task_vectors(self, rows, batch_size=32):
+        raise RuntimeError("database unavailable")
+
+    def upsert_user_vectors(self, rows, batch_size=32):
+        self.upserted.extend(rows)
+        return [f"user_{user_id}" for user_id, _ in rows]
+
+
+def test_pending_retry_does_not_block_other_changes():
+    manager = TaskOutage()
+    sync = VectorSync(batch_window=0.01, max_retries=3, retry_backoff=60)
+    sync._vector_manager = manager
+
+    sync.enqueue("task", 1, {"title": "Pose placo"}, "create")
+    assert not sync.flush(0.2)  # Task retry deferred for a minute
+    sync.enqueue("user", 2, {"name": "Karim"}, "update")
+
+    deadline = time.monotonic() + 2
+    while not manager.upserted and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert manager.upserted == [(2, {"name": "Karim"})]
+    assert sync.pending() == 1
+
+
+def test_synced_rows_are_forgotten():
+    manager = FlakyManager(failures=1)
+    sync = _sync(manager)
+
+    sync.enqueue("task", 1, {"title": "Pose placo"}, "create")
+    sync.enqueue("user", 2, {"name": "Karim"}, "update")
+    assert sync.flush(5)
+    assert sync._last_enqueued == {}
@@ -0,0 +1,310 @@
+"""
+Embedding caches
+Identical texts are encoded once: later lookups return the stored vector instead
+of running the transformer again.
+
+- EmbeddingCache: document embeddings keyed by content hash (vector sync)
+- QueryEmbeddingCache: search query embeddings with a TTL (semantic search tools)
+"""
+
+import re
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+from metrics import increment
+
+
+def text_hash(text: str) -> str:
+    """sha256 of a text, used as the cache key"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class TiDBEmbeddingStore:
+    """
+    Persistent embedding store in a TiDB table, shared by every process.
+    The table is created on first use.
+    """
+
+    TABLE_NAME = "embedding_cache"
+
+    def __init__(self, engine_factory: Callable):
+        self._engine_factory = engine_factory
+        self._table_ready = False
+
+    def _engine(self):
+        from sqlalchemy import text
+
+        engine = self._engine_factory()
+        if not self._table_ready:
+            with engine.begin() as connection:
+                connection.execute(
+                    text(
+                        f"""
+                        CREATE TABLE IF NOT EXISTS {self.TABLE_NAME} (
+                            model VARCHAR(255) NOT NULL,
+                            text_hash CHAR(64) NOT NULL,
+                            embedding JSON NOT NULL,
+                            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                            PRIMARY KEY (model, text_hash)
+                        )
+                        """
+                    )
+                )
+            self._table_ready = True
+        return engine
+
+    def get_many(self, model: str, hashes: List[str]) -> Dict[str, List[float]]:
+        from sqlalchemy import text
+
+        if not hashes:
+            return {}
+        params = {f"h_{i}": value for i, value in enumerate(hashes)}
+        placeholders = ", ".join(f":{name}" for name in params)
+        with self._engine().connect() as connection:
+            rows = connection.execute(
+                text(
+                    f"SELECT text_hash, embedding FROM {self.TABLE_NAME} "
+                    f"WHERE model = :model AND text_hash IN ({placeholders})"
+                ),
+                {"model": model, **params},
+            ).fetchall()
+        return {
+            row[0]: json.loads(row[1]) if isinstance(row[1], str) else row[1]
+            for row in rows
+        }
+
+    def put_many(self, model: str, items: Dict[str, List[float]]) -> None:
+        from sqlalchemy import text
+
+        if not items:
+            return
+        with self._engine().begin() as connection:
+            connection.execute(
+                text(
+                    f"""
+                    INSERT INTO {self.TABLE_NAME} (model, text_hash, embedding)
+                    VALUES (:model, :text_hash, :embedding)
+                    ON DUPLICATE KEY UPDATE embedding = VALUES(embedding)
+                    """
+                ),
+                [
+                    {"model": model, "text_hash": key, "embedding": json.dumps(value)}
+                    for key, value in items.items()
+                ],
+            )
+
+
+class EmbeddingCache:
+    """
+    In-memory LRU of embeddings keyed by (model name, sha256 of the text),
+    optionally backed by a persistent store consulted on memory misses.
+    """
+
+    def __init__(self, max_entries: int = 10000, store=None):
+        self.max_entries = max_entries
+        self.store = store
+        self._entries: "OrderedDict[Tuple[str, str], List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.store_hits = 0
+        self.misses = 0
+
+    def _remember(self, key: Tuple[str, str], embedding: List[float]) -> None:
+        self._entries[key] = embedding
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get_many(self, model: str, texts: List[str]) -> Dict[str, List[float]]:
+        """Return the cached embeddings of `texts` (missing texts are left out)"""
+        hashes = {text: text_hash(text) for text in texts}
+        found: Dict[str, List[float]] = {}
+
+        with self._lock:
+            for text, key in hashes.items():
+                embedding = self._entries.get((model, key))
+                if embedding is not None:
+                    self._entries.move_to_end((model, key))
+                    found[text] = embedding
+
+        memory_hits = len(found)
+        store_hits = 0
+        missing = {text: key for text, key in hashes.items() if text not in found}
+        if missing and self.store is not None:
+            try:
+                stored = self.store.get_many(model, list(missing.values()))
+            except Exception as e:
+                print(f"⚠️  Embedding cache store read failed: {e}")
+                stored = {}
+            with self._lock:
+                for text, key in missing.items():
+                    if key in stored:
+                        found[text] = stored[key]
+                        self._remember((model, key), stored[key])
+                        store_hits += 1
+
+        misses = len(hashes) - len(found)
+        with self._lock:
+            self.hits += memory_hits
+            self.store_hits += store_hits
+            self.misses += misses
+        increment("embedding_cache.hits", memory_hits)
+        increment("embedding_cache.store_hits", store_hits)
+        increment("embedding_cache.misses", misses)
+        return found
+
+    def put_many(self, model: str, embeddings: Dict[str, List[float]]) -> None:
+        """Cache freshly computed embeddings (text -> vector)"""
+        hashed = {text_hash(text): embedding for text, embedding in embeddings.items()}
+        with self._lock:
+            for key, embedding in hashed.items():
+                self._remember((model, key), embedding)
+        if self.store is not None:
+            try:
+                self.store.put_many(model, hashed)
+            except Exception as e:
+                print(f"⚠️  Embedding cache store write failed: {e}")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.store_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "store_hits": self.store_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.hits + self.store_hits) / lookups, 4)
+                if lookups
+                else 0.0,
+            }
+
+
+def normalize_query(query: str) -> str:
+    """Case-fold and collapse whitespace so near-identical queries share a key"""
+    return re.sub(r"\s+", " ", query).strip().casefold()
+
+
+class QueryEmbeddingCache:
+    """
+    LRU of search-query embeddings with a TTL and a memory cap in bytes,
+    keyed by (model name, normalised query text).
+    """
+
+    def __init__(self, max_bytes: int = 8 * 1024 * 1024, ttl: float = 600.0):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        # key -> (embedding, expires_at, size in bytes)
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[List[float], float, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+
+    @staticmethod
+    def _size(key: Tuple[str, str], embedding: List[float]) -> int:
+        # 8 bytes per float plus the key text
+        return len(embedding) * 8 + len(key[0]) + len(key[1])
+
+    def _evict(self, key: Tuple[str, str]) -> None:
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+    def get(self, model: str, query: str) -> Optional[List[float]]:
+        key = (model, normalize_query(query))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] < time.monotonic():
+                self._evict(key)
+                self.expired += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                increment("query_cache.misses")
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        increment("query_cache.hits")
+        return entry[0]
+
+    def put(self, model: str, query: str, embedding: List[float]) -> None:
+        key = (model, normalize_query(query))
+        size = self._size(key, embedding)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._evict(key)
+            self._entries[key] = (embedding, time.monotonic() + self.ttl, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                self._evict(next(iter(self._entries)))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "expired": self.expired,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+_embedding_cache: Optional[EmbeddingCache] = None
+_embedding_cache_lock = threading.Lock()
+
+
+def get_embedding_cache(max_entries: int = 10000) -> EmbeddingCache:
+    """Get the process-wide content-hash embedding cache"""
+    global _embedding_cache
+    if _embedding_cache is None:
+        with _embedding_cache_lock:
+            if _embedding_cache is None:
+                _embedding_cache = EmbeddingCache(max_entries)
+    return _embedding_cache
+
+
+_query_cache: Optional[QueryEmbeddingCache] = None
+_query_cache_lock = threading.Lock()
+
+
+def get_query_cache(
+    max_bytes: int = 8 * 1024 * 1024, ttl: float = 600.0
+) -> QueryEmbeddingCache:
+    """Get the process-wide query embedding cache"""
+    global _query_cache
+    if _query_cache is None:
+        with _query_cache_lock:
+            if _query_cache is None:
+                _query_cache = QueryEmbeddingCache(max_bytes, ttl)
+    return _query_cache
+
+
+__all__ = [
+    "text_hash",
+    "normalize_query",
+    "TiDBEmbeddingStore",
+    "EmbeddingCache",
+    "QueryEmbeddingCache",
+    "get_embedding_cache",
+    "get_query_cache",
+]
@@ -0,0 +1,281 @@
+"""
+In-process copy of a vector table (NumPy) for very fast k-NN on small tables
+Used for user matching: a few thousand workers fit in a float32 matrix and a
+top-k is one matrix product instead of a TiDB round-trip.
+"""
+
+import json
+import time
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from metrics import increment, record_timing
+
+
+class LocalVectorIndex:
+    """
+    Float32 matrix of L2-normalised embeddings plus ids, documents and metadata.
+
+    - Writes made through TiDBVectorManager are applied immediately (upsert/remove)
+    - A daemon thread polls `update_time` to pick up writes from other processes
+      and reloads everything when the row count drifts (deletes)
+    - `is_fresh()` is False when the last successful sync is older than `max_staleness`;
+      callers then fall back to TiDB
+    """
+
+    def __init__(
+        self,
+        table_name: str,
+        engine_factory: Callable,
+        refresh_interval: float = 10.0,
+        max_staleness: float = 60.0,
+    ):
+        self.table_name = table_name
+        self._engine_factory = engine_factory
+        self.refresh_interval = refresh_interval
+        self.max_staleness = max_staleness
+
+        self._lock = threading.RLock()
+        self._ids: List[str] = []
+        self._positions: Dict[str, int] = {}
+        self._documents: List[str] = []
+        self._metadatas: List[Dict[str, Any]] = []
+        self._matrix = np.zeros((0, 0), dtype=np.float32)
+
+        self._last_update_time = None
+        self._last_sync: Optional[float] = None
+        self._poller: Optional[threading.Thread] = None
+
+    # ------------------------------------------------------------------
+    # State
+    # ------------------------------------------------------------------
+
+    def is_fresh(self) -> bool:
+        return (
+            self._last_sync is not None
+            and time.monotonic() - self._last_sync <= self.max_staleness
+        )
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    @staticmethod
+    def _parse_embedding(value: Any) -> List[float]:
+        if isinstance(value, (bytes, bytearray)):
+            value = value.decode("utf-8")
+        return json.loads(value) if isinstance(value, str) else list(value)
+
+    @staticmethod
+    def _parse_metadata(value: Any) -> Dict[str, Any]:
+        if isinstance(value, (bytes, bytearray)):
+            value = value.decode("utf-8")
+        return json.loads(value) if isinstance(value, str) else (value or {})
+
+    # ------------------------------------------------------------------
+    # Sync
+    # ------------------------------------------------------------------
+
+    def upsert(
+        self,
+        ids: List[str],
+        embeddings: List[List[float]],
+        documents: List[str],
+        metadatas: List[Dict[str, Any]],
+    ) -> None:
+        """Apply written vectors to the local copy"""
+        if not ids:
+            return
+        vectors = self._normalize(np.asarray(embeddings, dtype=np.float32))
+        with self._lock:
+            # Rows below `stored` are in the matrix, new rows are stacked after them
+            stored = len(self._ids)
+            new_rows = []
+            for doc_id, vector, document, metadata in zip(
+                ids, vectors, documents, metadatas
+            ):
+                position = self._positions.get(doc_id)
+                if position is None:
+                    self._positions[doc_id] = len(self._ids)
+                    new_rows.append(vector)
+                    self._ids.append(doc_id)
+                    self._documents.append(document)
+                    self._metadatas.append(metadata)
+                else:
+                    if position < stored:
+                        self._matrix[position] = vector
+                    else:
+                        new_rows[position - stored] = vector
+                    self._documents[position] = document
+                    self._metadatas[position] = metadata
+            if new_rows:
+                rows = np.vstack(new_rows)
+                self._matrix = (
+                    rows if self._matrix.size == 0 else np.vstack([self._matrix, rows])
+                )
+
+    def remove(self, ids: List[str]) -> None:
+        """Drop deleted vectors from the local copy"""
+        with self._lock:
+            removed = {self._positions[doc_id] for doc_id in ids if doc_id in self._positions}
+            if not removed:
+                return
+            keep = [i for i in range(len(self._ids)) if i not in removed]
+            self._ids = [self._ids[i] for i in keep]
+            self._documents = [self._documents[i] for i in keep]
+            self._metadatas = [self._metadatas[i] for i in keep]
+            self._matrix = self._matrix[keep]
+            self._positions = {doc_id: i for i, doc_id in enumerate(self._ids)}
+
+    def refresh(self, full: bool = False) -> None:
+        """
+        Pull rows changed since the last sync (`update_time` poll),
+        or reload everything when `full` or when deletes are detected
+        """
+        from sqlalchemy import text
+
+        start = time.perf_counter()
+        engine = self._engine_factory()
+        with engine.connect() as connection:
+            if not full and self._last_update_time is not None:
+                count = connection.execute(
+                    text(f"SELECT COUNT(*) FROM {self.table_name}")
+                ).scalar()
+                # Rows deleted by another process: the poll cannot see them
+                full = count != len(self._ids)
+
+            if full or self._last_update_time is None:
+                rows = connection.execute(
+                    text(
+                        f"SELECT id, embedding, document, meta, update_time FROM {self.table_name}"
+                    )
+                ).fetchall()
+            else:
+                rows = connection.execute(
+                    text(
+                        f"SELECT id, embedding, document, meta, update_time FROM {self.table_name} "
+                        f"WHERE update_time >= :since"
+                    ),
+                    {"since": self._last_update_time},
+                ).fetchall()
+                full = False
+
+        with self._lock:
+            if full or self._last_update_time is None:
+                self._ids, self._documents, self._metadatas = [], [], []
+                self._positions = {}
+                self._matrix = np.zeros((0, 0), dtype=np.float32)
+            if rows:
+                self.upsert(
+                    [row[0] for row in rows],
+                    [self._parse_embedding(row[1]) for row in rows],
+                    [row[2] for row in rows],
+                    [self._parse_metadata(row[3]) for row in rows],
+                )
+                update_times = [row[4] for row in rows if row[4] is not None]
+                if update_times:
+                    self._last_update_time = max(update_times)
+            if self._last_update_time is None:
+                # Empty table: poll from now on
+                self._last_update_time = "1970-01-01 00:00:00"
+            self._last_sync = time.monotonic()
+
+        record_timing(f"local_index.{self.table_name}.refresh", time.perf_counter() - start)
+
+    def start(self) -> None:
+        """Load the table once and keep polling it in the background"""
+        if self._poller is not None and self._poller.is_alive():
+            return
+        self._poller = threading.Thread(
+            target=self._poll, name=f"local-index-{self.table_name}", daemon=True
+        )
+        self._poller.start()
+
+    def _poll(self) -> None:
+        while True:
+            try:
+                self.refresh()
+            except Exception as e:
+                increment(f"local_index.{self.table_name}.refresh_errors")
+                print(f"⚠️  Local vector index refresh failed ({self.table_name}): {e}")
+            time.sleep(self.refresh_interval)
+
+    # ------------------------------------------------------------------
+    # Search
+    # ------------------------------------------------------------------
+
+    def search(
+        self, query_embedding: List[float], k: int, filters=None
+    ) -> List[Tuple[str, str, Dict[str, Any], float]]:
+        """
+        Exact top-k by cosine distance (one matmul + argpartition)
+
+        Args:
+            filters: object with a `matches(metadata, distance)` method (VectorFilter)
+
+        Returns:
+            (id, document, metadata, distance) tuples, closest first
+        """
+        start = time.perf_counter()
+        query = np.asarray(query_embedding, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm:
+            query = query / norm
+
+        with self._lock:
+            if not self._ids:
+                return []
+            distances = 1.0 - self._matrix @ query
+
+            candidates = np.arange(len(self._ids))
+            if filters is not None:
+                mask = np.fromiter(
+                    (
+                        filters.matches(metadata, float(distance))
+                        for metadata, distance in zip(self._metadatas, distances)
+                    ),
+                    dtype=bool,
+                    count=len(self._ids),
+                )
+                candidates = candidates[mask]
+
+            if len(candidates) > k:
+                top = np.argpartition(distances[candidates], k - 1)[:k]
+                candidates = candidates[top]
+            candidates = candidates[np.argsort(distances[candidates])]
+
+            results = [
+                (
+                    self._ids[i],
+                    self._documents[i],
+                    self._metadatas[i],
+                    float(distances[i]),
+                )
+                for i in candidates
+            ]
+
+        record_timing(f"local_index.{self.table_name}.search", time.perf_counter() - start)
+        return results
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "rows": len(self._ids),
+            "fresh": self.is_fresh(),
+            "seconds_since_sync": (
+                round(time.monotonic() - self._last_sync, 3)
+                if self._last_sync is not None
+                else None
+            ),
+        }
+
+
+__all__ = [
+    "LocalVectorIndex",
+]
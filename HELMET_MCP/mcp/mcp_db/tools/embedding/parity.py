@@ -0,0 +1,195 @@
+"""
+Parity check of an embedding backend against the torch reference
+
+Encodes the same texts with torch and with the candidate backend, then reports
+the cosine agreement per text, the top-k search overlap, the encode time and
+the memory added by each model. Exits with status 1 when the minimum cosine
+similarity or the top-k overlap is below its tolerance (parity_failures, also
+used by tests/test_embedding_parity.py).
+
+Usage (from HELMET_MCP/mcp/mcp_db):
+    python -m tools.embedding.parity --backend onnx-int8 --tolerance 0.98
+    python -m tools.embedding.parity --backend onnx --from-db 500
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from sqlalchemy import text
+
+from .vector import (
+    DEFAULT_EMBEDDING_MODEL,
+    EMBEDDING_BACKENDS,
+    TASK_VECTOR_TABLE,
+    USER_VECTOR_TABLE,
+    get_embedding_service,
+)
+
+# Minimum cosine similarity per text, and minimum mean top-k overlap, against torch
+DEFAULT_COSINE_TOLERANCE = 0.98
+DEFAULT_MIN_TOP_K_OVERLAP = 0.8
+
+SAMPLE_DOCUMENTS = [
+    "Title: Office Lighting Repair | Description: Replace broken fluorescent bulbs in conference room | Trade: electrical",
+    "Title: Drywall Finishing | Description: Tape and mud drywall joints in retail space | Trade: drywall",
+    "Title: Bathroom Plumbing | Description: Install sink, toilet and shower mixer on level 2 | Trade: plumbing",
+    "Title: Scaffolding Setup | Description: Erect scaffolding along the north facade | Equipment: scaffolding, harness",
+    "Title: Concrete Slab Pour | Description: Pour and level the ground floor slab | Trade: masonry",
+    "Title: HVAC Ducting | Description: Install ventilation ducts in the server room | Trade: hvac",
+    "Title: Window Installation | Description: Fit double-glazed windows in apartments 3A to 3F | Trade: carpentry",
+    "Title: Fire Alarm Wiring | Description: Pull cables and connect smoke detectors per floor | Trade: electrical",
+    "Name: Marc Dubois | Role: worker | Primary skills: electrical_installation, cable_pulling | Experience: 12 years",
+    "Name: Sofia Martin | Role: worker | Primary skills: plumbing_repair, pipe_welding | Experience: 6 years",
+    "Name: Karim Benali | Role: worker | Primary skills: drywall, painting | Trade categories: finishing",
+    "Name: Julie Bernard | Role: site_manager | Primary skills: planning, safety_inspection | Experience: 15 years",
+]
+
+SAMPLE_QUERIES = [
+    "electrician for lighting work",
+    "someone who can fix pipes",
+    "drywall and painting finisher",
+    "work at height on the facade",
+    "experienced site manager for planning",
+]
+
+
+def _rss_mb() -> float:
+    """Resident set size of this process in MB (Linux, 0 elsewhere)"""
+    try:
+        with open("/proc/self/statm", "r") as file:
+            pages = int(file.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError):
+        return 0.0
+
+
+def _load_documents(limit: int) -> List[str]:
+    from .vector import get_vector_manager
+
+    with get_vector_manager().get_engine().connect() as connection:
+        rows = []
+        for table_name in (TASK_VECTOR_TABLE, USER_VECTOR_TABLE):
+            rows += connection.execute(
+                text(f"SELECT document FROM {table_name} LIMIT :limit"), {"limit": limit}
+            ).fetchall()
+    return [row[0] for row in rows if row[0]]
+
+
+def _encode(model_name: str, backend: str, texts: List[str]) -> Dict[str, Any]:
+    rss_before = _rss_mb()
+    service = get_embedding_service(model_name, backend)
+
+    start = time.perf_counter()
+    service.warm_up()
+    load_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    embeddings = np.asarray(service.encode(texts, batch_size=32), dtype=np.float32)
+    encode_seconds = time.perf_counter() - start
+
+    return {
+        "backend": service.backend,
+        "embeddings": embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True),
+        "load_seconds": round(load_seconds, 3),
+        "encode_ms_per_text": round(encode_seconds * 1000 / len(texts), 3),
+        "rss_added_mb": round(_rss_mb() - rss_before, 1),
+    }
+
+
+def _top_k_overlap(reference: np.ndarray, candidate: np.ndarray, n_queries: int, k: int) -> float:
+    """Mean share of the reference top-k documents also returned by the candidate"""
+    ref_queries, ref_docs = reference[:n_queries], reference[n_queries:]
+    cand_queries, cand_docs = candidate[:n_queries], candidate[n_queries:]
+    k = min(k, len(ref_docs))
+    overlaps = []
+    for i in range(n_queries):
+        ref_top = set(np.argsort(-(ref_docs @ ref_queries[i]))[:k])
+        cand_top = set(np.argsort(-(cand_docs @ cand_queries[i]))[:k])
+        overlaps.append(len(ref_top & cand_top) / k)
+    return float(np.mean(overlaps)) if overlaps else 1.0
+
+
+def check_parity(
+    backend: str,
+    model_name: str = DEFAULT_EMBEDDING_MODEL,
+    documents: Optional[List[str]] = None,
+    queries: Optional[List[str]] = None,
+    k: int = 5,
+) -> Dict[str, Any]:
+    """Compare `backend` with torch on the same queries + documents"""
+    queries = queries or SAMPLE_QUERIES
+    texts = queries + (documents or SAMPLE_DOCUMENTS)
+
+    # Candidate first so its RSS delta does not include the torch weights
+    candidate = _encode(model_name, backend, texts)
+    reference = _encode(model_name, "torch", texts)
+
+    cosines = np.sum(reference["embeddings"] * candidate["embeddings"], axis=1)
+    return {
+        "model": model_name,
+        "backend": candidate["backend"],
+        "texts": len(texts),
+        "cosine_min": round(float(cosines.min()), 5),
+        "cosine_mean": round(float(cosines.mean()), 5),
+        "k": k,
+        "top_k_overlap": round(
+            _top_k_overlap(reference["embeddings"], candidate["embeddings"], len(queries), k), 4
+        ),
+        "torch": {key: value for key, value in reference.items() if key != "embeddings"},
+        "candidate": {key: value for key, value in candidate.items() if key != "embeddings"},
+    }
+
+
+def parity_failures(
+    report: Dict[str, Any],
+    backend: str,
+    tolerance: float = DEFAULT_COSINE_TOLERANCE,
+    min_overlap: float = DEFAULT_MIN_TOP_K_OVERLAP,
+) -> List[str]:
+    """Reasons a check_parity report is out of tolerance (empty when it passes)"""
+    if report["backend"] != backend:
+        return [f"{backend} backend could not be loaded (fell back to {report['backend']})"]
+    failures = []
+    if report["cosine_min"] < tolerance:
+        failures.append(f"Minimum cosine {report['cosine_min']} below tolerance {tolerance}")
+    if report["top_k_overlap"] < min_overlap:
+        failures.append(
+            f"Top-{report['k']} overlap {report['top_k_overlap']} below tolerance {min_overlap}"
+        )
+    return failures
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compare an embedding backend with torch")
+    parser.add_argument("--backend", choices=EMBEDDING_BACKENDS[1:], default="onnx-int8")
+    parser.add_argument("--model", default=DEFAULT_EMBEDDING_MODEL)
+    parser.add_argument(
+        "--tolerance", type=float, default=DEFAULT_COSINE_TOLERANCE, help="minimum cosine per text"
+    )
+    parser.add_argument(
+        "--min-overlap", type=float, default=DEFAULT_MIN_TOP_K_OVERLAP, help="minimum top-k overlap"
+    )
+    parser.add_argument("--from-db", type=int, default=0, help="documents per vector table")
+    parser.add_argument("-k", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    documents = _load_documents(args.from_db) if args.from_db else None
+    report = check_parity(args.backend, args.model, documents, k=args.k)
+    print(json.dumps(report, indent=2))
+
+    failures = parity_failures(report, args.backend, args.tolerance, args.min_overlap)
+    for failure in failures:
+        print(f"❌ {failure}")
+    if failures:
+        return 1
+    print(f"✅ {args.backend} within tolerance ({report['cosine_min']} >= {args.tolerance})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
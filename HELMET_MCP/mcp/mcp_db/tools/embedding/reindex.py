@@ -0,0 +1,360 @@
+"""
+Offline re-embedding of the vector tables (after a model or searchable-text change)
+
+Rows are streamed from `tasks` / `users` with a server-side cursor, encoded in
+batches (optionally in several worker processes) and written into a shadow
+vector table, which is then swapped in with a single RENAME TABLE.
+Progress is checkpointed after every batch so an interrupted run can resume.
+
+Usage (from HELMET_MCP/mcp/mcp_db):
+    python -m tools.embedding.reindex --entity all --batch-size 256 --workers 2
+    python -m tools.embedding.reindex --entity tasks --resume
+"""
+
+import os
+import json
+import time
+import argparse
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from sqlalchemy import text
+from tidb_vector.integrations import TiDBVectorClient
+
+from .vector import (
+    DEFAULT_EMBEDDING_MODEL,
+    TASK_VECTOR_TABLE,
+    USER_VECTOR_TABLE,
+    TiDBVectorManager,
+    get_embedding_service,
+)
+
+DEFAULT_CHECKPOINT_FILE = ".reindex_checkpoint.json"
+
+
+def _entities(manager: TiDBVectorManager) -> Dict[str, Dict[str, Any]]:
+    """Source table, vector table and row -> (id, text, metadata) builders per entity"""
+    return {
+        "tasks": {
+            "source_table": "tasks",
+            "vector_table": TASK_VECTOR_TABLE,
+            "prefix": "task",
+            "build_text": manager._build_task_searchable_text,
+            "build_metadata": manager._task_metadata,
+        },
+        "users": {
+            "source_table": "users",
+            "vector_table": USER_VECTOR_TABLE,
+            "prefix": "user",
+            "build_text": manager._build_user_searchable_text,
+            "build_metadata": manager._user_metadata,
+        },
+    }
+
+
+# ----------------------------------------------------------------------
+# Checkpoints
+# ----------------------------------------------------------------------
+
+
+def load_checkpoints(path: str) -> Dict[str, Dict[str, Any]]:
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as file:
+        return json.load(file)
+
+
+def save_checkpoints(path: str, checkpoints: Dict[str, Dict[str, Any]]) -> None:
+    # Write then rename so a crash never leaves a truncated checkpoint
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as file:
+        json.dump(checkpoints, file, indent=2, default=str)
+    os.replace(tmp_path, path)
+
+
+# ----------------------------------------------------------------------
+# Encoding (in-process or in worker processes)
+# ----------------------------------------------------------------------
+
+_worker_model_name: Optional[str] = None
+
+
+def _init_worker(model_name: str) -> None:
+    global _worker_model_name
+    _worker_model_name = model_name
+    get_embedding_service(model_name).warm_up()
+
+
+def _encode(texts: List[str], batch_size: int) -> List[List[float]]:
+    service = get_embedding_service(_worker_model_name or DEFAULT_EMBEDDING_MODEL)
+    return service.encode(texts, batch_size=batch_size).tolist()
+
+
+class _InProcessEncoder:
+    """Same interface as ProcessPoolExecutor.submit, used when --workers is 1"""
+
+    def __init__(self, model_name: str):
+        _init_worker(model_name)
+
+    def submit(self, fn: Callable, *args) -> Future:
+        future: Future = Future()
+        future.set_result(fn(*args))
+        return future
+
+    def shutdown(self) -> None:
+        pass
+
+
+# ----------------------------------------------------------------------
+# Reindex
+# ----------------------------------------------------------------------
+
+
+def _stream_rows(
+    manager: TiDBVectorManager,
+    source_table: str,
+    after_id: int,
+    batch_size: int,
+    updated_since: Any = None,
+) -> Iterator[List[Dict[str, Any]]]:
+    """Yield batches of rows ordered by id, read through an unbuffered cursor"""
+    query = f"SELECT * FROM {source_table} WHERE id > :after_id"
+    params: Dict[str, Any] = {"after_id": after_id}
+    if updated_since is not None:
+        query += " AND updated_at >= :updated_since"
+        params["updated_since"] = updated_since
+    query += " ORDER BY id"
+
+    with manager.get_engine().connect() as connection:
+        result = connection.execution_options(yield_per=batch_size).execute(
+            text(query), params
+        )
+        for partition in result.mappings().partitions():
+            yield [dict(row) for row in partition]
+
+
+def _prepare_batch(entity: Dict[str, Any], rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    ids, texts, metadatas = [], [], []
+    for row in rows:
+        document = entity["build_text"](row)
+        if not document or not document.strip():
+            continue
+        ids.append(f"{entity['prefix']}_{row['id']}")
+        texts.append(document)
+        metadatas.append(entity["build_metadata"](row["id"], row))
+    return {"last_id": rows[-1]["id"], "ids": ids, "texts": texts, "metadatas": metadatas}
+
+
+def _fill(
+    manager: TiDBVectorManager,
+    entity: Dict[str, Any],
+    shadow_table: str,
+    encoder,
+    workers: int,
+    batch_size: int,
+    encode_batch_size: int,
+    after_id: int = 0,
+    updated_since: Any = None,
+    on_batch: Optional[Callable[[int, int], None]] = None,
+) -> int:
+    """
+    Encode and write every source row with id > after_id into the shadow table.
+    Up to 2 batches per worker are in flight; results are written in id order.
+    """
+    in_flight: "deque[tuple]" = deque()
+    written = 0
+
+    def write_oldest() -> None:
+        nonlocal written
+        batch, future = in_flight.popleft()
+        if batch["ids"]:
+            manager._upsert_vectors(
+                shadow_table, batch["ids"], batch["texts"], future.result(), batch["metadatas"]
+            )
+        written += len(batch["ids"])
+        if on_batch is not None:
+            on_batch(batch["last_id"], len(batch["ids"]))
+
+    for rows in _stream_rows(
+        manager, entity["source_table"], after_id, batch_size, updated_since
+    ):
+        batch = _prepare_batch(entity, rows)
+        in_flight.append((batch, encoder.submit(_encode, batch["texts"], encode_batch_size)))
+        if len(in_flight) >= 2 * workers:
+            write_oldest()
+
+    while in_flight:
+        write_oldest()
+    return written
+
+
+def _swap(manager: TiDBVectorManager, vector_table: str, shadow_table: str) -> None:
+    """Atomically replace the live vector table with the shadow table"""
+    old_table = f"{vector_table}_old"
+    with manager.get_engine().begin() as connection:
+        live_exists = connection.execute(
+            text("SHOW TABLES LIKE :table_name"), {"table_name": vector_table}
+        ).fetchone()
+        if live_exists is None:
+            connection.execute(text(f"RENAME TABLE {shadow_table} TO {vector_table}"))
+            return
+        connection.execute(text(f"DROP TABLE IF EXISTS {old_table}"))
+        connection.execute(
+            text(
+                f"RENAME TABLE {vector_table} TO {old_table}, {shadow_table} TO {vector_table}"
+            )
+        )
+        connection.execute(text(f"DROP TABLE IF EXISTS {old_table}"))
+
+
+def reindex_entity(
+    manager: TiDBVectorManager,
+    name: str,
+    checkpoints: Dict[str, Dict[str, Any]],
+    checkpoint_file: str,
+    encoder,
+    workers: int,
+    batch_size: int,
+    encode_batch_size: int,
+    resume: bool,
+    swap: bool,
+) -> int:
+    entity = _entities(manager)[name]
+    vector_table = entity["vector_table"]
+    shadow_table = f"{vector_table}_shadow"
+    model_name = manager.embedding_service.cache_key
+
+    checkpoint = checkpoints.get(name)
+    if not (resume and checkpoint and checkpoint.get("model") == model_name):
+        with manager.get_engine().connect() as connection:
+            started_at = connection.execute(text("SELECT NOW()")).scalar()
+        checkpoint = {
+            "model": model_name,
+            "shadow_table": shadow_table,
+            "started_at": str(started_at),
+            "last_id": 0,
+            "rows": 0,
+        }
+        print(f"🆕 {name}: new shadow table {shadow_table}")
+    else:
+        print(f"⏯️  {name}: resuming after id {checkpoint['last_id']} ({checkpoint['rows']} rows done)")
+
+    # Creates the shadow table with the current model's dimension (dropped on a fresh run)
+    TiDBVectorClient(
+        table_name=shadow_table,
+        connection_string=manager.connection_string,
+        vector_dimension=manager.embed_model_dims,
+        drop_existing_table=checkpoint["last_id"] == 0,
+    )
+    checkpoints[name] = checkpoint
+    save_checkpoints(checkpoint_file, checkpoints)
+
+    start = time.perf_counter()
+    done_this_run = 0
+
+    def on_batch(last_id: int, rows: int) -> None:
+        nonlocal done_this_run
+        done_this_run += rows
+        checkpoint["last_id"] = last_id
+        checkpoint["rows"] += rows
+        save_checkpoints(checkpoint_file, checkpoints)
+        elapsed = time.perf_counter() - start
+        rate = done_this_run / elapsed if elapsed else 0.0
+        print(f"📊 {name}: {checkpoint['rows']} rows (last id {last_id}, {rate:.1f} rows/s)")
+
+    _fill(
+        manager,
+        entity,
+        shadow_table,
+        encoder,
+        workers,
+        batch_size,
+        encode_batch_size,
+        after_id=checkpoint["last_id"],
+        on_batch=on_batch,
+    )
+
+    # Catch up with rows written while the backfill was running
+    caught_up = _fill(
+        manager,
+        entity,
+        shadow_table,
+        encoder,
+        workers,
+        batch_size,
+        encode_batch_size,
+        updated_since=checkpoint["started_at"],
+    )
+    with manager.get_engine().begin() as connection:
+        removed = connection.execute(
+            text(
+                f"""
+                DELETE FROM {shadow_table}
+                WHERE id NOT IN (
+                    SELECT CONCAT('{entity["prefix"]}_', id) FROM {entity["source_table"]}
+                )
+                """
+            )
+        ).rowcount
+    print(f"🔁 {name}: {caught_up} row(s) caught up, {removed} deleted row(s) dropped")
+
+    elapsed = time.perf_counter() - start
+    print(
+        f"✅ {name}: {checkpoint['rows']} rows in {shadow_table} "
+        f"({done_this_run / elapsed if elapsed else 0.0:.1f} rows/s)"
+    )
+
+    if swap:
+        manager.create_vector_index(shadow_table)
+        _swap(manager, vector_table, shadow_table)
+        del checkpoints[name]
+        save_checkpoints(checkpoint_file, checkpoints)
+        print(f"🔀 {name}: {shadow_table} swapped in as {vector_table}")
+    return checkpoint["rows"]
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Rebuild task/user vector tables")
+    parser.add_argument("--entity", choices=["tasks", "users", "all"], default="all")
+    parser.add_argument("--model", default=DEFAULT_EMBEDDING_MODEL, help="embedding model name")
+    parser.add_argument("--batch-size", type=int, default=256, help="rows read and written per batch")
+    parser.add_argument("--encode-batch-size", type=int, default=32, help="model batch size")
+    parser.add_argument("--workers", type=int, default=1, help="encoding processes")
+    parser.add_argument("--checkpoint-file", default=DEFAULT_CHECKPOINT_FILE)
+    parser.add_argument("--resume", action="store_true", help="continue from the checkpoint")
+    parser.add_argument(
+        "--no-swap", action="store_true", help="fill the shadow table but keep the live one"
+    )
+    args = parser.parse_args(argv)
+
+    manager = TiDBVectorManager(args.model)
+    checkpoints = load_checkpoints(args.checkpoint_file)
+    names = ["tasks", "users"] if args.entity == "all" else [args.entity]
+
+    workers = max(1, args.workers)
+    encoder = (
+        _InProcessEncoder(args.model)
+        if workers == 1
+        else ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(args.model,))
+    )
+    try:
+        for name in names:
+            reindex_entity(
+                manager,
+                name,
+                checkpoints,
+                args.checkpoint_file,
+                encoder,
+                workers,
+                args.batch_size,
+                args.encode_batch_size,
+                args.resume,
+                not args.no_swap,
+            )
+    finally:
+        encoder.shutdown()
+
+
+if __name__ == "__main__":
+    main()
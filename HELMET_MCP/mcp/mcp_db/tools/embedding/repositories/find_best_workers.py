@@ -1,7 +1,131 @@
 from mcp_init import mcp, get_db_connection
-from typing import List, Optional
+from typing import List, Optional, Dict, Any, Tuple
 import json
-from ..vector import TiDBVectorManager
+from ..vector import get_vector_manager, VectorSearchResult, VectorFilter
+
+
+def build_task_description(
+    title: str,
+    description: str,
+    skill_requirements: Optional[List[str]] = None,
+    trade_category: Optional[str] = None,
+) -> str:
+    """Concatenate the task fields into the text used for semantic matching"""
+    components = []
+    components.append(title.strip())
+    components.append(description.strip())
+
+    if skill_requirements:
+        if isinstance(skill_requirements, list):
+            components.extend(skill_requirements)
+        else:
+            components.append(str(skill_requirements))
+
+    if trade_category:
+        components.append(trade_category.strip())
+
+    return " ".join(components)
+
+
+def validate_worker_filters(
+    k: Optional[int],
+    min_similarity_score: Optional[float],
+    required_skills: Optional[List[str]],
+    preferred_experience_years: Optional[float],
+) -> Optional[str]:
+    """Return an error message if a matching parameter is invalid, None otherwise"""
+    if k is not None:
+        if not isinstance(k, int) or k <= 0 or k > 10:
+            return "❌ k must be an integer between 1 and 10"
+
+    if min_similarity_score is not None:
+        if not isinstance(min_similarity_score, (int, float)) or not (
+            0.0 <= min_similarity_score <= 100.0
+        ):
+            return "❌ min_similarity_score must be a number between 0 and 100"
+
+    if preferred_experience_years is not None:
+        if (
+            not isinstance(preferred_experience_years, (int, float))
+            or preferred_experience_years < 0
+        ):
+            return "❌ preferred_experience_years must be a non-negative number"
+
+    if required_skills is not None:
+        if not isinstance(required_skills, list):
+            return "❌ required_skills must be a list of strings"
+
+    return None
+
+
+def build_worker_filter(
+    min_similarity_score: Optional[float] = None,
+    required_skills: Optional[List[str]] = None,
+    preferred_experience_years: Optional[float] = None,
+) -> VectorFilter:
+    """Translate the matching parameters into filters evaluated by the vector query"""
+    return VectorFilter(
+        max_distance=(
+            1 - min_similarity_score / 100 if min_similarity_score is not None else None
+        ),
+        min_experience_years=preferred_experience_years,
+        any_primary_skills=required_skills or None,
+    )
+
+
+def rank_workers(
+    results: List[VectorSearchResult],
+    required_skills: Optional[List[str]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Format filtered vector search results, best match first
+
+    Filtering happens in SQL (see build_worker_filter), results are already the top k
+    """
+    ranked_workers = []
+    for result in results:
+        distance = result.distance
+        similarity_score = (1 - distance) * 100  # Convert to percentage
+
+        user_metadata = result.metadata
+        worker_skills = user_metadata.get("primary_skills", [])
+        worker_experience = user_metadata.get("experience_years", 0)
+
+        # Calculate skill match details
+        skill_matches = []
+        if required_skills:
+            for req_skill in required_skills:
+                matches = [
+                    skill
+                    for skill in worker_skills
+                    if req_skill.lower() in skill.lower()
+                ]
+                if matches:
+                    skill_matches.extend(matches)
+
+        ranked_workers.append(
+            {
+                "user_id": user_metadata.get("user_id"),
+                "name": user_metadata.get("name", "Unknown"),
+                "role": user_metadata.get("role", ""),
+                "similarity_score": round(similarity_score, 2),
+                "distance": round(distance, 4),
+                "experience_years": worker_experience,
+                "primary_skills": worker_skills,
+                "trade_categories": user_metadata.get("trade_categories", []),
+                "skill_matches": skill_matches,
+                "vector_doc_id": result.id,
+                "profile_summary": (
+                    result.text[:150] + "..."
+                    if len(result.text) > 150
+                    else result.text
+                ),
+            }
+        )
+
+    # Sort by similarity score (highest first)
+    ranked_workers.sort(key=lambda x: x["similarity_score"], reverse=True)
+    return ranked_workers
 
 
 @mcp.tool()
@@ -64,141 +188,33 @@ def find_best_workers_for_task(
         )
 
     # Build task description by concatenating all fields
-    components = []
-    components.append(title.strip())
-    components.append(description.strip())
-
-    if skill_requirements:
-        if isinstance(skill_requirements, list):
-            components.extend(skill_requirements)
-        else:
-            components.append(str(skill_requirements))
-
-    if trade_category:
-        components.append(trade_category.strip())
-
-    task_description = " ".join(components)
+    task_description = build_task_description(
+        title, description, skill_requirements, trade_category
+    )
 
     # Validate optional parameters
-    if k is not None:
-        if not isinstance(k, int) or k <= 0 or k > 10:
-            return json.dumps(
-                {"success": False, "error": "❌ k must be an integer between 1 and 10"}
-            )
-    else:
+    error = validate_worker_filters(
+        k, min_similarity_score, required_skills, preferred_experience_years
+    )
+    if error:
+        return json.dumps({"success": False, "error": error})
+    if k is None:
         k = 3
 
-    if min_similarity_score is not None:
-        if not isinstance(min_similarity_score, (int, float)) or not (
-            0.0 <= min_similarity_score <= 100.0
-        ):
-            return json.dumps(
-                {
-                    "success": False,
-                    "error": "❌ min_similarity_score must be a number between 0 and 100",
-                }
-            )
-
-    if preferred_experience_years is not None:
-        if (
-            not isinstance(preferred_experience_years, (int, float))
-            or preferred_experience_years < 0
-        ):
-            return json.dumps(
-                {
-                    "success": False,
-                    "error": "❌ preferred_experience_years must be a non-negative number",
-                }
-            )
-
-    if required_skills is not None:
-        if not isinstance(required_skills, list):
-            return json.dumps(
-                {
-                    "success": False,
-                    "error": "❌ required_skills must be a list of strings",
-                }
-            )
-
     try:
-        # Initialize vector manager
-        vector_manager = TiDBVectorManager()
+        # Shared vector manager (embedding model loaded once per process)
+        vector_manager = get_vector_manager()
 
-        # Perform vector search for best matching workers
-        # We'll search with a higher k first, then filter and rank
-        search_k = max(k * 2, 10)  # Get more results for better filtering
+        # Filtered top-k computed by the database in a single query
         results = vector_manager.find_best_workers_for_task(
-            task_description.strip(), k=search_k
+            task_description.strip(),
+            k=k,
+            filters=build_worker_filter(
+                min_similarity_score, required_skills, preferred_experience_years
+            ),
         )
 
-        # Process and filter results
-        qualified_workers = []
-        for result in results:
-            distance = result.distance
-            similarity_score = (1 - distance) * 100  # Convert to percentage
-
-            # Apply similarity score filter
-            if (
-                min_similarity_score is not None
-                and similarity_score < min_similarity_score
-            ):
-                continue
-
-            user_metadata = result.metadata
-            worker_skills = user_metadata.get("primary_skills", [])
-            worker_experience = user_metadata.get("experience_years", 0)
-
-            # Apply experience filter
-            if (
-                preferred_experience_years is not None
-                and worker_experience < preferred_experience_years
-            ):
-                continue
-
-            # Apply required skills filter
-            if required_skills is not None:
-                has_required_skills = any(
-                    req_skill.lower() in [skill.lower() for skill in worker_skills]
-                    for req_skill in required_skills
-                )
-                if not has_required_skills:
-                    continue
-
-            # Calculate skill match details
-            skill_matches = []
-            if required_skills:
-                for req_skill in required_skills:
-                    matches = [
-                        skill
-                        for skill in worker_skills
-                        if req_skill.lower() in skill.lower()
-                    ]
-                    if matches:
-                        skill_matches.extend(matches)
-
-            qualified_workers.append(
-                {
-                    "user_id": user_metadata.get("user_id"),
-                    "name": user_metadata.get("name", "Unknown"),
-                    "role": user_metadata.get("role", ""),
-                    "similarity_score": round(similarity_score, 2),
-                    "distance": round(distance, 4),
-                    "experience_years": worker_experience,
-                    "primary_skills": worker_skills,
-                    "trade_categories": user_metadata.get("trade_categories", []),
-                    "skill_matches": skill_matches,
-                    "vector_doc_id": result.id,
-                    "profile_summary": (
-                        result.text[:150] + "..."
-                        if len(result.text) > 150
-                        else result.text
-                    ),
-                }
-            )
-
-        # Sort by similarity score (highest first) and limit to k results
-        qualified_workers.sort(key=lambda x: x["similarity_score"], reverse=True)
-        final_results = qualified_workers[:k]
+        final_results = rank_workers(results, required_skills)
 
         return json.dumps(
             {
@@ -210,7 +226,7 @@ def find_best_workers_for_task(
                     "trade_category": trade_category,
                     "combined_description": task_description,
                 },
-                "total_qualified_workers": len(qualified_workers),
+                "total_qualified_workers": len(final_results),
                 "returned_workers": len(final_results),
                 "max_requested": k,
                 "filters_applied": {
@@ -0,0 +1,155 @@
+from mcp_init import mcp
+from typing import List, Optional, Dict, Any
+import json
+from ..vector import get_vector_manager
+from .find_best_workers import (
+    build_task_description,
+    validate_worker_filters,
+    build_worker_filter,
+    rank_workers,
+)
+
+
+@mcp.tool()
+def find_best_workers_for_tasks(
+    tasks: List[Dict[str, Any]],
+    k: Optional[int] = 3,
+    min_similarity_score: Optional[float] = None,
+    required_skills: Optional[List[str]] = None,
+    preferred_experience_years: Optional[float] = None,
+) -> str:
+    """
+    Find the best workers for SEVERAL tasks in a single call (batch version of
+    find_best_workers_for_task).
+
+    All task descriptions are encoded together and searched in one database
+    round-trip. Use this instead of calling find_best_workers_for_task once per
+    task (e.g. when re-staffing a cascade of dependent tasks).
+
+    PARAMETERS:
+    - tasks: List of task objects (list, required, max 50). Each object has:
+      * "task_id": Task identifier used as the result key (optional, defaults to the list index)
+      * "title": Task title (str, required)
+      * "description": Task description (str, required)
+      * "skill_requirements": List of required skills (list, optional)
+      * "trade_category": Trade/category of work (str, optional)
+    - k: Number of workers to return per task (int, optional, default=3, max=10)
+    - min_similarity_score: Minimum similarity percentage (float, optional, 0-100)
+    - required_skills: Must-have skills for filtering, applied to every task (list, optional)
+    - preferred_experience_years: Minimum preferred experience years (float, optional)
+
+    RETURN:
+    JSON with the ranked best-matching workers keyed by task_id.
+
+    EXAMPLE USAGE:
+    find_best_workers_for_tasks(
+        tasks=[
+            {"task_id": 12, "title": "Office Lighting Repair",
+             "description": "Replace broken fluorescent bulbs in conference room",
+             "trade_category": "electrical"},
+            {"task_id": 13, "title": "Drywall Finishing",
+             "description": "Tape and mud drywall joints in retail space"}
+        ],
+        k=3
+    )
+    """
+
+    # Validate required parameters
+    if not isinstance(tasks, list) or not tasks:
+        return json.dumps(
+            {"success": False, "error": "❌ tasks must be a non-empty list"}
+        )
+
+    if len(tasks) > 50:
+        return json.dumps(
+            {"success": False, "error": "❌ tasks cannot contain more than 50 tasks"}
+        )
+
+    error = validate_worker_filters(
+        k, min_similarity_score, required_skills, preferred_experience_years
+    )
+    if error:
+        return json.dumps({"success": False, "error": error})
+    if k is None:
+        k = 3
+
+    keys = []
+    task_descriptions = []
+    for index, task in enumerate(tasks):
+        if not isinstance(task, dict):
+            return json.dumps(
+                {"success": False, "error": f"❌ tasks[{index}] must be an object"}
+            )
+
+        title = task.get("title")
+        description = task.get("description")
+        if not title or not str(title).strip():
+            return json.dumps(
+                {
+                    "success": False,
+                    "error": f"❌ tasks[{index}].title is required and cannot be empty",
+                }
+            )
+        if not description or not str(description).strip():
+            return json.dumps(
+                {
+                    "success": False,
+                    "error": f"❌ tasks[{index}].description is required and cannot be empty",
+                }
+            )
+
+        keys.append(str(task.get("task_id", index)))
+        task_descriptions.append(
+            build_task_description(
+                str(title),
+                str(description),
+                task.get("skill_requirements"),
+                task.get("trade_category"),
+            )
+        )
+
+    try:
+        # Shared vector manager (embedding model loaded once per process)
+        vector_manager = get_vector_manager()
+
+        # One batched encode + one SQL statement (filtered top-k) for every task
+        all_results = vector_manager.find_best_workers_for_tasks(
+            task_descriptions,
+            k=k,
+            filters=build_worker_filter(
+                min_similarity_score, required_skills, preferred_experience_years
+            ),
+        )
+
+        results_by_task = {}
+        for key, task_description, results in zip(
+            keys, task_descriptions, all_results
+        ):
+            final_results = rank_workers(results, required_skills)
+            results_by_task[key] = {
+                "combined_description": task_description,
+                "total_qualified_workers": len(final_results),
+                "returned_workers": len(final_results),
+                "best_workers": final_results,
+            }
+
+        return json.dumps(
+            {
+                "success": True,
+                "total_tasks": len(results_by_task),
+                "max_requested": k,
+                "filters_applied": {
+                    "min_similarity_score": min_similarity_score,
+                    "required_skills": required_skills,
+                    "preferred_experience_years": preferred_experience_years,
+                },
+                "results": results_by_task,
+                "message": f"✅ Found best workers for {len(results_by_task)} tasks",
+            },
+            indent=2,
+        )
+
+    except Exception as e:
+        return json.dumps(
+            {"success": False, "error": f"❌ Error finding best workers: {str(e)}"}
+        )
@@ -1,7 +1,7 @@
 from mcp_init import mcp, get_db_connection
 from typing import List, Optional
 import json
-from ..vector import TiDBVectorManager
+from ..vector import get_vector_manager, VectorFilter
 
 
 @mcp.tool()
@@ -94,23 +94,23 @@ def search_similar_tasks(
         )
 
     try:
-        # Initialize vector manager
-        vector_manager = TiDBVectorManager()
-
-        # Perform search
-        results = vector_manager.search_similar_tasks(query.strip(), k=k)
+        # Shared vector manager (embedding model loaded once per process)
+        vector_manager = get_vector_manager()
+
+        # Perform search (distance thresholds are applied by the database)
+        results = vector_manager.search_similar_tasks(
+            query.strip(),
+            k=k,
+            filters=VectorFilter(
+                min_distance=min_distance_threshold,
+                max_distance=max_distance_threshold,
+            ),
+        )
 
-        # Filter by distance thresholds if provided
         filtered_results = []
         for result in results:
             distance = result.distance
 
-            # Apply distance filters
-            if min_distance_threshold is not None and distance < min_distance_threshold:
-                continue
-            if max_distance_threshold is not None and distance > max_distance_threshold:
-                continue
-
             filtered_results.append(
                 {
                     "task_id": result.metadata.get("task_id"),
@@ -1,7 +1,7 @@
 from mcp_init import mcp, get_db_connection
 from typing import List, Optional
 import json
-from ..vector import TiDBVectorManager
+from ..vector import get_vector_manager, VectorFilter
 
 
 @mcp.tool()
@@ -100,50 +100,36 @@ def search_similar_users(
             )
 
     try:
-        # Initialize vector manager
-        vector_manager = TiDBVectorManager()
-
-        # Perform vector search with higher k for filtering
-        search_k = max(k * 2, 15)  # Get more results for better filtering
-        results = vector_manager.search_similar_users(query.strip(), k=search_k)
+        # Shared vector manager (embedding model loaded once per process)
+        vector_manager = get_vector_manager()
+
+        # Filtered top-k computed by the database in a single query
+        results = vector_manager.search_similar_users(
+            query.strip(),
+            k=k,
+            filters=VectorFilter(
+                max_distance=(
+                    1 - min_similarity_score / 100
+                    if min_similarity_score is not None
+                    else None
+                ),
+                role=role_filter,
+                min_experience_years=min_experience_years,
+                trade_category=trade_category_filter,
+            ),
+        )
 
-        # Process and filter results
+        # Process results
         qualified_users = []
         for result in results:
             distance = result.distance
             similarity_score = (1 - distance) * 100  # Convert to percentage
 
-            # Apply similarity score filter
-            if (
-                min_similarity_score is not None
-                and similarity_score < min_similarity_score
-            ):
-                continue
-
             user_metadata = result.metadata
             user_role = user_metadata.get("role", "")
             user_experience = user_metadata.get("experience_years", 0)
             user_trade_categories = user_metadata.get("trade_categories", [])
 
-            # Apply role filter
-            if role_filter is not None and user_role != role_filter:
-                continue
-
-            # Apply experience filter
-            if (
-                min_experience_years is not None
-                and user_experience < min_experience_years
-            ):
-                continue
-
-            # Apply trade category filter
-            if trade_category_filter is not None:
-                if not any(
-                    trade_category_filter.lower() in category.lower()
-                    for category in user_trade_categories
-                ):
-                    continue
-
             # Calculate skill relevance
             primary_skills = user_metadata.get("primary_skills", [])
             query_words = query.lower().split()
@@ -173,9 +159,9 @@ def search_similar_users(
                 }
             )
 
-        # Sort by similarity score (highest first) and limit to k results
+        # Sort by similarity score (highest first)
         qualified_users.sort(key=lambda x: x["similarity_score"], reverse=True)
-        final_results = qualified_users[:k]
+        final_results = qualified_users
 
         # Calculate statistics
         avg_similarity = (
@@ -1,11 +1,36 @@
 import os
-from typing import List, Dict, Any
+import json
+import threading
+import time
+from typing import TYPE_CHECKING, List, Dict, Any, Optional, Tuple
 from dataclasses import dataclass
 
-from tidb_vector.integrations import TiDBVectorClient
-from sentence_transformers import SentenceTransformer
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Engine
 from dotenv import load_dotenv
 
+from metrics import increment, record_timing
+
+from .cache import TiDBEmbeddingStore, get_embedding_cache, get_query_cache
+
+# sentence_transformers (torch) and tidb_vector are imported on first use so that
+# importing this module stays cheap for servers that only serve CRUD tools
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
+    from tidb_vector.integrations import TiDBVectorClient
+
+DEFAULT_EMBEDDING_MODEL = "sentence-transformers/msmarco-MiniLM-L12-cos-v5"
+
+# Encoder runtimes (EMBEDDING_BACKEND): ONNX ones need `sentence-transformers[onnx]`
+EMBEDDING_BACKENDS = ("torch", "onnx", "onnx-int8")
+
+TASK_VECTOR_TABLE = "task_vectors"
+USER_VECTOR_TABLE = "user_vectors"
+
+# HNSW index (TiFlash) used for approximate nearest neighbour search
+VECTOR_INDEX_NAME = "idx_embedding_cosine"
+SEARCH_MODES = ("ann", "exact")
+
 
 @dataclass
 class VectorSearchResult:
@@ -17,20 +42,249 @@ class VectorSearchResult:
     distance: float
 
 
+@dataclass
+class VectorFilter:
+    """
+    Filters applied inside the vector query (SQL WHERE on the JSON metadata),
+    so the database returns the exact filtered top-k
+    """
+
+    min_distance: Optional[float] = None
+    max_distance: Optional[float] = None
+    role: Optional[str] = None
+    min_experience_years: Optional[float] = None
+    trade_category: Optional[str] = None  # case-insensitive substring of any trade category
+    any_primary_skills: Optional[List[str]] = None  # at least one skill (case-insensitive)
+
+    def to_sql(self, distance_expr: str, suffix: str) -> Tuple[List[str], Dict[str, Any]]:
+        """Build the WHERE conditions and their bound parameters"""
+        conditions = []
+        params: Dict[str, Any] = {}
+
+        if self.min_distance is not None:
+            conditions.append(f"{distance_expr} >= :min_distance_{suffix}")
+            params[f"min_distance_{suffix}"] = self.min_distance
+        if self.max_distance is not None:
+            conditions.append(f"{distance_expr} <= :max_distance_{suffix}")
+            params[f"max_distance_{suffix}"] = self.max_distance
+        if self.role is not None:
+            conditions.append(f"JSON_UNQUOTE(JSON_EXTRACT(meta, '$.role')) = :role_{suffix}")
+            params[f"role_{suffix}"] = self.role
+        if self.min_experience_years is not None:
+            conditions.append(
+                f"CAST(JSON_EXTRACT(meta, '$.experience_years') AS DECIMAL(10, 2)) >= :min_experience_{suffix}"
+            )
+            params[f"min_experience_{suffix}"] = self.min_experience_years
+        if self.trade_category:
+            conditions.append(
+                f"LOWER(JSON_EXTRACT(meta, '$.trade_categories')) LIKE :trade_category_{suffix}"
+            )
+            params[f"trade_category_{suffix}"] = f"%{self.trade_category.lower()}%"
+        if self.any_primary_skills:
+            conditions.append(
+                f"JSON_OVERLAPS(CAST(LOWER(JSON_EXTRACT(meta, '$.primary_skills')) AS JSON), "
+                f"CAST(:primary_skills_{suffix} AS JSON))"
+            )
+            params[f"primary_skills_{suffix}"] = json.dumps(
+                [skill.lower() for skill in self.any_primary_skills]
+            )
+
+        return conditions, params
+
+    def matches(self, metadata: Dict[str, Any], distance: float) -> bool:
+        """Same conditions as to_sql, evaluated in Python (local vector index)"""
+        if self.min_distance is not None and distance < self.min_distance:
+            return False
+        if self.max_distance is not None and distance > self.max_distance:
+            return False
+        if self.role is not None and metadata.get("role") != self.role:
+            return False
+        if self.min_experience_years is not None and float(
+            metadata.get("experience_years") or 0
+        ) < self.min_experience_years:
+            return False
+        if self.trade_category and self.trade_category.lower() not in json.dumps(
+            metadata.get("trade_categories", [])
+        ).lower():
+            return False
+        if self.any_primary_skills:
+            skills = {str(skill).lower() for skill in _as_list(metadata.get("primary_skills", []))}
+            if not skills & {skill.lower() for skill in self.any_primary_skills}:
+                return False
+        return True
+
+
+def _as_list(value: Any) -> List[Any]:
+    """JSON columns may come back as strings: always return a list"""
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except json.JSONDecodeError:
+            return [value]
+    return value if isinstance(value, list) else []
+
+
+def default_embedding_backend() -> str:
+    backend = os.getenv("EMBEDDING_BACKEND", "torch").lower()
+    if backend not in EMBEDDING_BACKENDS:
+        raise ValueError(f"EMBEDDING_BACKEND must be one of {EMBEDDING_BACKENDS}")
+    return backend
+
+
+class EmbeddingService:
+    """
+    Process-wide holder for a SentenceTransformer model.
+    The model is loaded lazily on first use and shared by every TiDBVectorManager.
+
+    backend:
+    - "torch": PyTorch weights (reference)
+    - "onnx": ONNX Runtime export of the same weights
+    - "onnx-int8": dynamically quantised ONNX model (exported once, then cached
+      under EMBEDDING_ONNX_DIR)
+    """
+
+    def __init__(self, model_name: str = DEFAULT_EMBEDDING_MODEL, backend: str = "torch"):
+        self.model_name = model_name
+        self.backend = backend
+        self._model = None
+        self._dims = None
+        self._load_lock = threading.Lock()
+        # Fast tokenizers are not safe to share between concurrent calls
+        self._encode_lock = threading.Lock()
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._model is not None
+
+    @property
+    def cache_key(self) -> str:
+        """
+        Model identity used by the embedding caches (backends give slightly different vectors).
+        Loads the model first: a failed onnx load falls back to torch and changes the backend.
+        """
+        self.model
+        if self.backend == "torch":
+            return self.model_name
+        return f"{self.model_name}#{self.backend}"
+
+    def _load_int8(self) -> "SentenceTransformer":
+        from sentence_transformers import SentenceTransformer
+
+        quantization = os.getenv("EMBEDDING_ONNX_QUANTIZATION", "avx2")
+        file_name = f"onnx/model_qint8_{quantization}.onnx"
+        local_dir = os.path.join(
+            os.getenv("EMBEDDING_ONNX_DIR", "models"), self.model_name.replace("/", "__")
+        )
+
+        if not os.path.exists(os.path.join(local_dir, file_name)):
+            from sentence_transformers import export_dynamic_quantized_onnx_model
+
+            print(f"⏳ Exporting int8 ONNX model ({quantization}) to {local_dir}")
+            model = SentenceTransformer(self.model_name, backend="onnx", trust_remote_code=True)
+            model.save(local_dir)
+            export_dynamic_quantized_onnx_model(model, quantization, local_dir)
+
+        return SentenceTransformer(
+            local_dir,
+            backend="onnx",
+            model_kwargs={"file_name": file_name},
+            trust_remote_code=True,
+        )
+
+    def _load(self) -> "SentenceTransformer":
+        from sentence_transformers import SentenceTransformer
+
+        if self.backend == "onnx":
+            return SentenceTransformer(self.model_name, backend="onnx", trust_remote_code=True)
+        if self.backend == "onnx-int8":
+            return self._load_int8()
+        return SentenceTransformer(self.model_name, trust_remote_code=True)
+
+    @property
+    def model(self) -> "SentenceTransformer":
+        """Return the model, loading it from disk on first access"""
+        if self._model is None:
+            with self._load_lock:
+                if self._model is None:
+                    start = time.perf_counter()
+                    try:
+                        model = self._load()
+                    except Exception as e:
+                        if self.backend == "torch":
+                            raise
+                        # Missing onnxruntime/optimum or failed export: keep serving with torch
+                        print(f"⚠️  {self.backend} backend unavailable ({e}), falling back to torch")
+                        self.backend = "torch"
+                        model = self._load()
+                    self._dims = model.get_sentence_embedding_dimension()
+                    self._model = model
+                    elapsed = time.perf_counter() - start
+                    record_timing("embedding.model_init", elapsed)
+                    print(
+                        f"✅ Embedding model {self.model_name} ({self.backend}) loaded in {elapsed:.2f}s"
+                    )
+        return self._model
+
+    @property
+    def dimensions(self) -> int:
+        if self._dims is None:
+            self.model
+        return self._dims
+
+    def encode(self, texts, **kwargs):
+        """Encode one text or a list of texts with the shared model"""
+        start = time.perf_counter()
+        model = self.model
+        record_timing("embedding.model_load", time.perf_counter() - start)
+
+        start = time.perf_counter()
+        with self._encode_lock:
+            embeddings = model.encode(texts, **kwargs)
+        record_timing("embedding.encode", time.perf_counter() - start)
+        return embeddings
+
+    def warm_up(self, text: Optional[str] = "warm-up") -> None:
+        """Load the model and optionally run a first encode to prime the runtime"""
+        self.model
+        if text:
+            self.encode(text)
+
+
+_embedding_services: Dict[Tuple[str, str], EmbeddingService] = {}
+_embedding_services_lock = threading.Lock()
+
+
+def get_embedding_service(
+    model_name: str = DEFAULT_EMBEDDING_MODEL, backend: Optional[str] = None
+) -> EmbeddingService:
+    """
+    Get the shared embedding service for a model (one instance per process)
+
+    Args:
+        backend: "torch", "onnx" or "onnx-int8" (defaults to EMBEDDING_BACKEND)
+    """
+    key = (model_name, backend or default_embedding_backend())
+    service = _embedding_services.get(key)
+    if service is None:
+        with _embedding_services_lock:
+            service = _embedding_services.get(key)
+            if service is None:
+                service = EmbeddingService(*key)
+                _embedding_services[key] = service
+    return service
+
+
 class TiDBVectorManager:
     """
     TiDB Vector Manager for creating and searching vectors in TiDB.
     Designed to work with tasks and users tables containing vector columns.
     """
 
-    def __init__(
-        self, model_name: str = "sentence-transformers/msmarco-MiniLM-L12-cos-v5"
-    ):
+    def __init__(self, model_name: str = DEFAULT_EMBEDDING_MODEL):
         load_dotenv()
 
-        # Initialize embedding model
-        self.embed_model = SentenceTransformer(model_name, trust_remote_code=True)
-        self.embed_model_dims = self.embed_model.get_sentence_embedding_dimension()
+        # Shared embedding model (loaded once per process)
+        self.embedding_service = get_embedding_service(model_name)
 
         # Initialize TiDB connection parameters
         self.connection_string = self._build_connection_string()
@@ -39,6 +293,49 @@ class TiDBVectorManager:
         self._tasks_vector_client = None
         self._users_vector_client = None
 
+        # Engine for batch upserts/deletes not covered by TiDBVectorClient
+        self._engine: Optional[Engine] = None
+
+        # Vector table -> whether the HNSW index exists (checked once)
+        self._vector_indexes: Dict[str, bool] = {}
+
+        # Optional in-process copy of user_vectors (LOCAL_USER_INDEX=1)
+        self.local_user_index = None
+        if os.getenv("LOCAL_USER_INDEX", "0").lower() in ("1", "true", "yes"):
+            from .local_index import LocalVectorIndex
+
+            self.local_user_index = LocalVectorIndex(
+                USER_VECTOR_TABLE,
+                self.get_engine,
+                refresh_interval=float(os.getenv("LOCAL_USER_INDEX_REFRESH", 10)),
+                max_staleness=float(os.getenv("LOCAL_USER_INDEX_MAX_STALENESS", 60)),
+            )
+            self.local_user_index.start()
+
+        # Content-hash cache: unchanged texts are never re-encoded
+        self.embedding_cache = get_embedding_cache(
+            int(os.getenv("EMBEDDING_CACHE_SIZE", 10000))
+        )
+        if (
+            os.getenv("EMBEDDING_CACHE_STORE", "").lower() == "tidb"
+            and self.embedding_cache.store is None
+        ):
+            self.embedding_cache.store = TiDBEmbeddingStore(self.get_engine)
+
+        # Search queries repeat a lot within an agent run
+        self.query_cache = get_query_cache(
+            max_bytes=int(os.getenv("QUERY_CACHE_MAX_BYTES", 8 * 1024 * 1024)),
+            ttl=float(os.getenv("QUERY_CACHE_TTL", 600)),
+        )
+
+    @property
+    def embed_model(self) -> "SentenceTransformer":
+        return self.embedding_service.model
+
+    @property
+    def embed_model_dims(self) -> int:
+        return self.embedding_service.dimensions
+
     def _build_connection_string(self) -> str:
         """Build TiDB connection string from environment variables"""
         host = os.getenv("TIDB_HOST")
@@ -56,146 +353,529 @@ class TiDBVectorManager:
 
     def text_to_embedding(self, text: str) -> List[float]:
         """Generate vector embedding for given text"""
-        if not text or not text.strip():
-            raise ValueError("Text cannot be empty")
-
-        embedding = self.embed_model.encode(text)
-        return embedding.tolist()
+        return self.texts_to_embeddings([text])[0]
 
-    def get_tasks_vector_client(self) -> TiDBVectorClient:
+    def get_tasks_vector_client(self) -> "TiDBVectorClient":
         """Get or create vector client for tasks table"""
         if self._tasks_vector_client is None:
+            from tidb_vector.integrations import TiDBVectorClient
+
             self._tasks_vector_client = TiDBVectorClient(
-                table_name="task_vectors",
+                table_name=TASK_VECTOR_TABLE,
                 connection_string=self.connection_string,
                 vector_dimension=self.embed_model_dims,
                 drop_existing_table=False,
             )
         return self._tasks_vector_client
 
-    def get_users_vector_client(self) -> TiDBVectorClient:
+    def get_users_vector_client(self) -> "TiDBVectorClient":
         """Get or create vector client for users table"""
         if self._users_vector_client is None:
+            from tidb_vector.integrations import TiDBVectorClient
+
             self._users_vector_client = TiDBVectorClient(
-                table_name="user_vectors",
+                table_name=USER_VECTOR_TABLE,
                 connection_string=self.connection_string,
                 vector_dimension=self.embed_model_dims,
                 drop_existing_table=False,
             )
         return self._users_vector_client
 
-    def create_task_vector(self, task_id: int, task_data: Dict[str, Any]) -> str:
+    def ensure_vector_indexes(self) -> Dict[str, bool]:
         """
-        Create vector embedding for a task based on its attributes
+        Create the TiFlash replica and the HNSW cosine index of every vector table
+        (idempotent, safe to run on each deployment)
+
+        Returns:
+            For each vector table, True if the index is declared
         """
-        # Combine relevant task fields into searchable text
-        searchable_text = self._build_task_searchable_text(task_data)
-
-        # Generate embedding
-        embedding = self.text_to_embedding(searchable_text)
-
-        # Store in vector table
-        vector_client = self.get_tasks_vector_client()
-
-        # Use task_id as the document ID
-        doc_id = f"task_{task_id}"
-
-        vector_client.insert(
-            ids=[doc_id],
-            texts=[searchable_text],
-            embeddings=[embedding],
-            metadatas=[
-                {
-                    "task_id": task_id,
-                    "title": task_data.get("title", ""),
-                    "trade_category": task_data.get("trade_category", ""),
-                    "priority": task_data.get("priority", 0),
-                    "status": task_data.get("status", "pending"),
-                }
-            ],
-        )
+        # Make sure the vector tables exist (with a fixed-dimension VECTOR column)
+        self.get_tasks_vector_client()
+        self.get_users_vector_client()
+
+        created = {}
+        for table_name in (TASK_VECTOR_TABLE, USER_VECTOR_TABLE):
+            self.create_vector_index(table_name)
+            self._vector_indexes.pop(table_name, None)
+            created[table_name] = self.has_vector_index(table_name)
+            status = "✅" if created[table_name] else "❌"
+            print(f"{status} Vector index {VECTOR_INDEX_NAME} on {table_name}")
+        return created
+
+    def create_vector_index(self, table_name: str) -> None:
+        """Add the TiFlash replica and the HNSW cosine index to one vector table"""
+        with self.get_engine().begin() as connection:
+            connection.execute(text(f"ALTER TABLE {table_name} SET TIFLASH REPLICA 1"))
+            connection.execute(
+                text(
+                    f"""
+                    CREATE VECTOR INDEX IF NOT EXISTS {VECTOR_INDEX_NAME}
+                    ON {table_name} ((VEC_COSINE_DISTANCE(embedding))) USING HNSW
+                    """
+                )
+            )
 
-        return doc_id
+    def has_vector_index(self, table_name: str) -> bool:
+        """Whether the HNSW index is declared on a vector table (cached)"""
+        if table_name not in self._vector_indexes:
+            with self.get_engine().connect() as connection:
+                index = connection.execute(
+                    text(f"SHOW INDEX FROM {table_name} WHERE Key_name = :index_name"),
+                    {"index_name": VECTOR_INDEX_NAME},
+                ).fetchone()
+            self._vector_indexes[table_name] = index is not None
+        return self._vector_indexes[table_name]
+
+    def vector_index_status(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Report the build progress of the HNSW indexes (INFORMATION_SCHEMA.TIFLASH_INDEXES)
 
-    def create_user_vector(self, user_id: int, user_data: Dict[str, Any]) -> str:
+        Returns:
+            For each vector table: rows indexed, rows not yet indexed, progress (%) and error
         """
-        Create vector embedding for a user based on their skills and attributes
+        with self.get_engine().connect() as connection:
+            rows = connection.execute(
+                text(
+                    """
+                    SELECT TIDB_TABLE,
+                           SUM(ROWS_STABLE_INDEXED + ROWS_DELTA_INDEXED) AS indexed,
+                           SUM(ROWS_STABLE_NOT_INDEXED + ROWS_DELTA_NOT_INDEXED) AS not_indexed,
+                           MAX(ERROR_MESSAGE) AS error_message
+                    FROM INFORMATION_SCHEMA.TIFLASH_INDEXES
+                    WHERE TIDB_DATABASE = DATABASE() AND INDEX_NAME = :index_name
+                    GROUP BY TIDB_TABLE
+                    """
+                ),
+                {"index_name": VECTOR_INDEX_NAME},
+            ).fetchall()
+
+        status = {
+            table_name: {"exists": False, "indexed_rows": 0, "pending_rows": 0, "progress": 0.0}
+            for table_name in (TASK_VECTOR_TABLE, USER_VECTOR_TABLE)
+        }
+        for table_name, indexed, not_indexed, error_message in rows:
+            indexed, not_indexed = int(indexed or 0), int(not_indexed or 0)
+            total = indexed + not_indexed
+            status[table_name] = {
+                "exists": True,
+                "indexed_rows": indexed,
+                "pending_rows": not_indexed,
+                "progress": round(indexed * 100 / total, 2) if total else 100.0,
+                "error": error_message or None,
+            }
+        return status
+
+    def query_to_embedding(self, query: str) -> List[float]:
+        """Generate the embedding of a search query (cached by normalised text)"""
+        return self.queries_to_embeddings([query])[0]
+
+    def queries_to_embeddings(self, queries: List[str]) -> List[List[float]]:
+        """Generate the embeddings of several search queries, encoding cache misses in one call"""
+        if any(not query or not query.strip() for query in queries):
+            raise ValueError("Text cannot be empty")
+
+        model_name = self.embedding_service.cache_key
+        embeddings: Dict[str, List[float]] = {}
+        for query in queries:
+            cached = self.query_cache.get(model_name, query)
+            if cached is not None:
+                embeddings[query] = cached
+
+        missing = list(dict.fromkeys(query for query in queries if query not in embeddings))
+        if missing:
+            encoded = self.embedding_service.encode(missing).tolist()
+            for query, embedding in zip(missing, encoded):
+                self.query_cache.put(model_name, query, embedding)
+                embeddings[query] = embedding
+
+        return [embeddings[query] for query in queries]
+
+    def texts_to_embeddings(
+        self, texts: List[str], batch_size: int = 32
+    ) -> List[List[float]]:
+        """Generate vector embeddings for several texts in one model call (cached texts are skipped)"""
+        if any(not text or not text.strip() for text in texts):
+            raise ValueError("Text cannot be empty")
+
+        model_name = self.embedding_service.cache_key
+        cached = self.embedding_cache.get_many(model_name, texts)
+
+        missing = list(dict.fromkeys(text for text in texts if text not in cached))
+        if missing:
+            embeddings = self.embedding_service.encode(missing, batch_size=batch_size)
+            computed = dict(zip(missing, embeddings.tolist()))
+            self.embedding_cache.put_many(model_name, computed)
+            cached.update(computed)
+
+        return [cached[text] for text in texts]
+
+    def _task_metadata(self, task_id: int, task_data: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "task_id": task_id,
+            "title": task_data.get("title", ""),
+            "trade_category": task_data.get("trade_category", ""),
+            "priority": task_data.get("priority", 0),
+            "status": task_data.get("status", "pending"),
+        }
+
+    def _user_metadata(self, user_id: int, user_data: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "user_id": user_id,
+            "name": f"{user_data.get('first_name', '')} {user_data.get('last_name', '')}".strip(),
+            "role": user_data.get("role", ""),
+            "primary_skills": _as_list(user_data.get("primary_skills", [])),
+            "trade_categories": _as_list(user_data.get("trade_categories", [])),
+            "experience_years": float(user_data.get("experience_years") or 0),
+        }
+
+    def get_engine(self) -> Engine:
+        """Get or create the SQLAlchemy engine used for batch writes"""
+        if self._engine is None:
+            self._engine = create_engine(
+                self.connection_string, pool_pre_ping=True, pool_recycle=1800
+            )
+        return self._engine
+
+    def _upsert_vectors(
+        self,
+        table_name: str,
+        ids: List[str],
+        texts: List[str],
+        embeddings: List[List[float]],
+        metadatas: List[Dict[str, Any]],
+    ) -> None:
+        """Insert or replace vectors by id in a single multi-row statement"""
+        rows = [
+            {
+                "id": doc_id,
+                "embedding": json.dumps(embedding),
+                "document": document,
+                "meta": json.dumps(metadata, default=str),
+            }
+            for doc_id, document, embedding, metadata in zip(
+                ids, texts, embeddings, metadatas
+            )
+        ]
+        with self.get_engine().begin() as connection:
+            connection.execute(
+                text(
+                    f"""
+                    INSERT INTO {table_name} (id, embedding, document, meta)
+                    VALUES (:id, :embedding, :document, :meta)
+                    ON DUPLICATE KEY UPDATE
+                        embedding = VALUES(embedding),
+                        document = VALUES(document),
+                        meta = VALUES(meta)
+                    """
+                ),
+                rows,
+            )
+
+    def _delete_vectors(self, table_name: str, ids: List[str]) -> int:
+        """Delete vectors by id, returns the number of rows removed"""
+        if not ids:
+            return 0
+        params = {f"id_{i}": doc_id for i, doc_id in enumerate(ids)}
+        placeholders = ", ".join(f":{name}" for name in params)
+        with self.get_engine().begin() as connection:
+            result = connection.execute(
+                text(f"DELETE FROM {table_name} WHERE id IN ({placeholders})"), params
+            )
+        return result.rowcount
+
+    def _embeddable_rows(
+        self, kind: str, rows: List[Tuple[int, Dict[str, Any]]], build_text
+    ) -> Tuple[List[Tuple[int, Dict[str, Any]]], List[str]]:
+        """Rows with a non-empty searchable text, and those texts (empty texts cannot be embedded)"""
+        kept, texts = [], []
+        for row_id, data in rows:
+            searchable = build_text(data)
+            if searchable and searchable.strip():
+                kept.append((row_id, data))
+                texts.append(searchable)
+            else:
+                increment("vector.empty_text_skipped")
+                print(f"⚠️  {kind} {row_id} has no searchable text, vector skipped")
+        return kept, texts
+
+    def upsert_task_vectors(
+        self, tasks: List[Tuple[int, Dict[str, Any]]], batch_size: int = 32
+    ) -> List[str]:
+        """
+        Create or replace vector embeddings for several tasks (one batched encode, one write)
+        Tasks without searchable text are skipped (their ids are not returned)
         """
-        # Combine relevant user fields into searchable text
-        searchable_text = self._build_user_searchable_text(user_data)
-
-        # Generate embedding
-        embedding = self.text_to_embedding(searchable_text)
-
-        # Store in vector table
-        vector_client = self.get_users_vector_client()
-
-        # Use user_id as the document ID
-        doc_id = f"user_{user_id}"
-
-        vector_client.insert(
-            ids=[doc_id],
-            texts=[searchable_text],
-            embeddings=[embedding],
-            metadatas=[
-                {
-                    "user_id": user_id,
-                    "name": f"{user_data.get('first_name', '')} {user_data.get('last_name', '')}".strip(),
-                    "role": user_data.get("role", ""),
-                    "primary_skills": user_data.get("primary_skills", []),
-                    "trade_categories": user_data.get("trade_categories", []),
-                    "experience_years": user_data.get("experience_years", 0),
-                }
-            ],
+        tasks, texts = self._embeddable_rows("Task", tasks, self._build_task_searchable_text)
+        if not tasks:
+            return []
+
+        # Make sure the vector table exists
+        self.get_tasks_vector_client()
+
+        embeddings = self.texts_to_embeddings(texts, batch_size=batch_size)
+        doc_ids = [f"task_{task_id}" for task_id, _ in tasks]
+
+        self._upsert_vectors(
+            TASK_VECTOR_TABLE,
+            doc_ids,
+            texts,
+            embeddings,
+            [self._task_metadata(task_id, data) for task_id, data in tasks],
         )
 
-        return doc_id
+        return doc_ids
 
-    def search_similar_tasks(self, query: str, k: int = 5) -> List[VectorSearchResult]:
+    def upsert_user_vectors(
+        self, users: List[Tuple[int, Dict[str, Any]]], batch_size: int = 32
+    ) -> List[str]:
         """
-        Search for tasks similar to the query
+        Create or replace vector embeddings for several users (one batched encode, one write)
+        Users without searchable text are skipped (their ids are not returned)
         """
-        query_embedding = self.text_to_embedding(query)
-        vector_client = self.get_tasks_vector_client()
+        users, texts = self._embeddable_rows("User", users, self._build_user_searchable_text)
+        if not users:
+            return []
 
-        results = vector_client.query(query_embedding, k=k)
+        # Make sure the vector table exists
+        self.get_users_vector_client()
 
-        return [
-            VectorSearchResult(
-                id=result.id,
-                text=result.document,
-                metadata=result.metadata,
-                distance=result.distance,
-            )
-            for result in results
-        ]
+        embeddings = self.texts_to_embeddings(texts, batch_size=batch_size)
+        doc_ids = [f"user_{user_id}" for user_id, _ in users]
+
+        metadatas = [self._user_metadata(user_id, data) for user_id, data in users]
+        self._upsert_vectors(USER_VECTOR_TABLE, doc_ids, texts, embeddings, metadatas)
+
+        if self.local_user_index is not None:
+            self.local_user_index.upsert(doc_ids, embeddings, texts, metadatas)
+
+        return doc_ids
+
+    def delete_task_vectors(self, task_ids: List[int]) -> int:
+        """Delete the vectors of several tasks"""
+        return self._delete_vectors(
+            TASK_VECTOR_TABLE, [f"task_{task_id}" for task_id in task_ids]
+        )
+
+    def delete_user_vectors(self, user_ids: List[int]) -> int:
+        """Delete the vectors of several users"""
+        doc_ids = [f"user_{user_id}" for user_id in user_ids]
+        deleted = self._delete_vectors(USER_VECTOR_TABLE, doc_ids)
+        if self.local_user_index is not None:
+            self.local_user_index.remove(doc_ids)
+        return deleted
 
-    def search_similar_users(self, query: str, k: int = 5) -> List[VectorSearchResult]:
+    def compact(self) -> Dict[str, int]:
         """
-        Search for users with skills similar to the query
+        Purge orphan vectors (rows whose task/user no longer exists)
+
+        Returns:
+            Number of vectors removed per vector table
         """
-        query_embedding = self.text_to_embedding(query)
-        vector_client = self.get_users_vector_client()
+        removed = {}
+        for table_name, source_table, prefix in [
+            (TASK_VECTOR_TABLE, "tasks", "task_"),
+            (USER_VECTOR_TABLE, "users", "user_"),
+        ]:
+            with self.get_engine().begin() as connection:
+                result = connection.execute(
+                    text(
+                        f"""
+                        DELETE FROM {table_name}
+                        WHERE id NOT LIKE '{prefix}%'
+                           OR NOT EXISTS (
+                               SELECT 1 FROM {source_table} s
+                               WHERE s.id = CAST(SUBSTRING({table_name}.id, {len(prefix) + 1}) AS UNSIGNED)
+                           )
+                        """
+                    )
+                )
+            removed[table_name] = result.rowcount
+            print(f"🧹 {result.rowcount} orphan vector(s) removed from {table_name}")
 
-        results = vector_client.query(query_embedding, k=k)
+        if self.local_user_index is not None and removed[USER_VECTOR_TABLE]:
+            self.local_user_index.refresh(full=True)
+        return removed
 
-        return [
-            VectorSearchResult(
-                id=result.id,
-                text=result.document,
-                metadata=result.metadata,
-                distance=result.distance,
-            )
-            for result in results
-        ]
+    def create_task_vector(self, task_id: int, task_data: Dict[str, Any]) -> str:
+        """
+        Create (or replace) vector embedding for a task based on its attributes
+        """
+        doc_ids = self.upsert_task_vectors([(task_id, task_data)])
+        if not doc_ids:
+            raise ValueError("Text cannot be empty")
+        return doc_ids[0]
+
+    def create_user_vector(self, user_id: int, user_data: Dict[str, Any]) -> str:
+        """
+        Create (or replace) vector embedding for a user based on their skills and attributes
+        """
+        doc_ids = self.upsert_user_vectors([(user_id, user_data)])
+        if not doc_ids:
+            raise ValueError("Text cannot be empty")
+        return doc_ids[0]
+
+    def search_similar_tasks(
+        self,
+        query: str,
+        k: int = 5,
+        filters: Optional[VectorFilter] = None,
+        mode: Optional[str] = None,
+    ) -> List[VectorSearchResult]:
+        """
+        Search for tasks similar to the query
+        """
+        return self.search_many(
+            [query], k=k, table_name=TASK_VECTOR_TABLE, filters=filters, mode=mode
+        )[0]
+
+    def search_similar_users(
+        self,
+        query: str,
+        k: int = 5,
+        filters: Optional[VectorFilter] = None,
+        mode: Optional[str] = None,
+    ) -> List[VectorSearchResult]:
+        """
+        Search for users with skills similar to the query
+        """
+        return self.search_many(
+            [query], k=k, table_name=USER_VECTOR_TABLE, filters=filters, mode=mode
+        )[0]
 
     def find_best_workers_for_task(
-        self, task_description: str, k: int = 3
+        self,
+        task_description: str,
+        k: int = 3,
+        filters: Optional[VectorFilter] = None,
+        mode: Optional[str] = None,
     ) -> List[VectorSearchResult]:
         """
         Find the best workers for a given task description
         """
-        return self.search_similar_users(task_description, k=k)
+        return self.search_similar_users(task_description, k=k, filters=filters, mode=mode)
+
+    def search_many(
+        self,
+        queries: List[str],
+        k: int = 5,
+        table_name: str = USER_VECTOR_TABLE,
+        filters: Optional[VectorFilter] = None,
+        mode: Optional[str] = None,
+    ) -> List[List[VectorSearchResult]]:
+        """
+        Run several k-NN searches at once: one batched encode and one SQL round-trip
+        (a UNION ALL of per-query WHERE ... ORDER BY distance LIMIT k subqueries)
+
+        Args:
+            mode: "ann" uses the HNSW index (approximate), "exact" scans every row.
+                  Defaults to "ann" without filters and "exact" with filters, since
+                  the index cannot pre-filter and would return fewer than k rows.
+
+        Returns:
+            One result list per query, in the same order as `queries`
+        """
+        if not queries:
+            return []
+
+        if mode is not None and mode not in SEARCH_MODES:
+            raise ValueError(f"mode must be one of {SEARCH_MODES}")
+
+        # Small user table served from memory when the local copy is up to date
+        if (
+            table_name == USER_VECTOR_TABLE
+            and self.local_user_index is not None
+            and self.local_user_index.is_fresh()
+        ):
+            increment("local_index.hits")
+            return [
+                [
+                    VectorSearchResult(id=doc_id, text=document, metadata=metadata, distance=distance)
+                    for doc_id, document, metadata, distance in self.local_user_index.search(
+                        embedding, int(k), filters
+                    )
+                ]
+                for embedding in self.queries_to_embeddings(queries)
+            ]
+        if table_name == USER_VECTOR_TABLE and self.local_user_index is not None:
+            increment("local_index.stale_fallbacks")
+
+        # Make sure the vector table exists
+        if table_name == TASK_VECTOR_TABLE:
+            self.get_tasks_vector_client()
+        else:
+            self.get_users_vector_client()
+
+        embeddings = self.queries_to_embeddings(queries)
+        limit = int(k)
+        has_index = self.has_vector_index(table_name)
+
+        subqueries = []
+        params: Dict[str, Any] = {}
+        for i, embedding in enumerate(embeddings):
+            distance_expr = f"VEC_COSINE_DISTANCE(embedding, :embedding_{i})"
+            params[f"embedding_{i}"] = json.dumps(embedding)
+
+            where = ""
+            if filters is not None:
+                conditions, filter_params = filters.to_sql(distance_expr, str(i))
+                params.update(filter_params)
+                if conditions:
+                    where = "WHERE " + " AND ".join(conditions)
+
+            search_mode = mode or ("exact" if where else "ann")
+            index_hint = (
+                f"IGNORE INDEX ({VECTOR_INDEX_NAME})"
+                if search_mode == "exact" and has_index
+                else ""
+            )
+
+            subqueries.append(
+                f"""
+                (SELECT {i} AS query_index, id, document, meta,
+                        {distance_expr} AS distance
+                 FROM {table_name} {index_hint}
+                 {where}
+                 ORDER BY distance
+                 LIMIT {limit})
+                """
+            )
+
+        with self.get_engine().connect() as connection:
+            rows = connection.execute(
+                text(" UNION ALL ".join(subqueries)), params
+            ).fetchall()
+
+        results: List[List[VectorSearchResult]] = [[] for _ in queries]
+        for query_index, doc_id, document, meta, distance in rows:
+            results[query_index].append(
+                VectorSearchResult(
+                    id=doc_id,
+                    text=document,
+                    metadata=json.loads(meta) if isinstance(meta, str) else meta,
+                    distance=distance,
+                )
+            )
+        for query_results in results:
+            query_results.sort(key=lambda result: result.distance)
+        return results
+
+    def find_best_workers_for_tasks(
+        self,
+        task_descriptions: List[str],
+        k: int = 3,
+        filters: Optional[VectorFilter] = None,
+        mode: Optional[str] = None,
+    ) -> List[List[VectorSearchResult]]:
+        """
+        Find the best workers for several task descriptions in one round-trip
+        """
+        return self.search_many(
+            task_descriptions,
+            k=k,
+            table_name=USER_VECTOR_TABLE,
+            filters=filters,
+            mode=mode,
+        )
 
     def find_similar_tasks(
         self, task_description: str, k: int = 5
@@ -306,3 +986,24 @@ class TiDBVectorManager:
                 )
 
         return " | ".join(components)
+
+
+_vector_manager: Optional[TiDBVectorManager] = None
+_vector_manager_lock = threading.Lock()
+
+
+def get_vector_manager() -> TiDBVectorManager:
+    """Get the process-wide TiDBVectorManager (model and vector clients are reused)"""
+    global _vector_manager
+    if _vector_manager is None:
+        with _vector_manager_lock:
+            if _vector_manager is None:
+                _vector_manager = TiDBVectorManager()
+    return _vector_manager
+
+
+def get_local_user_index_stats() -> Optional[Dict[str, Any]]:
+    """Stats of the local user index, None when disabled or not created yet"""
+    if _vector_manager is None or _vector_manager.local_user_index is None:
+        return None
+    return _vector_manager.local_user_index.stats()
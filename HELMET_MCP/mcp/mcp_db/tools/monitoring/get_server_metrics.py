@@ -0,0 +1,38 @@
+from mcp_init import mcp, db_pool
+import json
+
+from metrics import snapshot
+from backend_notifier import notifier
+from tools.vector_sync import vector_sync
+from tools.embedding.cache import get_embedding_cache, get_query_cache
+from tools.embedding.vector import get_local_user_index_stats
+
+
+@mcp.tool()
+def get_server_metrics() -> str:
+    """
+    Returns in-process performance metrics of the MCP server.
+
+    Counters and timings (count, total/avg/max/last in milliseconds) collected
+    since the server started, e.g. embedding model load and encode times or
+    connection pool wait times, plus the current connection pool usage, the
+    backend notifier and vector sync queue depths, the embedding/query cache
+    hit rates and the local user index state.
+
+    RETURN:
+    JSON with "counters", "timings", "db_pool", "notifier", "vector_sync",
+    "embedding_cache", "query_cache" and "local_user_index" objects.
+    """
+    return json.dumps(
+        {
+            "success": True,
+            **snapshot(),
+            "db_pool": db_pool.stats(),
+            "notifier": notifier.stats(),
+            "vector_sync": vector_sync.stats(),
+            "embedding_cache": get_embedding_cache().stats(),
+            "query_cache": get_query_cache().stats(),
+            "local_user_index": get_local_user_index_stats(),
+        },
+        indent=2,
+    )
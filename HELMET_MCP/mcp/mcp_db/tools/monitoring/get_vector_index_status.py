@@ -0,0 +1,27 @@
+from mcp_init import mcp
+import json
+
+from tools.embedding.vector import get_vector_manager
+
+
+@mcp.tool()
+def get_vector_index_status() -> str:
+    """
+    Returns the build progress of the HNSW vector indexes on task_vectors and user_vectors.
+
+    Approximate (ann) vector searches are only fast once the index has been
+    built by TiFlash; rows not yet indexed are still scanned exactly.
+
+    RETURN:
+    JSON with, for each vector table: "exists", "indexed_rows", "pending_rows",
+    "progress" (percentage) and "error".
+    """
+    try:
+        return json.dumps(
+            {"success": True, "indexes": get_vector_manager().vector_index_status()},
+            indent=2,
+        )
+    except Exception as e:
+        return json.dumps(
+            {"success": False, "error": f"❌ Error reading vector index status: {str(e)}"}
+        )
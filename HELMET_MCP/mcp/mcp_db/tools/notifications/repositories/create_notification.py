@@ -1,11 +1,12 @@
-from mcp_init import mcp, get_db_connection
+from mcp_init import mcp, get_db_connection, release_db_connection
 from typing import List, Dict, Any
 import json
+from datetime import datetime
 import sys
 import os
 
 sys.path.append(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
-from backend_notifier import notify_db_update
+from backend_notifier import publish_change, serialize_change_row
 
 
 @mcp.tool()
@@ -120,8 +121,9 @@ def create_notification(
     if not db:
         return "❌ Database connection failed"
 
-    cursor = db.cursor(buffered=True)
+    cursor = None
     try:
+        cursor = db.cursor(buffered=True)
         insert_query = """
         INSERT INTO notifications (
             title, what_you_need_to_know, what_we_can_trigger, 
@@ -147,7 +149,7 @@ def create_notification(
         cursor.execute(
             """
             SELECT id, title, what_you_need_to_know, what_we_can_trigger,
-                   is_triggered, action_list, is_readed, total_time_saved
+                   is_triggered, action_list, is_readed, total_time_saved, updated_at
             FROM notifications WHERE id = %s
             """,
             (notification_id,),
@@ -170,6 +172,8 @@ def create_notification(
                             notification_dict[column_name] = []
                     except (json.JSONDecodeError, TypeError):
                         notification_dict[column_name] = []
+                elif isinstance(value, datetime):
+                    notification_dict[column_name] = value.isoformat()
                 else:
                     notification_dict[column_name] = value
 
@@ -181,7 +185,13 @@ def create_notification(
 
             # Notify backend
             try:
-                notify_db_update(data_param)
+                publish_change(
+                    data_param,
+                    notification_id,
+                    "create",
+                    columns,
+                    serialize_change_row(columns, result),
+                )
             except Exception as notify_error:
                 print(f"Warning: Backend notification failed: {notify_error}")
 
@@ -198,4 +208,6 @@ def create_notification(
         db.rollback()
         return f"❌ Database error: {str(e)}"
     finally:
-        cursor.close()
+        if cursor is not None:
+            cursor.close()
+        release_db_connection(db)
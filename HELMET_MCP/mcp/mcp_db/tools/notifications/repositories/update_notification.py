@@ -1,6 +1,8 @@
-from mcp_init import mcp, get_db_connection
+from mcp_init import mcp, get_db_connection, release_db_connection
+from backend_notifier import publish_change, serialize_change_row
 from typing import Optional, List, Dict, Any
 import json
+from datetime import datetime
 
 
 @mcp.tool()
@@ -96,8 +98,9 @@ def update_notification(
     if not db:
         return "❌ Database connection failed"
     
-    cursor = db.cursor(buffered=True)
+    cursor = None
     try:
+        cursor = db.cursor(buffered=True)
         # Check if notification exists
         cursor.execute("SELECT id FROM notifications WHERE id = %s", (notification_id,))
         if not cursor.fetchone():
@@ -177,7 +180,7 @@ def update_notification(
         cursor.execute(
             """
             SELECT id, title, what_you_need_to_know, what_we_can_trigger,
-                   is_triggered, action_list, is_readed, total_time_saved
+                   is_triggered, action_list, is_readed, total_time_saved, updated_at
             FROM notifications WHERE id = %s
             """,
             (notification_id,),
@@ -198,9 +201,23 @@ def update_notification(
                             notification_dict[column_name] = []
                     except (json.JSONDecodeError, TypeError):
                         notification_dict[column_name] = []
+                elif isinstance(value, datetime):
+                    notification_dict[column_name] = value.isoformat()
                 else:
                     notification_dict[column_name] = value
             
+            # Notify backend
+            try:
+                publish_change(
+                    "notification",
+                    notification_id,
+                    "update",
+                    [field.split(" = ")[0] for field in update_fields],
+                    serialize_change_row(columns, result),
+                )
+            except Exception as notify_error:
+                print(f"Warning: Backend notification failed: {notify_error}")
+            
             success_result = {
                 "success": True,
                 "message": f"✅ Notification {notification_id} updated successfully.",
@@ -214,4 +231,6 @@ def update_notification(
         db.rollback()
         return f"❌ Database error: {str(e)}"
     finally:
-        cursor.close()
\ No newline at end of file
+        if cursor is not None:
+            cursor.close()
+        release_db_connection(db)
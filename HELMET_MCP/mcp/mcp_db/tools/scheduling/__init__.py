@@ -0,0 +1,2 @@
+# Scheduling Tools Package
+# Deterministic schedule analysis (conflicts) over the tasks table
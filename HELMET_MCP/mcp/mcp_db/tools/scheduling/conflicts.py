@@ -0,0 +1,168 @@
+"""
+Schedule conflict engine
+Finds, per shared resource, the tasks whose time intervals overlap:
+- workers: the same worker assigned to two overlapping tasks
+- zones: two tasks in the same room (building_section, floor, room) closer
+  than the zone buffer (15 minutes between teams by default)
+- equipment: the same equipment required by two overlapping tasks
+
+Each resource is handled by a sweep line over its intervals sorted by start,
+with a heap of the active intervals ordered by end: O(n log n + conflicts)
+instead of comparing every pair of tasks.
+"""
+
+import json
+import heapq
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Tuple
+
+# Minimum gap between two teams working in the same zone
+DEFAULT_ZONE_BUFFER_MINUTES = 15
+
+# Task columns read by the engine
+SCHEDULE_FIELDS = [
+    "id",
+    "title",
+    "status",
+    "start_date",
+    "due_date",
+    "assigned_workers",
+    "room",
+    "floor",
+    "building_section",
+    "required_equipment",
+]
+
+
+def json_list(value: Any) -> List[Any]:
+    """JSON column value (string from the driver, or already decoded) as a list"""
+    if value is None:
+        return []
+    if isinstance(value, (bytes, bytearray)):
+        value = value.decode("utf-8")
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            return []
+    return list(value) if isinstance(value, (list, tuple)) else []
+
+
+def worker_ids(value: Any) -> List[int]:
+    """Worker ids of an assigned_workers value (ints or {"id": ...} objects)"""
+    workers = []
+    for worker in json_list(value):
+        if isinstance(worker, dict):
+            worker = worker.get("id")
+        try:
+            workers.append(int(worker))
+        except (TypeError, ValueError):
+            continue
+    return workers
+
+
+def zone_key(task: Dict[str, Any]) -> Optional[str]:
+    """Zone identifier of a task ("section / floor / room"), None without a room"""
+    room = (task.get("room") or "").strip()
+    if not room:
+        return None
+    section = (task.get("building_section") or "").strip()
+    return f"{section} / {task.get('floor')} / {room}"
+
+
+def sweep_overlaps(
+    intervals: Iterable[Tuple[datetime, datetime, Any]], buffer: timedelta = timedelta(0)
+) -> Iterable[Tuple[Any, Any]]:
+    """
+    Yield the pairs of items whose intervals overlap once `buffer` is added
+    after each end (intervals are half-open [start, end))
+    """
+    active: List[Tuple[datetime, int, Any]] = []  # heap of (end + buffer, seq, item)
+    for seq, (start, end, item) in enumerate(sorted(intervals, key=lambda i: (i[0], i[1]))):
+        while active and active[0][0] <= start:
+            heapq.heappop(active)
+        for _, _, other in active:
+            yield other, item
+        heapq.heappush(active, (end + buffer, seq, item))
+
+
+def _conflict(resource: Hashable, first: Dict[str, Any], second: Dict[str, Any]) -> Dict[str, Any]:
+    overlap_start = max(first["start_date"], second["start_date"])
+    overlap_end = min(first["due_date"], second["due_date"])
+    conflict = {
+        "resource": resource,
+        "task_ids": sorted([first["id"], second["id"]]),
+    }
+    if overlap_end > overlap_start:
+        conflict["type"] = "overlap"
+        conflict["overlap_start"] = overlap_start.isoformat()
+        conflict["overlap_end"] = overlap_end.isoformat()
+        conflict["overlap_minutes"] = int((overlap_end - overlap_start).total_seconds() // 60)
+    else:
+        conflict["type"] = "buffer"
+        conflict["gap_minutes"] = int((overlap_start - overlap_end).total_seconds() // 60)
+    return conflict
+
+
+def detect_schedule_conflicts(
+    tasks: List[Dict[str, Any]],
+    zone_buffer_minutes: int = DEFAULT_ZONE_BUFFER_MINUTES,
+    focus_task_ids: Optional[set] = None,
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Conflicts between `tasks` grouped by resource type
+
+    Args:
+        tasks: Rows with SCHEDULE_FIELDS (start_date / due_date as datetimes)
+        zone_buffer_minutes: Minimum gap between two tasks of the same zone
+        focus_task_ids: Only report conflicts involving one of these tasks
+
+    Returns:
+        {"workers": [...], "zones": [...], "equipment": [...]}, each conflict being
+        {"resource", "task_ids", "type": "overlap"|"buffer", overlap or gap details}
+    """
+    by_worker = defaultdict(list)
+    by_zone = defaultdict(list)
+    by_equipment = defaultdict(list)
+
+    for task in tasks:
+        start, end = task.get("start_date"), task.get("due_date")
+        if not isinstance(start, datetime) or not isinstance(end, datetime) or end <= start:
+            continue
+        for worker in set(worker_ids(task.get("assigned_workers"))):
+            by_worker[worker].append((start, end, task))
+        zone = zone_key(task)
+        if zone:
+            by_zone[zone].append((start, end, task))
+        for equipment in {str(e).strip().lower() for e in json_list(task.get("required_equipment"))}:
+            if equipment:
+                by_equipment[equipment].append((start, end, task))
+
+    def collect(groups, buffer: timedelta) -> List[Dict[str, Any]]:
+        conflicts = []
+        for resource, intervals in groups.items():
+            if len(intervals) < 2:
+                continue
+            for first, second in sweep_overlaps(intervals, buffer):
+                if focus_task_ids and not ({first["id"], second["id"]} & focus_task_ids):
+                    continue
+                conflicts.append(_conflict(resource, first, second))
+        return sorted(conflicts, key=lambda c: (str(c["resource"]), c["task_ids"]))
+
+    return {
+        "workers": collect(by_worker, timedelta(0)),
+        "zones": collect(by_zone, timedelta(minutes=zone_buffer_minutes)),
+        "equipment": collect(by_equipment, timedelta(0)),
+    }
+
+
+__all__ = [
+    "DEFAULT_ZONE_BUFFER_MINUTES",
+    "SCHEDULE_FIELDS",
+    "json_list",
+    "worker_ids",
+    "zone_key",
+    "sweep_overlaps",
+    "detect_schedule_conflicts",
+]
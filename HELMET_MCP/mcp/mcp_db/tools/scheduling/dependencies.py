@@ -0,0 +1,310 @@
+"""
+Task dependency graph
+Directed graph built from the `dependencies` (prerequisites) and `blocks_tasks`
+(successors) JSON columns of `tasks`, with:
+- cycle detection and topological order (Kahn)
+- transitive successors of a task
+- critical path and slack (latest finish of each task against the project end)
+- delay propagation: shifted dates of every successor, each one absorbing the
+  slack it has before its own start
+
+The graph is kept in process (DependencyGraphCache) and rebuilt on the next
+read after a task write, or after DEPENDENCY_GRAPH_TTL seconds for writes made
+by other processes.
+"""
+
+import os
+import json
+import time
+import threading
+from collections import defaultdict, deque
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+from metrics import increment, record_timing
+
+# Task columns read to build the graph
+GRAPH_FIELDS = ["id", "title", "status", "start_date", "due_date", "dependencies", "blocks_tasks"]
+
+
+def _task_ids(value: Any) -> List[int]:
+    """Task ids of a dependencies / blocks_tasks value (JSON list of ids)"""
+    if isinstance(value, (bytes, bytearray)):
+        value = value.decode("utf-8")
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            return []
+    if not isinstance(value, (list, tuple)):
+        return []
+    ids = []
+    for item in value:
+        if isinstance(item, dict):
+            item = item.get("id")
+        try:
+            ids.append(int(item))
+        except (TypeError, ValueError):
+            continue
+    return ids
+
+
+def _hours(delta: timedelta) -> float:
+    return round(delta.total_seconds() / 3600, 2)
+
+
+class DependencyGraph:
+    """
+    Dependency DAG of the tasks (an edge u -> v means v cannot start before u is due).
+
+    References to unknown tasks are kept in `missing_references` and ignored;
+    tasks on a cycle are reported by `cycles` and left out of the topological
+    order, scheduling computations and delay propagation.
+    """
+
+    def __init__(self, tasks: Iterable[Dict[str, Any]]):
+        self.tasks: Dict[int, Dict[str, Any]] = {int(task["id"]): task for task in tasks}
+        self.successors: Dict[int, Set[int]] = defaultdict(set)
+        self.predecessors: Dict[int, Set[int]] = defaultdict(set)
+        self.missing_references: Set[int] = set()
+
+        for task_id, task in self.tasks.items():
+            for prerequisite in _task_ids(task.get("dependencies")):
+                self._add_edge(prerequisite, task_id)
+            for blocked in _task_ids(task.get("blocks_tasks")):
+                self._add_edge(task_id, blocked)
+
+        self.order, self.cyclic = self._topological_order()
+        self._latest_finish: Optional[Dict[int, datetime]] = None
+
+    def _add_edge(self, source: int, target: int) -> None:
+        if source == target:
+            return
+        for task_id in (source, target):
+            if task_id not in self.tasks:
+                self.missing_references.add(task_id)
+                return
+        self.successors[source].add(target)
+        self.predecessors[target].add(source)
+
+    def _topological_order(self):
+        """Kahn's algorithm: (order, ids left on or behind a cycle)"""
+        in_degree = {task_id: len(self.predecessors[task_id]) for task_id in self.tasks}
+        queue = deque(sorted(task_id for task_id, degree in in_degree.items() if degree == 0))
+        order = []
+        while queue:
+            task_id = queue.popleft()
+            order.append(task_id)
+            for successor in sorted(self.successors[task_id]):
+                in_degree[successor] -= 1
+                if in_degree[successor] == 0:
+                    queue.append(successor)
+        return order, set(self.tasks) - set(order)
+
+    # ------------------------------------------------------------------
+    # Structure
+    # ------------------------------------------------------------------
+
+    def cycles(self) -> List[List[int]]:
+        """Elementary cycles found among the tasks left out of the topological order"""
+        cycles, visited = [], set()
+        for start in sorted(self.cyclic):
+            if start in visited:
+                continue
+            # Walk successors inside the cyclic set until a node repeats
+            path, positions, node = [], {}, start
+            while node is not None and node not in positions and node not in visited:
+                positions[node] = len(path)
+                path.append(node)
+                node = next((s for s in sorted(self.successors[node]) if s in self.cyclic), None)
+            if node is not None and node in positions:
+                cycles.append(path[positions[node]:])
+            visited.update(path)
+        return cycles
+
+    def transitive_successors(self, task_id: int) -> List[int]:
+        """Every task reachable from `task_id`, in topological order when acyclic"""
+        seen, queue = set(), deque([task_id])
+        while queue:
+            for successor in self.successors[queue.popleft()]:
+                if successor not in seen and successor != task_id:
+                    seen.add(successor)
+                    queue.append(successor)
+        rank = {node: i for i, node in enumerate(self.order)}
+        return sorted(seen, key=lambda node: (rank.get(node, len(rank)), node))
+
+    # ------------------------------------------------------------------
+    # Critical path
+    # ------------------------------------------------------------------
+
+    def _dates(self, task_id: int):
+        task = self.tasks[task_id]
+        start, due = task.get("start_date"), task.get("due_date")
+        if isinstance(start, datetime) and isinstance(due, datetime):
+            return start, due
+        return None
+
+    def latest_finish(self) -> Dict[int, datetime]:
+        """
+        Latest due date of each scheduled task that keeps the project end
+        (latest due date of all tasks) unchanged - backward pass over the DAG
+        """
+        if self._latest_finish is not None:
+            return self._latest_finish
+
+        scheduled = {task_id: self._dates(task_id) for task_id in self.order}
+        scheduled = {task_id: dates for task_id, dates in scheduled.items() if dates}
+        latest: Dict[int, datetime] = {}
+        if scheduled:
+            project_end = max(due for _, due in scheduled.values())
+            for task_id in reversed(self.order):
+                if task_id not in scheduled:
+                    continue
+                finish = project_end
+                for successor in self.successors[task_id]:
+                    if successor in latest:
+                        start, due = scheduled[successor]
+                        finish = min(finish, latest[successor] - (due - start))
+                latest[task_id] = finish
+        self._latest_finish = latest
+        return latest
+
+    def slack_hours(self, task_id: int) -> Optional[float]:
+        """Hours `task_id` can slip without delaying the project end"""
+        latest = self.latest_finish().get(task_id)
+        dates = self._dates(task_id) if task_id in self.tasks else None
+        if latest is None or not dates:
+            return None
+        return _hours(latest - dates[1])
+
+    def critical_path(self) -> List[int]:
+        """Longest zero-slack chain ending at the project end"""
+        latest = self.latest_finish()
+        if not latest:
+            return []
+        slack = {task_id: latest[task_id] - self._dates(task_id)[1] for task_id in latest}
+        critical = {task_id for task_id, value in slack.items() if value <= timedelta(0)}
+
+        # Chain critical tasks forwards from critical tasks without critical predecessors
+        best: Dict[int, List[int]] = {}
+        for task_id in self.order:
+            if task_id not in critical:
+                continue
+            chains = [best[p] for p in self.predecessors[task_id] if p in best]
+            best[task_id] = max(chains, key=len, default=[]) + [task_id]
+        return max(best.values(), key=len, default=[])
+
+    # ------------------------------------------------------------------
+    # Delay propagation
+    # ------------------------------------------------------------------
+
+    def propagate_delay(self, task_id: int, delay_hours: float) -> List[Dict[str, Any]]:
+        """
+        Shift `task_id` by `delay_hours` and every successor by what it needs to
+        start after all of its prerequisites are due (its slack absorbs the rest)
+
+        Returns one entry per transitive successor (the delayed task first)
+        """
+        delay = timedelta(hours=delay_hours)
+        new_due: Dict[int, datetime] = {}
+        impacts = []
+
+        for current in [task_id] + self.transitive_successors(task_id):
+            dates = self._dates(current)
+            if current in self.cyclic or not dates:
+                impacts.append(self._impact(current, None, None, timedelta(0)))
+                continue
+            start, due = dates
+            if current == task_id:
+                shift = delay
+            else:
+                required_start = max(
+                    (new_due[p] for p in self.predecessors[current] if p in new_due), default=start
+                )
+                shift = max(timedelta(0), required_start - start)
+            new_due[current] = due + shift
+            impacts.append(self._impact(current, start + shift, due + shift, shift))
+        return impacts
+
+    def _impact(self, task_id, new_start, new_due, shift: timedelta) -> Dict[str, Any]:
+        task = self.tasks[task_id]
+        impact = {
+            "task_id": task_id,
+            "title": task.get("title"),
+            "status": task.get("status"),
+            "depends_on": sorted(self.predecessors[task_id]),
+            "shift_hours": _hours(shift),
+            "slack_hours": self.slack_hours(task_id),
+            "start_date": _iso(task.get("start_date")),
+            "due_date": _iso(task.get("due_date")),
+            "new_start_date": _iso(new_start),
+            "new_due_date": _iso(new_due),
+        }
+        if task_id in self.cyclic:
+            impact["warning"] = "Task is on a dependency cycle, dates not propagated"
+        return impact
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "tasks": len(self.tasks),
+            "edges": sum(len(s) for s in self.successors.values()),
+            "cyclic_tasks": len(self.cyclic),
+            "missing_references": len(self.missing_references),
+        }
+
+
+def _iso(value: Any) -> Optional[str]:
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+class DependencyGraphCache:
+    """Process-wide DependencyGraph, rebuilt after invalidate() or after `ttl` seconds"""
+
+    def __init__(self, ttl: float = 60.0):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._graph: Optional[DependencyGraph] = None
+        self._built_at = 0.0
+        self._generation = 0
+
+    def get(self, loader: Callable[[], List[Dict[str, Any]]]) -> DependencyGraph:
+        with self._lock:
+            if self._graph is not None and time.monotonic() - self._built_at <= self.ttl:
+                increment("dependency_graph.hits")
+                return self._graph
+            generation = self._generation
+
+        # Built outside the lock: a write during the load makes the result stale
+        start = time.perf_counter()
+        graph = DependencyGraph(loader())
+        record_timing("dependency_graph.build", time.perf_counter() - start)
+        increment("dependency_graph.builds")
+
+        with self._lock:
+            if generation == self._generation:
+                self._graph = graph
+                self._built_at = time.monotonic()
+        return graph
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._graph = None
+            self._generation += 1
+        increment("dependency_graph.invalidations")
+
+
+dependency_graph_cache = DependencyGraphCache(ttl=float(os.getenv("DEPENDENCY_GRAPH_TTL", "60")))
+
+
+def invalidate_dependency_graph() -> None:
+    """Called after every task write (create_task / update_task)"""
+    dependency_graph_cache.invalidate()
+
+
+__all__ = [
+    "GRAPH_FIELDS",
+    "DependencyGraph",
+    "DependencyGraphCache",
+    "dependency_graph_cache",
+    "invalidate_dependency_graph",
+]
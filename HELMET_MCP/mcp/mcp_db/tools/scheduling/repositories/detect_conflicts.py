@@ -0,0 +1,163 @@
+from mcp_init import mcp, get_db_connection, release_db_connection
+from typing import Optional
+from datetime import datetime, timedelta
+import json
+import time
+
+from metrics import record_timing
+from result_stream import serialize_value, iter_rows, close_cursor, record_output, COMPACT
+from tools.scheduling.conflicts import (
+    DEFAULT_ZONE_BUFFER_MINUTES,
+    SCHEDULE_FIELDS,
+    detect_schedule_conflicts,
+    worker_ids,
+)
+
+
+def _parse_datetime(value: str, name: str) -> datetime:
+    try:
+        return datetime.fromisoformat(str(value).strip())
+    except ValueError:
+        raise ValueError(f"{name} must be 'YYYY-MM-DD' or 'YYYY-MM-DDTHH:MM'. Received: '{value}'")
+
+
+@mcp.tool()
+def detect_conflicts(
+    window_from: Optional[str] = None,
+    window_to: Optional[str] = None,
+    task_id: Optional[str] = None,
+    worker_id: Optional[str] = None,
+    zone_buffer_minutes: Optional[int] = DEFAULT_ZONE_BUFFER_MINUTES,
+    include_completed: Optional[bool] = False,
+) -> str:
+    """
+    🚧 DETECT SCHEDULE CONFLICTS - Deterministic overlap check over all tasks in ONE call
+
+    Finds, without any LLM reasoning:
+    - WORKERS: a worker assigned to two tasks whose times overlap
+    - ZONES: two tasks in the same room (building_section + floor + room) that overlap
+      or are separated by less than the zone buffer (15 minutes between teams)
+    - EQUIPMENT: the same equipment required by two overlapping tasks
+
+    PARAMETERS (all optional):
+    window_from / window_to : str - Only tasks running in [window_from, window_to)
+                              ("YYYY-MM-DD" or "YYYY-MM-DDTHH:MM")
+    task_id : str - Only conflicts involving this task (window defaults to the task's
+              own start/due dates)
+    worker_id : str - Only conflicts involving the tasks of this worker
+    zone_buffer_minutes : int - Minimum gap between two teams in the same zone (default 15)
+    include_completed : bool - Also check completed tasks (default False)
+
+    EXAMPLES:
+    detect_conflicts()  # Every conflict in the current schedule
+    detect_conflicts(window_from="2025-09-06", window_to="2025-09-07")  # One day
+    detect_conflicts(task_id="12")  # Is task 12 clashing with anything?
+    detect_conflicts(worker_id="3", window_from="2025-09-06T10:00", window_to="2025-09-06T18:00")
+
+    RETURN:
+    JSON with "conflict_count", "conflicts" {"workers", "zones", "equipment"} - each
+    conflict is {"resource", "task_ids", "type": "overlap"|"buffer",
+    "overlap_start"/"overlap_end"/"overlap_minutes" or "gap_minutes"} - and "tasks"
+    (id -> title, status, start_date, due_date) for the tasks involved.
+    """
+    started = time.perf_counter()
+
+    # Parameter validation
+    if task_id is not None and not str(task_id).strip().isdigit():
+        return json.dumps({"success": False, "error": f"task_id must be numeric. Received: '{task_id}'"})
+    if worker_id is not None and not str(worker_id).strip().isdigit():
+        return json.dumps({"success": False, "error": f"worker_id must be numeric. Received: '{worker_id}'"})
+    try:
+        buffer_minutes = int(zone_buffer_minutes if zone_buffer_minutes is not None else DEFAULT_ZONE_BUFFER_MINUTES)
+        if buffer_minutes < 0:
+            raise ValueError("zone_buffer_minutes must be >= 0")
+        window_start = _parse_datetime(window_from, "window_from") if window_from else None
+        window_end = _parse_datetime(window_to, "window_to") if window_to else None
+        if window_start and window_end and window_end <= window_start:
+            raise ValueError("window_to must be after window_from")
+    except ValueError as e:
+        return json.dumps({"success": False, "error": "Invalid parameter", "message": str(e)})
+
+    db = get_db_connection()
+    if not db:
+        return json.dumps({"success": False, "error": "❌ Error: Unable to connect to database"})
+
+    buffer = timedelta(minutes=buffer_minutes)
+    cursor = None
+    try:
+        cursor = db.cursor(buffered=False)
+        # Target task: its own interval is the default window
+        if task_id is not None:
+            cursor.execute("SELECT start_date, due_date FROM tasks WHERE id = %s", (int(task_id),))
+            rows = cursor.fetchall()
+            target = rows[0] if rows else None
+            if not target:
+                return json.dumps({"success": False, "error": f"❌ No task found with ID '{task_id}'"})
+            window_start = window_start or target[0]
+            window_end = window_end or target[1]
+
+        # Tasks overlapping the window, widened by the zone buffer on both sides
+        conditions = ["start_date IS NOT NULL", "due_date IS NOT NULL"]
+        params = []
+        if not include_completed:
+            conditions.append("status != 'completed'")
+        if window_end:
+            conditions.append("start_date < %s")
+            params.append(window_end + buffer)
+        if window_start:
+            conditions.append("due_date > %s")
+            params.append(window_start - buffer)
+
+        cursor.execute(
+            f"SELECT {', '.join(SCHEDULE_FIELDS)} FROM tasks WHERE {' AND '.join(conditions)}",
+            params,
+        )
+        columns = [desc[0] for desc in cursor.description]
+        tasks = [dict(zip(columns, row)) for row in iter_rows(cursor)]
+    except Exception as e:
+        return json.dumps({"success": False, "error": f"❌ Error loading tasks: {str(e)}"})
+    finally:
+        close_cursor(db, cursor)
+        release_db_connection(db)
+
+    # Conflicts are reported for the tasks of interest only
+    focus = None
+    if task_id is not None:
+        focus = {int(task_id)}
+    elif worker_id is not None:
+        focus = {task["id"] for task in tasks if int(worker_id) in worker_ids(task["assigned_workers"])}
+
+    conflicts = detect_schedule_conflicts(tasks, buffer_minutes, focus)
+    involved = {id_ for group in conflicts.values() for c in group for id_ in c["task_ids"]}
+    elapsed = time.perf_counter() - started
+    record_timing("scheduling.detect_conflicts", elapsed)
+
+    result = {
+        "success": True,
+        "message": f"✅ {sum(len(group) for group in conflicts.values())} conflict(s) found in {len(tasks)} task(s)",
+        "tasks_checked": len(tasks),
+        "conflict_count": {group: len(items) for group, items in conflicts.items()},
+        "conflicts": conflicts,
+        "tasks": {
+            str(task["id"]): {
+                "title": task["title"],
+                "status": task["status"],
+                "start_date": serialize_value(task["start_date"]),
+                "due_date": serialize_value(task["due_date"]),
+            }
+            for task in tasks
+            if task["id"] in involved
+        },
+        "query_params": {
+            "window_from": serialize_value(window_start),
+            "window_to": serialize_value(window_end),
+            "task_id": task_id,
+            "worker_id": worker_id,
+            "zone_buffer_minutes": buffer_minutes,
+            "include_completed": bool(include_completed),
+        },
+        "elapsed_ms": round(elapsed * 1000, 1),
+    }
+    return record_output(
+        "detect_conflicts", json.dumps(result, separators=COMPACT, ensure_ascii=False), "compact"
+    )
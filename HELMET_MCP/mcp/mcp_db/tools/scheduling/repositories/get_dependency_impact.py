@@ -0,0 +1,108 @@
+from mcp_init import mcp, get_db_connection, release_db_connection
+from typing import Optional
+import json
+import time
+
+from metrics import record_timing
+from result_stream import iter_rows, close_cursor, record_output, COMPACT
+from tools.scheduling.dependencies import GRAPH_FIELDS, dependency_graph_cache
+
+
+def _load_tasks():
+    db = get_db_connection()
+    if not db:
+        raise RuntimeError("Unable to connect to database")
+    cursor = None
+    try:
+        cursor = db.cursor(buffered=False)
+        cursor.execute(f"SELECT {', '.join(GRAPH_FIELDS)} FROM tasks")
+        columns = [desc[0] for desc in cursor.description]
+        return [dict(zip(columns, row)) for row in iter_rows(cursor)]
+    finally:
+        close_cursor(db, cursor)
+        release_db_connection(db)
+
+
+@mcp.tool()
+def get_dependency_impact(task_id: str, delay_hours: Optional[float] = 0) -> str:
+    """
+    🔗 DEPENDENCY IMPACT - Every task affected by a delay of one task, in ONE call
+
+    Walks the dependency graph built from the tasks' "dependencies" and "blocks_tasks"
+    instead of fetching successors one get_tasks call at a time.
+    The delayed task is shifted by delay_hours; each successor is shifted by what it
+    needs to start after all of its prerequisites are due (its slack absorbs the rest).
+
+    PARAMETERS:
+    task_id : str - Task that is delayed (REQUIRED)
+    delay_hours : float - Delay in hours (default 0: only lists successors, slack
+                  and the critical path)
+
+    EXAMPLES:
+    get_dependency_impact(task_id="12", delay_hours=4)  # Task 12 is 4h late
+    get_dependency_impact(task_id="12")  # What depends on task 12?
+
+    RETURN:
+    JSON with:
+    - "impacts": the delayed task then every transitive successor, in dependency
+      order: task_id, title, status, depends_on, shift_hours, slack_hours (hours it
+      can slip without moving the project end), start_date, due_date,
+      new_start_date, new_due_date
+    - "affected_count": successors whose dates move
+    - "project_delay_hours": how much the project end moves
+    - "on_critical_path": whether the task is on the critical path, "critical_path"
+    - "cycles": dependency cycles involving these tasks (dates are not propagated on them)
+    """
+    started = time.perf_counter()
+
+    if not task_id or not str(task_id).strip().isdigit():
+        return json.dumps({"success": False, "error": f"task_id must be numeric. Received: '{task_id}'"})
+    try:
+        delay = float(delay_hours or 0)
+    except (TypeError, ValueError):
+        return json.dumps({"success": False, "error": f"delay_hours must be a number. Received: '{delay_hours}'"})
+    target = int(task_id)
+
+    try:
+        graph = dependency_graph_cache.get(_load_tasks)
+    except Exception as e:
+        return json.dumps({"success": False, "error": f"❌ Error loading tasks: {str(e)}"})
+
+    if target not in graph.tasks:
+        return json.dumps({"success": False, "error": f"❌ No task found with ID '{task_id}'"})
+
+    impacts = graph.propagate_delay(target, delay)
+    involved = {impact["task_id"] for impact in impacts}
+    critical_path = graph.critical_path()
+
+    # The project end moves by the largest shift beyond each task's slack
+    project_delay = max(
+        (
+            impact["shift_hours"] - impact["slack_hours"]
+            for impact in impacts
+            if impact["slack_hours"] is not None
+        ),
+        default=0,
+    )
+
+    elapsed = time.perf_counter() - started
+    record_timing("scheduling.get_dependency_impact", elapsed)
+
+    affected = sum(1 for impact in impacts[1:] if impact["shift_hours"] > 0)
+    result = {
+        "success": True,
+        "message": f"✅ Delay of {delay}h on task {target} moves {affected} of {len(impacts) - 1} successor task(s)",
+        "task_id": target,
+        "delay_hours": delay,
+        "affected_count": affected,
+        "project_delay_hours": round(max(0, project_delay), 2),
+        "on_critical_path": target in critical_path,
+        "critical_path": critical_path,
+        "impacts": impacts,
+        "cycles": [cycle for cycle in graph.cycles() if involved & set(cycle)],
+        "graph": graph.stats(),
+        "elapsed_ms": round(elapsed * 1000, 1),
+    }
+    return record_output(
+        "get_dependency_impact", json.dumps(result, separators=COMPACT, ensure_ascii=False), "compact"
+    )
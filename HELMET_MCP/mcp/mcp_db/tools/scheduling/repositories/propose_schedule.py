@@ -0,0 +1,194 @@
+from mcp_init import mcp, get_db_connection, release_db_connection
+from typing import Optional, List
+from datetime import datetime
+import os
+import json
+import time
+
+from metrics import record_timing
+from result_stream import iter_rows, close_cursor, record_output, COMPACT
+from tools.scheduling.conflicts import DEFAULT_ZONE_BUFFER_MINUTES
+from tools.scheduling.solver import DEFAULT_WORKING_HOURS, ScheduleSolver, WorkingHours
+
+# Columns read by the solver
+SOLVER_TASK_FIELDS = [
+    "id",
+    "title",
+    "status",
+    "priority",
+    "start_date",
+    "due_date",
+    "max_estimated_hours",
+    "assigned_workers",
+    "required_worker_count",
+    "skill_requirements",
+    "trade_category",
+    "room",
+    "floor",
+    "building_section",
+    "required_equipment",
+    "dependencies",
+    "blocks_tasks",
+]
+SOLVER_USER_FIELDS = ["id", "role", "primary_skills", "secondary_skills", "trade_categories"]
+
+
+def _parse_ids(values: Optional[List], name: str) -> List[int]:
+    if values is None:
+        return []
+    if not isinstance(values, list):
+        raise ValueError(f"{name} must be a list of numeric IDs")
+    ids = []
+    for value in values:
+        if not str(value).strip().isdigit():
+            raise ValueError(f"{name} must contain numeric IDs. Received: '{value}'")
+        ids.append(int(value))
+    return ids
+
+
+def _parse_datetime(value: Optional[str], name: str) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(str(value).strip())
+    except ValueError:
+        raise ValueError(f"{name} must be 'YYYY-MM-DD' or 'YYYY-MM-DDTHH:MM'. Received: '{value}'")
+
+
+def _fetch(cursor, query: str) -> List[dict]:
+    cursor.execute(query)
+    columns = [desc[0] for desc in cursor.description]
+    return [dict(zip(columns, row)) for row in iter_rows(cursor)]
+
+
+@mcp.tool()
+def propose_schedule(
+    task_ids: Optional[List[str]] = None,
+    unavailable_workers: Optional[List[str]] = None,
+    blocked_zones: Optional[List[str]] = None,
+    blocked_until: Optional[str] = None,
+    not_before: Optional[str] = None,
+    working_hours: Optional[str] = None,
+    zone_buffer_minutes: Optional[int] = DEFAULT_ZONE_BUFFER_MINUTES,
+    horizon_days: Optional[int] = 14,
+    max_plans: Optional[int] = 3,
+) -> str:
+    """
+    🗓️ PROPOSE SCHEDULE - Ranked, feasible rescheduling plans as ready-to-apply update_task steps
+
+    Re-places the affected tasks (and every task depending on them) at the earliest time
+    where ALL constraints hold:
+    - working hours (default "06:30-19:30")
+    - dependencies (a task starts after all its prerequisites are due)
+    - enough free workers with the required skills (skill_requirements / trade_category)
+    - zone buffer (15 minutes between teams in the same room) and equipment availability
+
+    Affected tasks = task_ids + non-completed tasks of unavailable_workers + tasks in blocked_zones.
+    Tasks that can keep their time and team produce no step.
+
+    PARAMETERS (at least one of task_ids, unavailable_workers, blocked_zones):
+    task_ids : List[str] - Tasks to reschedule / restaff
+    unavailable_workers : List[str] - Worker IDs that cannot work (injury, absence...)
+    blocked_zones : List[str] - Rooms (e.g. "B200") or "section / floor / room" keys that are blocked
+    blocked_until : str - End of the zone blockage ("YYYY-MM-DDTHH:MM"); without it the
+                    tasks of blocked zones are reported as unscheduled
+    not_before : str - No affected task starts before this moment (e.g. now)
+    working_hours : str - "HH:MM-HH:MM" (default: WORKING_HOURS env, "06:30-19:30")
+    zone_buffer_minutes : int - Minimum gap between two teams in the same room (default 15)
+    horizon_days : int - How far a task may be pushed past its earliest start (default 14)
+    max_plans : int - Number of ranked plans returned (default 3)
+
+    EXAMPLES:
+    propose_schedule(unavailable_workers=["3"])  # Worker 3 injured: restaff/reschedule their tasks
+    propose_schedule(blocked_zones=["Entrance"], blocked_until="2025-09-08T12:00")
+    propose_schedule(task_ids=["7"], not_before="2025-09-06T16:00")  # Move task 7 after 16:00
+
+    RETURN:
+    JSON with "plans" ranked by unscheduled tasks, total delay and reassignments. Each plan:
+    {"rank", "strategy", "feasible", "total_delay_hours", "reassignments", "last_due_date",
+     "steps": [{"action": "update_task", "parameters": {"task_id", "start_date", "due_date",
+                "assigned_workers"}, "reason"}],
+     "unscheduled": [{"task_id", "reason"}]}
+    """
+    started = time.perf_counter()
+
+    try:
+        task_list = _parse_ids(task_ids, "task_ids")
+        worker_list = _parse_ids(unavailable_workers, "unavailable_workers")
+        if blocked_zones is not None and not isinstance(blocked_zones, list):
+            raise ValueError("blocked_zones must be a list of rooms")
+        if not (task_list or worker_list or blocked_zones):
+            raise ValueError("Provide at least one of task_ids, unavailable_workers or blocked_zones")
+        hours = WorkingHours(working_hours or os.getenv("WORKING_HOURS", DEFAULT_WORKING_HOURS))
+        blocked_end = _parse_datetime(blocked_until, "blocked_until")
+        start_limit = _parse_datetime(not_before, "not_before")
+        buffer_minutes = int(DEFAULT_ZONE_BUFFER_MINUTES if zone_buffer_minutes is None else zone_buffer_minutes)
+        horizon = int(horizon_days or 14)
+        plans_count = max(1, int(max_plans or 3))
+        if buffer_minutes < 0 or horizon <= 0:
+            raise ValueError("zone_buffer_minutes must be >= 0 and horizon_days > 0")
+    except (TypeError, ValueError) as e:
+        return json.dumps({"success": False, "error": "Invalid parameter", "message": str(e)})
+
+    db = get_db_connection()
+    if not db:
+        return json.dumps({"success": False, "error": "❌ Error: Unable to connect to database"})
+
+    cursor = None
+    try:
+        cursor = db.cursor(buffered=False)
+        tasks = _fetch(
+            cursor,
+            f"SELECT {', '.join(SOLVER_TASK_FIELDS)} FROM tasks WHERE status != 'completed'",
+        )
+        users = _fetch(
+            cursor,
+            f"SELECT {', '.join(SOLVER_USER_FIELDS)} FROM users WHERE is_active = 1",
+        )
+    except Exception as e:
+        return json.dumps({"success": False, "error": f"❌ Error loading schedule: {str(e)}"})
+    finally:
+        close_cursor(db, cursor)
+        release_db_connection(db)
+
+    solver = ScheduleSolver(
+        tasks,
+        {int(user["id"]): user for user in users},
+        task_list,
+        hours,
+        zone_buffer_minutes=buffer_minutes,
+        unavailable_workers=worker_list,
+        blocked_zones=blocked_zones or [],
+        blocked_until=blocked_end,
+        not_before=start_limit,
+        horizon_days=horizon,
+    )
+    if not solver.affected:
+        return json.dumps(
+            {
+                "success": True,
+                "message": "✅ No non-completed task is affected, nothing to reschedule",
+                "plans": [],
+            }
+        )
+
+    plans = solver.propose(plans_count)
+    elapsed = time.perf_counter() - started
+    record_timing("scheduling.propose_schedule", elapsed)
+
+    best = plans[0]
+    result = {
+        "success": True,
+        "message": (
+            f"✅ {len(plans)} plan(s) for {len(solver.affected)} affected task(s); best "
+            f"'{best['strategy']}': {len(best['steps'])} update(s), {best['total_delay_hours']}h delay, "
+            f"{len(best['unscheduled'])} unscheduled"
+        ),
+        "affected_task_ids": solver.affected,
+        "working_hours": hours.spec,
+        "plans": plans,
+        "elapsed_ms": round(elapsed * 1000, 1),
+    }
+    return record_output(
+        "propose_schedule", json.dumps(result, separators=COMPACT, ensure_ascii=False), "compact"
+    )
@@ -0,0 +1,466 @@
+"""
+Constraint-based rescheduling
+Places an affected set of tasks (tasks of an unavailable worker, of a blocked
+zone, explicit ids, plus their transitive successors) back into the schedule:
+- inside working hours ("06:30-19:30", same value as the backend specifications)
+- after every prerequisite is due (dependency graph)
+- with enough free workers having the required skills
+- without overlapping another task of the same zone (15-minute buffer) or
+  using the same equipment at the same time
+
+Tasks are placed one by one, the highest priority first among those whose
+prerequisites are already placed, each at the earliest start where every constraint holds: when a constraint fails, the
+search jumps straight to the end of the blocking interval instead of trying
+every time step. Several worker-selection strategies give alternative plans,
+ranked by unscheduled tasks, total delay and number of reassignments.
+"""
+
+import heapq
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, time, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from tools.scheduling.conflicts import DEFAULT_ZONE_BUFFER_MINUTES, json_list, worker_ids, zone_key
+from tools.scheduling.dependencies import DependencyGraph
+
+DEFAULT_WORKING_HOURS = "06:30-19:30"
+
+# Worker selection strategies, in the order plans are built
+STRATEGIES = {
+    "keep_team": "Keep the available assigned workers (wait for them), replace only unavailable ones",
+    "earliest_start": "Start each task as early as possible with any qualified free worker",
+    "best_skill": "Staff each task with the best skill match, then start as early as possible",
+}
+
+# Roles that can be staffed on a task
+STAFF_ROLES = ("worker", "team_leader")
+
+# Candidate start times tried per task before giving up
+MAX_ATTEMPTS = 500
+
+
+class WorkingHours:
+    """Daily working window ("HH:MM-HH:MM"); task durations are counted in working time"""
+
+    def __init__(self, spec: str = DEFAULT_WORKING_HOURS):
+        try:
+            start, end = (part.strip() for part in spec.split("-"))
+            self.start, self.end = time.fromisoformat(start), time.fromisoformat(end)
+        except ValueError:
+            raise ValueError(f"working_hours must be 'HH:MM-HH:MM'. Received: '{spec}'")
+        if self.end <= self.start:
+            raise ValueError("working_hours end must be after its start")
+        self.spec = spec
+
+    def _window(self, day) -> Tuple[datetime, datetime]:
+        return datetime.combine(day, self.start), datetime.combine(day, self.end)
+
+    def snap(self, moment: datetime) -> datetime:
+        """Earliest working moment at or after `moment`"""
+        day_start, day_end = self._window(moment.date())
+        if moment < day_start:
+            return day_start
+        if moment >= day_end:
+            return day_start + timedelta(days=1)
+        return moment
+
+    def add(self, start: datetime, hours: float) -> datetime:
+        """End of `hours` of work starting at `start` (spread over several days if needed)"""
+        remaining = timedelta(hours=hours)
+        current = self.snap(start)
+        while True:
+            day_end = self._window(current.date())[1]
+            if remaining <= day_end - current:
+                return current + remaining
+            remaining -= day_end - current
+            current = self._window(current.date() + timedelta(days=1))[0]
+
+    def hours_between(self, start: datetime, end: datetime) -> float:
+        """Working hours contained in [start, end)"""
+        total = timedelta(0)
+        day = start.date()
+        while day <= end.date():
+            day_start, day_end = self._window(day)
+            overlap = min(end, day_end) - max(start, day_start)
+            if overlap > timedelta(0):
+                total += overlap
+            day += timedelta(days=1)
+        return total.total_seconds() / 3600
+
+
+class ResourceCalendar:
+    """Busy intervals per resource key (worker id, zone, equipment)"""
+
+    def __init__(self):
+        self._intervals: Dict[Any, List[Tuple[datetime, datetime]]] = defaultdict(list)
+
+    def add(self, key: Any, start: datetime, end: datetime) -> None:
+        self._intervals[key].append((start, end))
+
+    def blocked_until(
+        self, key: Any, start: datetime, end: datetime, buffer: timedelta = timedelta(0)
+    ) -> Optional[datetime]:
+        """None when [start, end) is free for `key`, else the end of the latest blocking interval"""
+        latest = None
+        for busy_start, busy_end in self._intervals.get(key, ()):
+            if busy_start < end + buffer and start < busy_end + buffer:
+                if latest is None or busy_end + buffer > latest:
+                    latest = busy_end + buffer
+        return latest
+
+    def hours(self, key: Any) -> float:
+        return sum((end - start).total_seconds() for start, end in self._intervals.get(key, ())) / 3600
+
+
+def _lower_set(value: Any) -> Set[str]:
+    return {str(item).strip().lower() for item in json_list(value) if str(item).strip()}
+
+
+def skill_score(worker: Dict[str, Any], task: Dict[str, Any]) -> int:
+    """How well a worker covers a task (0 = not qualified)"""
+    requirements = _lower_set(task.get("skill_requirements"))
+    trade = (task.get("trade_category") or "").strip().lower()
+    if not requirements and not trade:
+        return 1
+    score = 2 * len(requirements & _lower_set(worker.get("primary_skills")))
+    score += len(requirements & _lower_set(worker.get("secondary_skills")))
+    if trade and trade in _lower_set(worker.get("trade_categories")):
+        score += 1
+    return score
+
+
+@dataclass
+class Placement:
+    task_id: int
+    start: datetime
+    due: datetime
+    workers: List[int]
+
+
+@dataclass
+class Plan:
+    strategy: str
+    placements: Dict[int, Placement] = field(default_factory=dict)
+    unscheduled: List[Dict[str, Any]] = field(default_factory=list)
+
+
+class ScheduleSolver:
+    """
+    Args:
+        tasks: Non-completed tasks (all of them: the unaffected ones are fixed obstacles)
+        workers: Active users by id (skills, trade_categories, role)
+        affected: Task ids to (re)place; their transitive successors are added
+        unavailable_workers: Workers that cannot be assigned at all
+        blocked_zones: Rooms or zone keys ("section / floor / room") that cannot be used
+        blocked_until: End of the zone blockage (None: blocked over the whole horizon)
+        not_before: No affected task starts before this moment
+        horizon_days: How far past its earliest possible start a task may be pushed
+    """
+
+    def __init__(
+        self,
+        tasks: Iterable[Dict[str, Any]],
+        workers: Dict[int, Dict[str, Any]],
+        affected: Iterable[int],
+        working_hours: WorkingHours,
+        zone_buffer_minutes: int = DEFAULT_ZONE_BUFFER_MINUTES,
+        unavailable_workers: Iterable[int] = (),
+        blocked_zones: Iterable[str] = (),
+        blocked_until: Optional[datetime] = None,
+        not_before: Optional[datetime] = None,
+        horizon_days: int = 14,
+    ):
+        self.tasks = {
+            int(task["id"]): task
+            for task in tasks
+            if isinstance(task.get("start_date"), datetime) and isinstance(task.get("due_date"), datetime)
+        }
+        self.workers = workers
+        self.hours = working_hours
+        self.buffer = timedelta(minutes=zone_buffer_minutes)
+        self.unavailable = set(unavailable_workers)
+        self.blocked_zones = {zone.strip().lower() for zone in blocked_zones if zone and zone.strip()}
+        self.blocked_until = blocked_until
+        self.not_before = not_before
+        self.graph = DependencyGraph(self.tasks.values())
+
+        # Affected tasks: requested ones, those of unavailable workers or blocked
+        # zones, and everything that depends on them
+        affected = {task_id for task_id in affected if task_id in self.tasks}
+        for task_id, task in self.tasks.items():
+            if self.unavailable & set(worker_ids(task.get("assigned_workers"))):
+                affected.add(task_id)
+            elif self._zone_blocked(task) and (blocked_until is None or task["start_date"] < blocked_until):
+                affected.add(task_id)
+        for task_id in list(affected):
+            affected.update(self.graph.transitive_successors(task_id))
+        self.affected = self._placement_order(affected)
+        self.horizon = timedelta(days=horizon_days)
+
+    def _placement_order(self, affected: Set[int]) -> List[int]:
+        """
+        Kahn's algorithm over the affected tasks with a heap keyed on (-priority, id):
+        among the tasks whose prerequisites are all placed, the highest priority goes first
+        """
+        def key(task_id: int) -> Tuple[int, int]:
+            return (-int(self.tasks[task_id].get("priority") or 0), task_id)
+
+        waiting = {
+            task_id: len(self.graph.predecessors[task_id] & affected) for task_id in affected
+        }
+        ready = [key(task_id) for task_id, count in waiting.items() if count == 0]
+        heapq.heapify(ready)
+        order = []
+        while ready:
+            task_id = heapq.heappop(ready)[1]
+            order.append(task_id)
+            for successor in self.graph.successors[task_id]:
+                if successor in waiting:
+                    waiting[successor] -= 1
+                    if waiting[successor] == 0:
+                        heapq.heappush(ready, key(successor))
+        # Tasks on a dependency cycle last (reported unscheduled by solve)
+        placed = set(order)
+        return order + sorted((t for t in affected if t not in placed), key=key)
+
+    # ------------------------------------------------------------------
+    # Constraints
+    # ------------------------------------------------------------------
+
+    def _base_calendars(self) -> Tuple[ResourceCalendar, ResourceCalendar, ResourceCalendar]:
+        """Worker, zone and equipment calendars of the tasks that are not moved"""
+        workers, zones, equipment = ResourceCalendar(), ResourceCalendar(), ResourceCalendar()
+        moved = set(self.affected)
+        for task_id, task in self.tasks.items():
+            if task_id not in moved:
+                self._occupy(task, task["start_date"], task["due_date"], worker_ids(task.get("assigned_workers")), workers, zones, equipment)
+        return workers, zones, equipment
+
+    @staticmethod
+    def _occupy(task, start, due, assigned, workers, zones, equipment) -> None:
+        for worker in assigned:
+            workers.add(worker, start, due)
+        zone = zone_key(task)
+        if zone:
+            zones.add(zone, start, due)
+        for item in _lower_set(task.get("required_equipment")):
+            equipment.add(item, start, due)
+
+    def _zone_blocked(self, task: Dict[str, Any]) -> bool:
+        zone = zone_key(task)
+        return bool(zone) and (
+            zone.lower() in self.blocked_zones
+            or (task.get("room") or "").strip().lower() in self.blocked_zones
+        )
+
+    def _work_hours(self, task: Dict[str, Any]) -> float:
+        """Working time of a task: its scheduled span, else its max estimate, else 1h"""
+        hours = self.hours.hours_between(task["start_date"], task["due_date"])
+        return hours or float(task.get("max_estimated_hours") or 0) or 1.0
+
+    def _required_count(self, task: Dict[str, Any], assigned: List[int]) -> int:
+        return max(int(task.get("required_worker_count") or 0), len(assigned), 1)
+
+    def _candidates(self, task: Dict[str, Any], strategy: str, assigned: List[int], load) -> List[Tuple[int, bool]]:
+        """(worker id, mandatory) in preference order for this strategy"""
+        kept = [w for w in assigned if w not in self.unavailable]
+        others = []
+        for worker_id, worker in self.workers.items():
+            if worker_id in self.unavailable or worker_id in kept:
+                continue
+            if (worker.get("role") or "worker") not in STAFF_ROLES:
+                continue
+            score = skill_score(worker, task)
+            if score > 0:
+                others.append((worker_id, score))
+
+        if strategy == "best_skill":
+            scores = {w: skill_score(self.workers.get(w, {}), task) for w in kept}
+            ranked = sorted(
+                [(w, scores[w], 0) for w in kept] + [(w, s, 1) for w, s in others],
+                key=lambda c: (-c[1], c[2], load(c[0]), c[0]),
+            )
+            return [(w, False) for w, _, _ in ranked]
+
+        others.sort(key=lambda c: (-c[1], load(c[0]), c[0]))
+        mandatory = strategy == "keep_team"
+        return [(w, mandatory) for w in kept] + [(w, False) for w, _ in others]
+
+    # ------------------------------------------------------------------
+    # Search
+    # ------------------------------------------------------------------
+
+    def solve(self, strategy: str) -> Plan:
+        plan = Plan(strategy)
+        workers_cal, zones_cal, equipment_cal = self._base_calendars()
+        plan_hours: Dict[int, float] = defaultdict(float)
+
+        def load(worker_id: int) -> float:
+            return workers_cal.hours(worker_id) + plan_hours[worker_id]
+
+        for task_id in self.affected:
+            task = self.tasks[task_id]
+            assigned = worker_ids(task.get("assigned_workers"))
+            needed = self._required_count(task, assigned)
+            work_hours = self._work_hours(task)
+            zone = zone_key(task)
+            equipment = _lower_set(task.get("required_equipment"))
+
+            # Earliest start: original start, not_before, prerequisites, zone blockage
+            earliest = task["start_date"]
+            if self.not_before and self.not_before > earliest:
+                earliest = self.not_before
+            for prerequisite in self.graph.predecessors[task_id]:
+                placed = plan.placements.get(prerequisite)
+                if placed:
+                    earliest = max(earliest, placed.due)
+                elif prerequisite not in self.affected:
+                    earliest = max(earliest, self.tasks[prerequisite]["due_date"])
+                else:
+                    earliest = None  # prerequisite could not be placed
+                    break
+            if earliest is None:
+                plan.unscheduled.append({"task_id": task_id, "reason": "A prerequisite task could not be scheduled"})
+                continue
+            if self._zone_blocked(task):
+                if self.blocked_until is None:
+                    plan.unscheduled.append({"task_id": task_id, "reason": f"Zone '{zone}' is blocked"})
+                    continue
+                earliest = max(earliest, self.blocked_until)
+
+            # In-progress tasks cannot move: only their staffing changes
+            fixed = task.get("status") == "in_progress"
+            keeps_time = earliest == task["start_date"]
+            start = earliest if keeps_time else self.hours.snap(earliest)
+            candidates = self._candidates(task, strategy, assigned, load)
+            if len(candidates) < needed:
+                plan.unscheduled.append(
+                    {"task_id": task_id, "reason": f"Only {len(candidates)} qualified worker(s) for {needed} needed"}
+                )
+                continue
+
+            placement, reason = None, "No slot within the horizon"
+            latest_start = earliest + self.horizon
+            for _ in range(MAX_ATTEMPTS):
+                if fixed and start != task["start_date"]:
+                    reason = "In-progress task cannot be moved and no replacement is free"
+                    break
+                if start > latest_start:
+                    break
+                due = task["due_date"] if start == task["start_date"] else self.hours.add(start, work_hours)
+
+                # Zone and equipment: jump after the blocking interval
+                retry = zones_cal.blocked_until(zone, start, due, self.buffer) if zone else None
+                for item in equipment:
+                    blocked = equipment_cal.blocked_until(item, start, due)
+                    if blocked and (retry is None or blocked > retry):
+                        retry = blocked
+                if retry:
+                    reason = "Zone or equipment busy within the horizon"
+                    start = self.hours.snap(retry)
+                    continue
+
+                # Workers: mandatory ones must be free, the rest filled in preference order
+                chosen, waits, mandatory_wait, mandatory_busy = [], [], None, 0
+                for worker_id, mandatory in candidates:
+                    blocked = workers_cal.blocked_until(worker_id, start, due)
+                    if blocked is None:
+                        if len(chosen) < needed:
+                            chosen.append(worker_id)
+                    elif mandatory:
+                        # Kept worker: wait for them
+                        mandatory_wait = max(mandatory_wait or blocked, blocked)
+                        mandatory_busy += 1
+                    else:
+                        waits.append(blocked)
+                if mandatory_wait is None and len(chosen) >= needed:
+                    placement = Placement(task_id, start, due, chosen)
+                    break
+                reason = "Not enough qualified workers free within the horizon"
+                # Next moment enough blocking workers are released; busy kept workers
+                # fill their own seats once free
+                missing = max(0, needed - len(chosen) - mandatory_busy)
+                if missing > len(waits):
+                    break
+                waits.sort()
+                retry = max(filter(None, [mandatory_wait, waits[missing - 1] if missing > 0 else None]))
+                start = self.hours.snap(max(retry, start + timedelta(minutes=1)))
+
+            if placement is None:
+                plan.unscheduled.append({"task_id": task_id, "reason": reason})
+                continue
+            plan.placements[task_id] = placement
+            self._occupy(task, placement.start, placement.due, placement.workers, workers_cal, zones_cal, equipment_cal)
+            for worker_id in placement.workers:
+                plan_hours[worker_id] += work_hours
+        return plan
+
+    # ------------------------------------------------------------------
+    # Output
+    # ------------------------------------------------------------------
+
+    def describe(self, plan: Plan) -> Dict[str, Any]:
+        """Plan summary with the update_task steps of the tasks that change"""
+        steps, delay, reassignments = [], timedelta(0), 0
+        for task_id in self.affected:
+            placement = plan.placements.get(task_id)
+            if not placement:
+                continue
+            task = self.tasks[task_id]
+            original = worker_ids(task.get("assigned_workers"))
+            parameters, reasons = {"task_id": task_id}, []
+            if placement.start != task["start_date"] or placement.due != task["due_date"]:
+                parameters["start_date"] = placement.start.strftime("%Y-%m-%d %H:%M:%S")
+                parameters["due_date"] = placement.due.strftime("%Y-%m-%d %H:%M:%S")
+                shift = placement.start - task["start_date"]
+                delay += max(shift, timedelta(0))
+                reasons.append(f"moved by {round(shift.total_seconds() / 3600, 2)}h")
+            if sorted(placement.workers) != sorted(original):
+                parameters["assigned_workers"] = placement.workers
+                reassignments += len(set(placement.workers) - set(original))
+                reasons.append(f"workers {original} -> {placement.workers}")
+            if len(parameters) > 1:
+                steps.append(
+                    {
+                        "action": "update_task",
+                        "parameters": parameters,
+                        "reason": f"Task {task_id} '{task.get('title')}': " + ", ".join(reasons),
+                    }
+                )
+
+        makespan = max((p.due for p in plan.placements.values()), default=None)
+        return {
+            "strategy": plan.strategy,
+            "description": STRATEGIES[plan.strategy],
+            "feasible": not plan.unscheduled,
+            "total_delay_hours": round(delay.total_seconds() / 3600, 2),
+            "reassignments": reassignments,
+            "last_due_date": makespan.isoformat() if makespan else None,
+            "steps": steps,
+            "unscheduled": plan.unscheduled,
+        }
+
+    def propose(self, max_plans: int = 3) -> List[Dict[str, Any]]:
+        """Plans of every strategy, ranked; identical plans are kept once"""
+        plans, seen = [], set()
+        for strategy in STRATEGIES:
+            plan = self.describe(self.solve(strategy))
+            signature = repr((plan["steps"], plan["unscheduled"]))
+            if signature not in seen:
+                seen.add(signature)
+                plans.append(plan)
+        plans.sort(key=lambda p: (len(p["unscheduled"]), p["total_delay_hours"], p["reassignments"]))
+        for rank, plan in enumerate(plans[:max_plans], start=1):
+            plan["rank"] = rank
+        return plans[:max_plans]
+
+
+__all__ = [
+    "DEFAULT_WORKING_HOURS",
+    "STRATEGIES",
+    "WorkingHours",
+    "ResourceCalendar",
+    "skill_score",
+    "ScheduleSolver",
+]
@@ -1,7 +1,7 @@
 """
 Get table schemas for all tables
 """
-from mcp_init import mcp, get_db_connection
+from mcp_init import mcp, get_db_connection, release_db_connection
 import json
 
 
@@ -43,9 +43,10 @@ def get_table_schemas() -> str:
             "message": "Unable to establish database connection"
         }, indent=2)
     
-    cursor = db.cursor(buffered=True)
+    cursor = None
     
     try:
+        cursor = db.cursor(buffered=True)
         # Get table schemas from INFORMATION_SCHEMA
         query = """
         SELECT 
@@ -107,4 +108,6 @@ def get_table_schemas() -> str:
         }, indent=2)
         
     finally:
-        cursor.close()
\ No newline at end of file
+        if cursor is not None:
+            cursor.close()
+        release_db_connection(db)
@@ -1,4 +1,4 @@
-from mcp_init import mcp, get_db_connection
+from mcp_init import mcp, get_db_connection, release_db_connection
 from typing import List, Optional, Union
 import json
 from datetime import datetime
@@ -14,7 +14,7 @@ logger = logging.getLogger(__name__)
 
 # Add the mcp_db directory to the path
 sys.path.append(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
-from backend_notifier import notify_db_update
+from backend_notifier import publish_change, serialize_change_row
 
 
 @mcp.tool()
@@ -196,6 +196,11 @@ def create_task(
         if not isinstance(assigned_workers, list):
             logger.error(f"❌ Validation failed: Assigned workers not list: {type(assigned_workers)}")
             return "❌ Error: Assigned workers must be a list (can be empty for unassigned tasks)."
+        # Stored as integers: indexed by the multi-valued index idx_assigned_workers
+        try:
+            assigned_workers = [int(worker_id) for worker_id in assigned_workers]
+        except (TypeError, ValueError):
+            return "❌ Error: Assigned workers must be a list of user IDs."
         if not isinstance(skill_requirements, list):
             logger.error(f"❌ Validation failed: Skill requirements not list: {type(skill_requirements)}")
             return "❌ Error: Skill requirements must be a list."
@@ -301,10 +306,12 @@ def create_task(
             return "❌ Database connection failed"
         logger.debug("✅ Database connection established")
 
-        cursor = db.cursor(buffered=True)
-        logger.debug("✅ Database cursor created")
+        cursor = None
 
         try:
+            cursor = db.cursor(buffered=True)
+            logger.debug("✅ Database cursor created")
+
             # Database operations with detailed logging
             current_time = datetime.now()
             logger.debug(f"⏰ Current time set: {current_time}")
@@ -365,6 +372,11 @@ def create_task(
             db.commit()
             logger.debug("✅ Database transaction committed")
 
+            # Graphe de dépendances : reconstruit à la prochaine lecture
+            from ...scheduling.dependencies import invalidate_dependency_graph
+
+            invalidate_dependency_graph()
+
             # 🔄 Synchronisation automatique des vecteurs
             logger.debug("🔄 Starting vector synchronization")
             try:
@@ -379,7 +391,7 @@ def create_task(
                     new_task_data = dict(zip(columns, new_task_row))
                     logger.debug(f"📋 Task data retrieved for vector sync: {list(new_task_data.keys())}")
                     auto_sync_task_vector(task_id, new_task_data, "create")
-                    logger.debug("✅ Vector synchronization completed")
+                    logger.debug("✅ Vector synchronization queued")
                 else:
                     logger.warning("⚠️  No task data found for vector sync")
             except Exception as sync_error:
@@ -435,8 +447,10 @@ def create_task(
                 # Notify backend about task creation
                 logger.debug("📢 Notifying backend about task creation")
                 try:
-                    notify_db_update("task")
-                    logger.debug("✅ Backend notification sent")
+                    publish_change(
+                        "task", task_id, "create", columns, serialize_change_row(columns, result)
+                    )
+                    logger.debug("✅ Backend notification queued")
                 except Exception as notify_error:
                     logger.error(f"❌ Backend notification failed: {notify_error}")
                     print(f"Warning: Backend notification failed: {notify_error}")
@@ -460,7 +474,9 @@ def create_task(
             logger.debug("🔄 Database transaction rolled back")
             return f"❌ Database error: {str(e)}"
         finally:
-            cursor.close()
+            if cursor is not None:
+                cursor.close()
+            release_db_connection(db)
             logger.debug("🔒 Database cursor closed")
 
     except Exception as e:
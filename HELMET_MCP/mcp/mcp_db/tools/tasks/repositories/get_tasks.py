@@ -9,11 +9,95 @@ Author: Assistant
 Date: 2025-09-06
 """
 
-from mcp_init import mcp, get_db_connection
-from typing import Optional
+from mcp_init import mcp, get_db_connection, release_db_connection
+from typing import Optional, List, Dict, Any, Tuple
 import json
-from datetime import datetime
-from decimal import Decimal
+from datetime import datetime, timedelta
+
+from result_stream import (
+    OUTPUT_FORMATS,
+    serialize_row,
+    json_columns,
+    iter_rows,
+    close_cursor,
+    validate_fields,
+    encode_result,
+)
+
+# Columns returned for each task (allowed values of `fields`)
+TASK_FIELDS = [
+    "id",
+    "title",
+    "description",
+    "assigned_workers",
+    "created_by",
+    "priority",
+    "status",
+    "start_date",
+    "due_date",
+    "min_estimated_hours",
+    "max_estimated_hours",
+    "completion_percentage",
+    "created_at",
+    "updated_at",
+]
+
+# Fields kept by format="ids"
+ID_FIELDS = ["id", "title", "status"]
+
+
+def _parse_datetime(value: str, name: str) -> datetime:
+    """Parse "YYYY-MM-DD" or an ISO datetime ("YYYY-MM-DDTHH:MM[:SS]")"""
+    try:
+        return datetime.fromisoformat(str(value).strip())
+    except ValueError:
+        raise ValueError(
+            f"{name} must be 'YYYY-MM-DD' or 'YYYY-MM-DDTHH:MM'. Received: '{value}'"
+        )
+
+
+def _parse_window(value: str) -> Tuple[datetime, datetime]:
+    """Parse an "<from>/<to>" ISO interval"""
+    parts = str(value).split("/")
+    if len(parts) != 2:
+        raise ValueError(
+            f"overlaps_window must be '<from>/<to>' (e.g. '2025-09-06T10:00/2025-09-06T18:00'). Received: '{value}'"
+        )
+    window_start = _parse_datetime(parts[0], "overlaps_window start")
+    window_end = _parse_datetime(parts[1], "overlaps_window end")
+    if window_end <= window_start:
+        raise ValueError("overlaps_window end must be after its start")
+    return window_start, window_end
+
+
+class _TaskSummary:
+    """Summary statistics accumulated in a single pass over the tasks"""
+
+    def __init__(self):
+        self.count = 0
+        self.estimated_hours = 0.0
+        self.completion = 0.0
+        self.status_breakdown: Dict[str, int] = {}
+
+    def add(self, task: Dict[str, Any]) -> None:
+        self.count += 1
+        self.estimated_hours += (
+            (task.get("min_estimated_hours", 0) or 0)
+            + (task.get("max_estimated_hours", 0) or 0)
+        ) / 2
+        self.completion += task.get("completion_percentage", 0) or 0
+        status = task.get("status", "unknown")
+        self.status_breakdown[status] = self.status_breakdown.get(status, 0) + 1
+
+    def result(self) -> Dict[str, Any]:
+        return {
+            "total_found": self.count,
+            "total_estimated_hours": round(self.estimated_hours, 2) if self.count else 0,
+            "average_completion": round(self.completion / self.count, 1)
+            if self.count
+            else 0,
+            "status_breakdown": self.status_breakdown,
+        }
 
 
 @mcp.tool()
@@ -25,8 +109,15 @@ def get_tasks(
     status: Optional[str] = None,
     start_date: Optional[str] = None,
     due_date: Optional[str] = None,
+    start_from: Optional[str] = None,
+    start_to: Optional[str] = None,
+    due_from: Optional[str] = None,
+    due_to: Optional[str] = None,
+    overlaps_window: Optional[str] = None,
     limit: Optional[int] = 50,
     offset: Optional[int] = 0,
+    format: Optional[str] = "full",
+    fields: Optional[List[str]] = None,
 ) -> str:
     """
     🔍 UNIVERSAL TASK TOOL - Get, List, Search & Filter Tasks
@@ -56,6 +147,14 @@ def get_tasks(
     📅 DATES & DEADLINES:
     start_date : str - Start date (format: "YYYY-MM-DD", e.g., "2025-09-06")
     due_date : str - Due date (format: "YYYY-MM-DD")
+
+    ⏰ TIME RANGES (dates "YYYY-MM-DD" or datetimes "YYYY-MM-DDTHH:MM"; "from" is
+    inclusive, "to" is exclusive):
+    start_from / start_to : str - Tasks starting in [start_from, start_to)
+    due_from / due_to : str - Tasks due in [due_from, due_to)
+    overlaps_window : str - "<from>/<to>" - tasks whose [start_date, due_date]
+                      overlaps the window (e.g. everything running ±4h around 14:00:
+                      "2025-09-06T10:00/2025-09-06T18:00")
     overdue_only : bool - Only overdue tasks (true/false)
 
 
@@ -63,6 +162,14 @@ def get_tasks(
     limit : int - Max results (1-1000, default: 50)
     offset : int - Skip records for pagination (default: 0)
 
+    📦 OUTPUT:
+    format : str - "full" (default, pretty-printed), "stream" (same content,
+                   compact JSON written row by row - use for large limits),
+                   "ids" (only id, title and status per task, compact JSON) or
+                   "compact" (columnar: {"columns": [...], "rows": [[...]]},
+                   null columns dropped, no message/query_params - cheapest)
+    fields : list - Only return these task fields (e.g. ["id", "title", "due_date"])
+
     💡 USAGE EXAMPLES (Copy & Use!):
     ===============================
 
@@ -91,6 +198,9 @@ def get_tasks(
     get_tasks(due_date="2025-09-06")  # Tasks due on specific date
     get_tasks(overdue_only=True)  # Only overdue tasks
     get_tasks(start_date="2025-09-01")  # Tasks starting on date
+    get_tasks(start_from="2025-09-01", start_to="2025-09-08")  # Starting this week
+    get_tasks(due_from="2025-09-06T12:00", due_to="2025-09-06T18:00")  # Due this afternoon
+    get_tasks(overlaps_window="2025-09-06T10:00/2025-09-06T18:00")  # Running ±4h around 14:00
 
     # ⏱️ PROGRESS & ESTIMATION:
     get_tasks(min_completion=80)  # Nearly finished tasks (80%+)
@@ -102,6 +212,11 @@ def get_tasks(
     get_tasks(limit=20, offset=0)   # Page 1 (first 20)
     get_tasks(limit=20, offset=20)  # Page 2 (next 20)
 
+    # 📦 LARGE LISTINGS:
+    get_tasks(limit=1000, format="stream")  # Everything, compact
+    get_tasks(status="pending", limit=1000, format="ids")  # Just ids and titles
+    get_tasks(format="compact", fields=["id", "title", "status", "due_date"])  # Token-efficient
+
     # 🔥 COMPLEX COMBINATIONS:
     get_tasks(assigned_to="2", status="in_progress", priority="3")
     get_tasks(overdue_only=True, assigned_to="2", limit=10)
@@ -198,6 +313,58 @@ def get_tasks(
             indent=2,
         )
 
+    if format not in OUTPUT_FORMATS:
+        return json.dumps(
+            {
+                "success": False,
+                "error": "Invalid format",
+                "message": f"Format must be one of {OUTPUT_FORMATS}. Received: '{format}'",
+            },
+            indent=2,
+        )
+
+    fields_error = validate_fields(fields, TASK_FIELDS)
+    if fields_error:
+        return json.dumps(
+            {
+                "success": False,
+                "error": "Invalid fields",
+                "message": fields_error,
+            },
+            indent=2,
+        )
+
+    if assigned_to and not str(assigned_to).strip().isdigit():
+        return json.dumps(
+            {
+                "success": False,
+                "error": "Invalid assigned_to",
+                "message": f"assigned_to must be a user ID. Received: '{assigned_to}'",
+            },
+            indent=2,
+        )
+
+    # Date validation (parsed once, bound as half-open ranges below)
+    try:
+        date_ranges = {
+            "start_date": _parse_datetime(start_date, "start_date") if start_date else None,
+            "due_date": _parse_datetime(due_date, "due_date") if due_date else None,
+            "start_from": _parse_datetime(start_from, "start_from") if start_from else None,
+            "start_to": _parse_datetime(start_to, "start_to") if start_to else None,
+            "due_from": _parse_datetime(due_from, "due_from") if due_from else None,
+            "due_to": _parse_datetime(due_to, "due_to") if due_to else None,
+        }
+        window = _parse_window(overlaps_window) if overlaps_window else None
+    except ValueError as e:
+        return json.dumps(
+            {
+                "success": False,
+                "error": "Invalid date",
+                "message": str(e),
+            },
+            indent=2,
+        )
+
     # Priority validation
     if priority and priority not in ["1", "2", "3"]:
         return json.dumps(
@@ -220,8 +387,9 @@ def get_tasks(
 
     # Assignment filters
     if assigned_to:
-        conditions.append("JSON_CONTAINS(t.assigned_workers, %s)")
-        params.append(f'"{assigned_to}"')  # Convert to JSON string format
+        # Uses the multi-valued index idx_assigned_workers (worker IDs stored as integers)
+        conditions.append("%s MEMBER OF (t.assigned_workers)")
+        params.append(int(assigned_to))
 
     if created_by:
         conditions.append("t.created_by = %s")
@@ -236,14 +404,30 @@ def get_tasks(
         conditions.append("t.status = %s")
         params.append(status)
 
-    # Date filters
-    if start_date:
-        conditions.append("DATE(t.start_date) = %s")
-        params.append(start_date)
-
-    if due_date:
-        conditions.append("DATE(t.due_date) = %s")
-        params.append(due_date)
+    # Date filters: half-open ranges on the bare columns so that
+    # idx_start_date / idx_due_date are used (no DATE() around the column)
+    for column in ("start_date", "due_date"):
+        day = date_ranges[column]
+        if day:
+            day = day.replace(hour=0, minute=0, second=0, microsecond=0)
+            conditions.append(f"t.{column} >= %s AND t.{column} < %s")
+            params.extend([day, day + timedelta(days=1)])
+
+    for column, lower, upper in (
+        ("start_date", "start_from", "start_to"),
+        ("due_date", "due_from", "due_to"),
+    ):
+        if date_ranges[lower]:
+            conditions.append(f"t.{column} >= %s")
+            params.append(date_ranges[lower])
+        if date_ranges[upper]:
+            conditions.append(f"t.{column} < %s")
+            params.append(date_ranges[upper])
+
+    if window:
+        # Task interval [start_date, due_date] intersects [window_start, window_end)
+        conditions.append("t.start_date < %s AND t.due_date > %s")
+        params.extend([window[1], window[0]])
 
     # Build WHERE clause
     where_clause = " AND ".join(conditions) if conditions else "1=1"
@@ -311,31 +495,89 @@ def get_tasks(
             indent=2,
         )
 
-    cursor = db.cursor(buffered=True)
+    # Build response with used parameters
+    used_params = {
+        k: v
+        for k, v in {
+            "task_id": task_id,
+            "title": None,
+            "description": None,
+            "assigned_to": assigned_to,
+            "created_by": created_by,
+            "priority": priority,
+            "status": status,
+            "start_date": start_date,
+            "due_date": due_date,
+            "start_from": start_from,
+            "start_to": start_to,
+            "due_from": due_from,
+            "due_to": due_to,
+            "overlaps_window": overlaps_window,
+            "min_estimated_hours": None,
+            "max_estimated_hours": None,
+            "min_completion": None,
+            "max_completion": None,
+            "overdue_only": None,
+            "limit": limit or 50,
+            "offset": offset or 0,
+        }.items()
+        if v is not None
+    }
+
+    # Generate smart message
+    def build_message(count: int) -> str:
+        if task_id:
+            if count:
+                return f"✅ Task with ID '{task_id}' found successfully"
+            return f"❌ No task found with ID '{task_id}'"
+        if any(
+            p is not None
+            for p in [
+                assigned_to,
+                created_by,
+                priority,
+                status,
+                start_date,
+                due_date,
+                start_from,
+                start_to,
+                due_from,
+                due_to,
+                overlaps_window,
+            ]
+        ):
+            return f"✅ Found {count} task(s) matching search criteria"
+        return f"✅ Retrieved {count} task(s) (simple listing)"
+
+    cursor = None
+    summary = _TaskSummary()
 
     try:
+        # Unbuffered cursor: rows are fetched in batches while they are serialised
+        cursor = db.cursor(buffered=False)
         cursor.execute(query, params)
         columns = [desc[0] for desc in cursor.description]
-        results = cursor.fetchall()
-
-        # Process results
-        tasks_list = []
-        for row in results:
-            task_dict = {}
-            for i, value in enumerate(row):
-                column_name = columns[i]
 
-                # Handle datetime and Decimal serialization
-                if isinstance(value, datetime):
-                    task_dict[column_name] = value.isoformat()
-                elif isinstance(value, Decimal):
-                    task_dict[column_name] = float(value)
-                else:
-                    task_dict[column_name] = value
-
-            # No JSON field parsing needed for simplified task structure
-
-            tasks_list.append(task_dict)
+        def tasks():
+            for row in iter_rows(cursor):
+                task = serialize_row(columns, row)
+                summary.add(task)
+                yield task
+
+        # Summary and message are built once the rows have been consumed
+        return encode_result(
+            "get_tasks",
+            format,
+            "tasks",
+            tasks(),
+            lambda: {
+                "message": build_message(summary.count),
+                "summary": summary.result(),
+                "query_params": used_params,
+            },
+            fields=ID_FIELDS if format == "ids" else fields,
+            json_fields=json_columns(cursor),
+        )
 
     except Exception as e:
         return json.dumps(
@@ -367,99 +609,5 @@ def get_tasks(
         )
 
     finally:
-        cursor.close()
-
-    # Build response with used parameters
-    used_params = {
-        k: v
-        for k, v in {
-            "task_id": task_id,
-            "title": None,
-            "description": None,
-            "assigned_to": assigned_to,
-            "created_by": created_by,
-            "priority": priority,
-            "status": status,
-            "start_date": start_date,
-            "due_date": due_date,
-            "min_estimated_hours": None,
-            "max_estimated_hours": None,
-            "min_completion": None,
-            "max_completion": None,
-            "overdue_only": None,
-            "limit": limit or 50,
-            "offset": offset or 0,
-        }.items()
-        if v is not None
-    }
-
-    # Calculate statistics
-    summary_stats = {}
-    if tasks_list:
-        total_estimated_hours = (
-            sum(
-                (task.get("min_estimated_hours", 0) or 0)
-                + (task.get("max_estimated_hours", 0) or 0)
-                for task in tasks_list
-            )
-            / 2
-        )
-        avg_completion = sum(
-            task.get("completion_percentage", 0) or 0 for task in tasks_list
-        ) / len(tasks_list)
-
-        status_count = {}
-        for task in tasks_list:
-            status = task.get("status", "unknown")
-            status_count[status] = status_count.get(status, 0) + 1
-
-        summary_stats = {
-            "total_found": len(tasks_list),
-            "total_estimated_hours": round(total_estimated_hours, 2),
-            "average_completion": round(avg_completion, 1),
-            "status_breakdown": status_count,
-        }
-    else:
-        summary_stats = {
-            "total_found": 0,
-            "total_estimated_hours": 0,
-            "average_completion": 0,
-            "status_breakdown": {},
-        }
-
-    # Generate smart message
-    if task_id:
-        if tasks_list:
-            message = f"✅ Task with ID '{task_id}' found successfully"
-        else:
-            message = f"❌ No task found with ID '{task_id}'"
-    elif (
-        len(
-            [
-                p
-                for p in [
-                    assigned_to,
-                    created_by,
-                    priority,
-                    status,
-                    start_date,
-                    due_date,
-                ]
-                if p is not None
-            ]
-        )
-        > 0
-    ):
-        message = f"✅ Found {len(tasks_list)} task(s) matching search criteria"
-    else:
-        message = f"✅ Retrieved {len(tasks_list)} task(s) (simple listing)"
-
-    result = {
-        "success": True,
-        "message": message,
-        "summary": summary_stats,
-        "query_params": used_params,
-        "tasks": tasks_list,
-    }
-
-    return json.dumps(result, indent=2, ensure_ascii=False)
+        close_cursor(db, cursor)
+        release_db_connection(db)
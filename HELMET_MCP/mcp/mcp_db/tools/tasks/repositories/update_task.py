@@ -1,4 +1,4 @@
-from mcp_init import mcp, get_db_connection
+from mcp_init import mcp, get_db_connection, release_db_connection
 from typing import Optional, List, Union
 import json
 from datetime import datetime
@@ -7,7 +7,7 @@ import sys
 import os
 
 sys.path.append(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
-from backend_notifier import notify_db_update
+from backend_notifier import publish_change, serialize_change_row
 
 
 @mcp.tool()
@@ -140,8 +140,9 @@ def update_task(
     if not db:
         return "❌ Database connection failed"
 
-    cursor = db.cursor(buffered=True)
+    cursor = None
     try:
+        cursor = db.cursor(buffered=True)
         cursor.execute("SELECT id FROM tasks WHERE id = %s", (task_id,))
         if not cursor.fetchone():
             return f"❌ Error: Task with ID {task_id} does not exist."
@@ -190,6 +191,11 @@ def update_task(
         if assigned_workers is not None:
             if not isinstance(assigned_workers, list):
                 return "❌ Error: Assigned workers must be a list."
+            # Stored as integers: indexed by the multi-valued index idx_assigned_workers
+            try:
+                assigned_workers = [int(worker_id) for worker_id in assigned_workers]
+            except (TypeError, ValueError):
+                return "❌ Error: Assigned workers must be a list of user IDs."
             update_fields.append("assigned_workers = %s")
             update_values.append(json.dumps(assigned_workers))
 
@@ -397,6 +403,11 @@ def update_task(
             cursor.execute(update_query, update_values)
             db.commit()
 
+            # Graphe de dépendances : reconstruit à la prochaine lecture
+            from ...scheduling.dependencies import invalidate_dependency_graph
+
+            invalidate_dependency_graph()
+
             # 🔄 Synchronisation automatique des vecteurs
             try:
                 from ...vector_sync import auto_sync_task_vector
@@ -459,7 +470,18 @@ def update_task(
 
                 # Notify backend about task update
                 try:
-                    notify_db_update("task")
+                    changed_fields = [
+                        field.split(" = ")[0]
+                        for field in update_fields
+                        if not field.startswith("updated_at")
+                    ]
+                    publish_change(
+                        "task",
+                        task_id,
+                        "update",
+                        changed_fields,
+                        serialize_change_row(columns, result),
+                    )
                 except Exception as notify_error:
                     print(f"Warning: Backend notification failed: {notify_error}")
 
@@ -480,4 +502,6 @@ def update_task(
         db.rollback()
         return f"❌ Database error: {str(e)}"
     finally:
-        cursor.close()
+        if cursor is not None:
+            cursor.close()
+        release_db_connection(db)
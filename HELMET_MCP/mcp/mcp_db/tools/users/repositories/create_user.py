@@ -1,4 +1,4 @@
-from mcp_init import mcp, get_db_connection
+from mcp_init import mcp, get_db_connection, release_db_connection
 from typing import Optional, List
 import json
 from datetime import datetime, date
@@ -157,8 +157,9 @@ def create_user(
     if not db:
         return "❌ Database connection failed"
 
-    cursor = db.cursor(buffered=True)
+    cursor = None
     try:
+        cursor = db.cursor(buffered=True)
         cursor.execute("SELECT id FROM users WHERE email = %s", (email,))
         if cursor.fetchone():
             return f"❌ Error: A user with email '{email}' already exists."
@@ -290,4 +291,6 @@ def create_user(
         db.rollback()
         return f"❌ Database error: {str(e)}"
     finally:
-        cursor.close()
+        if cursor is not None:
+            cursor.close()
+        release_db_connection(db)
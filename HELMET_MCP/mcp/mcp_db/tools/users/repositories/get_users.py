@@ -9,11 +9,57 @@ Author: Assistant
 Date: 2025-09-06
 """
 
-from mcp_init import mcp, get_db_connection
-from typing import Optional
+from mcp_init import mcp, get_db_connection, release_db_connection
+from typing import Optional, List, Sequence, Any, Dict
 import json
-from datetime import datetime, date
-from decimal import Decimal
+
+from result_stream import (
+    OUTPUT_FORMATS,
+    serialize_row,
+    json_columns,
+    iter_rows,
+    close_cursor,
+    validate_fields,
+    encode_result,
+)
+
+# Columns returned for each user (allowed values of `fields`)
+USER_FIELDS = [
+    "id",
+    "first_name",
+    "last_name",
+    "email",
+    "phone",
+    "address",
+    "role",
+    "role_description",
+    "is_active",
+    "hire_date",
+    "primary_skills",
+    "secondary_skills",
+    "trade_categories",
+    "experience_years",
+    "skill_levels",
+    "work_preferences",
+    "equipment_mastery",
+    "project_experience",
+    "certifications",
+    "safety_training",
+    "last_training_date",
+    "created_at",
+    "updated_at",
+]
+
+# Fields kept by format="ids"
+ID_FIELDS = ["id", "first_name", "last_name", "role"]
+
+
+def _serialize_user(columns: Sequence[str], row: Sequence[Any]) -> Dict[str, Any]:
+    user = serialize_row(columns, row)
+    # Handle boolean values (MySQL returns 0/1)
+    if isinstance(user.get("is_active"), int):
+        user["is_active"] = bool(user["is_active"])
+    return user
 
 
 @mcp.tool()
@@ -35,6 +81,8 @@ def get_users(
     has_safety_training: Optional[str] = None,
     limit: Optional[int] = 50,
     offset: Optional[int] = 0,
+    format: Optional[str] = "full",
+    fields: Optional[List[str]] = None,
 ) -> str:
     """
     🔍 ADVANCED USER SEARCH TOOL - Get, List, Search & Filter Users with Skills
@@ -76,6 +124,14 @@ def get_users(
     limit : int - Max results (1-1000, default: 50)
     offset : int - Skip records for pagination (default: 0)
 
+    📦 OUTPUT:
+    format : str - "full" (default, pretty-printed), "stream" (same content,
+                   compact JSON written row by row - use for large limits),
+                   "ids" (only id, first_name, last_name and role, compact JSON) or
+                   "compact" (columnar: {"columns": [...], "rows": [[...]]},
+                   null columns dropped, no message/query_params - cheapest)
+    fields : list - Only return these user fields (e.g. ["id", "first_name", "primary_skills"])
+
     💡 USAGE EXAMPLES (Copy & Use!):
     ===============================
 
@@ -110,6 +166,11 @@ def get_users(
     get_users(role="worker", trade_category="electricity", min_experience_years=5.0)
     get_users(has_certification="electrical_permit", is_active=True, limit=10)
 
+    # 📦 LARGE LISTINGS:
+    get_users(limit=1000, format="stream")  # Everyone, compact
+    get_users(role="worker", limit=1000, format="ids")  # Just ids, names and roles
+    get_users(role="worker", format="compact", fields=["id", "first_name", "primary_skills"])
+
 
     RETURN FORMAT:
     =============
@@ -201,6 +262,27 @@ def get_users(
             indent=2,
         )
 
+    if format not in OUTPUT_FORMATS:
+        return json.dumps(
+            {
+                "success": False,
+                "error": "Invalid format",
+                "message": f"Format must be one of {OUTPUT_FORMATS}. Received: '{format}'",
+            },
+            indent=2,
+        )
+
+    fields_error = validate_fields(fields, USER_FIELDS)
+    if fields_error:
+        return json.dumps(
+            {
+                "success": False,
+                "error": "Invalid fields",
+                "message": fields_error,
+            },
+            indent=2,
+        )
+
     # Role validation
     if role:
         valid_roles = ["worker", "team_leader", "supervisor", "site_manager"]
@@ -268,13 +350,14 @@ def get_users(
         params.append(hire_date)
 
     # Skills & Experience filters
+    # (MEMBER OF uses the multi-valued indexes on the JSON arrays)
     if primary_skill:
-        conditions.append("JSON_CONTAINS(primary_skills, %s)")
-        params.append(f'"{primary_skill}"')
+        conditions.append("%s MEMBER OF (primary_skills)")
+        params.append(primary_skill)
 
     if trade_category:
-        conditions.append("JSON_CONTAINS(trade_categories, %s)")
-        params.append(f'"{trade_category}"')
+        conditions.append("%s MEMBER OF (trade_categories)")
+        params.append(trade_category)
 
     if min_experience_years is not None:
         conditions.append("experience_years >= %s")
@@ -286,12 +369,12 @@ def get_users(
 
     # Certifications & Training filters
     if has_certification:
-        conditions.append("JSON_CONTAINS(certifications, %s)")
-        params.append(f'"{has_certification}"')
+        conditions.append("%s MEMBER OF (certifications)")
+        params.append(has_certification)
 
     if has_safety_training:
-        conditions.append("JSON_CONTAINS(safety_training, %s)")
-        params.append(f'"{has_safety_training}"')
+        conditions.append("%s MEMBER OF (safety_training)")
+        params.append(has_safety_training)
 
     # Build WHERE clause
     where_clause = " AND ".join(conditions) if conditions else "1=1"
@@ -367,35 +450,67 @@ def get_users(
             indent=2,
         )
 
-    cursor = db.cursor(buffered=True)
+    # Build response with used parameters
+    used_params = {
+        k: v
+        for k, v in {
+            "user_id": user_id,
+            "first_name": first_name,
+            "last_name": last_name,
+            "email": email,
+            "phone": phone,
+            "role": role,
+            "address": address,
+            "is_active": is_active,
+            "limit": limit or 50,
+            "offset": offset or 0,
+        }.items()
+        if v is not None
+    }
+
+    # Generate smart message
+    def build_message(count: int) -> str:
+        if user_id:
+            if count:
+                return f"✅ User with ID '{user_id}' found successfully"
+            return f"❌ No user found with ID '{user_id}'"
+        if any(
+            p is not None
+            for p in [first_name, last_name, email, phone, role, address, is_active]
+        ):
+            return f"✅ Found {count} user(s) matching search criteria"
+        return f"✅ Retrieved {count} user(s) (simple listing)"
+
+    cursor = None
+    returned = 0
 
     try:
+        # Unbuffered cursor: rows are fetched in batches while they are serialised
+        cursor = db.cursor(buffered=False)
         cursor.execute(query, params)
         columns = [desc[0] for desc in cursor.description]
-        results = cursor.fetchall()
-
-        # Process results
-        users_list = []
-        for row in results:
-            user_dict = {}
-            for i, value in enumerate(row):
-                column_name = columns[i]
-
-                # Handle datetime and date serialization
-                if isinstance(value, datetime):
-                    user_dict[column_name] = value.isoformat()
-                elif isinstance(value, date):
-                    user_dict[column_name] = value.isoformat()
-                # Handle Decimal serialization
-                elif isinstance(value, Decimal):
-                    user_dict[column_name] = float(value)
-                # Handle boolean values (MySQL returns 0/1)
-                elif column_name == "is_active" and isinstance(value, int):
-                    user_dict[column_name] = bool(value)
-                else:
-                    user_dict[column_name] = value
-
-            users_list.append(user_dict)
+
+        def users():
+            nonlocal returned
+            for row in iter_rows(cursor):
+                user = _serialize_user(columns, row)
+                returned += 1
+                yield user
+
+        # Count and message are built once the rows have been consumed
+        return encode_result(
+            "get_users",
+            format,
+            "users",
+            users(),
+            lambda: {
+                "message": build_message(returned),
+                "total_returned": returned,
+                "query_params": used_params,
+            },
+            fields=ID_FIELDS if format == "ids" else fields,
+            json_fields=json_columns(cursor),
+        )
 
     except Exception as e:
         return json.dumps(
@@ -421,60 +536,5 @@ def get_users(
         )
 
     finally:
-        cursor.close()
-
-    # Build response with used parameters
-    used_params = {
-        k: v
-        for k, v in {
-            "user_id": user_id,
-            "first_name": first_name,
-            "last_name": last_name,
-            "email": email,
-            "phone": phone,
-            "role": role,
-            "address": address,
-            "is_active": is_active,
-            "limit": limit or 50,
-            "offset": offset or 0,
-        }.items()
-        if v is not None
-    }
-
-    # Generate smart message
-    if user_id:
-        if users_list:
-            message = f"✅ User with ID '{user_id}' found successfully"
-        else:
-            message = f"❌ No user found with ID '{user_id}'"
-    elif (
-        len(
-            [
-                p
-                for p in [
-                    first_name,
-                    last_name,
-                    email,
-                    phone,
-                    role,
-                    address,
-                    is_active,
-                ]
-                if p is not None
-            ]
-        )
-        > 0
-    ):
-        message = f"✅ Found {len(users_list)} user(s) matching search criteria"
-    else:
-        message = f"✅ Retrieved {len(users_list)} user(s) (simple listing)"
-
-    result = {
-        "success": True,
-        "message": message,
-        "total_returned": len(users_list),
-        "query_params": used_params,
-        "users": users_list,
-    }
-
-    return json.dumps(result, indent=2, ensure_ascii=False)
+        close_cursor(db, cursor)
+        release_db_connection(db)
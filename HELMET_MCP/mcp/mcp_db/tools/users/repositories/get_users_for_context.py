@@ -9,11 +9,33 @@ Author: Assistant
 Date: 2025-09-08
 """
 
-from mcp_init import mcp, get_db_connection
-from typing import Optional
+from mcp_init import mcp, get_db_connection, release_db_connection
+from typing import Optional, List
 import json
-from datetime import datetime, date
-from decimal import Decimal
+
+from result_stream import (
+    OUTPUT_FORMATS,
+    serialize_row,
+    json_columns,
+    iter_rows,
+    close_cursor,
+    validate_fields,
+    encode_result,
+)
+
+# Columns returned for each user (allowed values of `fields`)
+CONTEXT_FIELDS = [
+    "id",
+    "first_name",
+    "last_name",
+    "role",
+    "role_description",
+    "trade_categories",
+    "primary_skills",
+]
+
+# Fields kept by format="ids"
+ID_FIELDS = ["id", "first_name", "last_name", "role"]
 
 
 @mcp.tool()
@@ -24,6 +46,8 @@ def get_users_for_context(
     is_active: Optional[bool] = None,
     limit: Optional[int] = 50,
     offset: Optional[int] = 0,
+    format: Optional[str] = "full",
+    fields: Optional[List[str]] = None,
 ) -> str:
     """
     LIGHTWEIGHT USER CONTEXT TOOL - Get Essential User Information
@@ -42,6 +66,13 @@ def get_users_for_context(
     limit : int - Max results (1-1000, default: 50)
     offset : int - Skip records for pagination (default: 0)
 
+    OUTPUT:
+    format : str - "full" (default, pretty-printed), "stream" (compact JSON written
+                   row by row), "ids" (id, names and role) or "compact" (columnar:
+                   {"columns": [...], "rows": [[...]]}, null columns dropped,
+                   no message/query_params - cheapest for agents)
+    fields : list - Only return these fields (e.g. ["id", "first_name", "primary_skills"])
+
     RETURN FORMAT:
     JSON object with essential user information:
     {
@@ -106,6 +137,27 @@ def get_users_for_context(
             indent=2,
         )
 
+    if format not in OUTPUT_FORMATS:
+        return json.dumps(
+            {
+                "success": False,
+                "error": "Invalid format",
+                "message": f"Format must be one of {OUTPUT_FORMATS}. Received: '{format}'",
+            },
+            indent=2,
+        )
+
+    fields_error = validate_fields(fields, CONTEXT_FIELDS)
+    if fields_error:
+        return json.dumps(
+            {
+                "success": False,
+                "error": "Invalid fields",
+                "message": fields_error,
+            },
+            indent=2,
+        )
+
     # Build query based on parameters
     conditions = []
     params = []
@@ -184,32 +236,61 @@ def get_users_for_context(
             indent=2,
         )
 
-    cursor = db.cursor(buffered=True)
+    # Build response with used parameters
+    used_params = {
+        k: v
+        for k, v in {
+            "user_id": user_id,
+            "first_name": first_name,
+            "last_name": last_name,
+            "role": None,
+            "is_active": is_active,
+            "primary_skill": None,
+            "trade_category": None,
+            "limit": limit or 50,
+            "offset": offset or 0,
+        }.items()
+        if v is not None
+    }
+
+    # Generate smart message
+    def build_message(count: int) -> str:
+        if user_id:
+            if count:
+                return f" User context for ID '{user_id}' found successfully"
+            return f"L No user found with ID '{user_id}'"
+        if any(p is not None for p in [first_name, last_name, is_active]):
+            return f" Found {count} user(s) context matching search criteria"
+        return f" Retrieved {count} user(s) context (simple listing)"
+
+    cursor = None
+    returned = 0
 
     try:
+        # Unbuffered cursor: rows are fetched in batches while they are serialised
+        cursor = db.cursor(buffered=False)
         cursor.execute(query, params)
         columns = [desc[0] for desc in cursor.description]
-        results = cursor.fetchall()
-
-        # Process results
-        users_list = []
-        for row in results:
-            user_dict = {}
-            for i, value in enumerate(row):
-                column_name = columns[i]
-
-                # Handle datetime and date serialization
-                if isinstance(value, datetime):
-                    user_dict[column_name] = value.isoformat()
-                elif isinstance(value, date):
-                    user_dict[column_name] = value.isoformat()
-                # Handle Decimal serialization
-                elif isinstance(value, Decimal):
-                    user_dict[column_name] = float(value)
-                else:
-                    user_dict[column_name] = value
-
-            users_list.append(user_dict)
+
+        def users():
+            nonlocal returned
+            for row in iter_rows(cursor):
+                returned += 1
+                yield serialize_row(columns, row)
+
+        return encode_result(
+            "get_users_for_context",
+            format,
+            "users",
+            users(),
+            lambda: {
+                "message": build_message(returned),
+                "total_returned": returned,
+                "query_params": used_params,
+            },
+            fields=ID_FIELDS if format == "ids" else fields,
+            json_fields=json_columns(cursor),
+        )
 
     except Exception as e:
         return json.dumps(
@@ -234,55 +315,5 @@ def get_users_for_context(
         )
 
     finally:
-        cursor.close()
-
-    # Build response with used parameters
-    used_params = {
-        k: v
-        for k, v in {
-            "user_id": user_id,
-            "first_name": first_name,
-            "last_name": last_name,
-            "role": None,
-            "is_active": is_active,
-            "primary_skill": None,
-            "trade_category": None,
-            "limit": limit or 50,
-            "offset": offset or 0,
-        }.items()
-        if v is not None
-    }
-
-    # Generate smart message
-    if user_id:
-        if users_list:
-            message = f" User context for ID '{user_id}' found successfully"
-        else:
-            message = f"L No user found with ID '{user_id}'"
-    elif (
-        len(
-            [
-                p
-                for p in [
-                    first_name,
-                    last_name,
-                    is_active,
-                ]
-                if p is not None
-            ]
-        )
-        > 0
-    ):
-        message = f" Found {len(users_list)} user(s) context matching search criteria"
-    else:
-        message = f" Retrieved {len(users_list)} user(s) context (simple listing)"
-
-    result = {
-        "success": True,
-        "message": message,
-        "total_returned": len(users_list),
-        "query_params": used_params,
-        "users": users_list,
-    }
-
-    return json.dumps(result, indent=2, ensure_ascii=False)
+        close_cursor(db, cursor)
+        release_db_connection(db)
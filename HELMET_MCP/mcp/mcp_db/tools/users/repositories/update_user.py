@@ -1,4 +1,4 @@
-from mcp_init import mcp, get_db_connection
+from mcp_init import mcp, get_db_connection, release_db_connection
 from typing import Optional, List
 import json
 from datetime import datetime, date
@@ -143,8 +143,9 @@ def update_user(
     if not db:
         return "❌ Database connection failed"
 
-    cursor = db.cursor(buffered=True)
+    cursor = None
     try:
+        cursor = db.cursor(buffered=True)
         cursor.execute("SELECT id FROM users WHERE id = %s", (user_id,))
         if not cursor.fetchone():
             return f"❌ Error: User with ID '{user_id}' does not exist."
@@ -346,4 +347,6 @@ def update_user(
         db.rollback()
         return f"❌ Erreur base de données: {str(e)}"
     finally:
-        cursor.close()
+        if cursor is not None:
+            cursor.close()
+        release_db_connection(db)
@@ -2,22 +2,61 @@
 Utilitaires pour synchroniser automatiquement les vecteurs avec les données
 """
 
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, List, Tuple
+import os
 import json
-from .embedding.vector import TiDBVectorManager
+import time
+import queue
+import atexit
+import threading
+from .embedding.vector import TiDBVectorManager, get_vector_manager
+
+from metrics import increment, record_timing
 
 
 class VectorSync:
-    """Gestionnaire de synchronisation des vecteurs"""
+    """
+    Gestionnaire de synchronisation des vecteurs
+
+    Les outils d'écriture mettent les changements en file (enqueue) et rendent la main
+    immédiatement ; un thread de fond les regroupe, encode les textes par lots et écrit
+    tous les vecteurs d'un lot en une seule requête.
+    """
     
-    def __init__(self):
+    def __init__(
+        self,
+        batch_size: int = 32,
+        batch_window: float = 0.5,
+        max_queue_size: int = 10000,
+        max_retries: int = 3,
+        retry_backoff: float = 1.0,
+    ):
         self._vector_manager = None
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+
+        # Éléments : (entité, id, données, action, instant de mise en file, tentatives,
+        # pas avant cet instant)
+        self._queue: "queue.Queue[Tuple[str, int, Dict[str, Any], str, float, int, float]]" = queue.Queue(
+            maxsize=max_queue_size
+        )
+        # Nouvelles tentatives sorties de la file mais pas encore dues (worker uniquement)
+        self._deferred: List[Tuple[str, int, Dict[str, Any], str, float, int, float]] = []
+        # Dernière mise en file de chaque ligne en attente : une nouvelle tentative ne doit
+        # pas écraser un changement plus récent. La clé disparaît une fois ce changement
+        # synchronisé ou abandonné.
+        self._last_enqueued: Dict[Tuple[str, int], float] = {}
+        self._last_enqueued_lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+        self._worker_lock = threading.Lock()
     
     @property
     def vector_manager(self) -> TiDBVectorManager:
-        """Initialise le gestionnaire de vecteur de manière lazy"""
+        """Initialise le gestionnaire de vecteur de manière lazy (instance partagée)"""
         if self._vector_manager is None:
-            self._vector_manager = TiDBVectorManager()
+            self._vector_manager = get_vector_manager()
         return self._vector_manager
     
     def sync_task_vector(self, task_id: int, task_data: Dict[str, Any], action: str = "update") -> bool:
@@ -34,8 +73,8 @@ class VectorSync:
         """
         try:
             if action == "delete":
-                # TODO: Implémenter la suppression de vecteur
-                print(f"⚠️  Suppression vecteur tâche {task_id} non implémentée")
+                deleted = self.vector_manager.delete_task_vectors([task_id])
+                print(f"🗑️  Vecteur tâche {task_id} supprimé ({deleted} ligne(s))")
                 return True
             
             elif action in ["create", "update"]:
@@ -64,8 +103,8 @@ class VectorSync:
         """
         try:
             if action == "delete":
-                # TODO: Implémenter la suppression de vecteur
-                print(f"⚠️  Suppression vecteur utilisateur {user_id} non implémentée")
+                deleted = self.vector_manager.delete_user_vectors([user_id])
+                print(f"🗑️  Vecteur utilisateur {user_id} supprimé ({deleted} ligne(s))")
                 return True
             
             elif action in ["create", "update"]:
@@ -80,18 +119,229 @@ class VectorSync:
         
         return False
 
+    # ------------------------------------------------------------------
+    # Synchronisation asynchrone (file + worker)
+    # ------------------------------------------------------------------
+
+    def _ensure_worker(self) -> None:
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._worker_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(
+                    target=self._run, name="vector-sync", daemon=True
+                )
+                self._worker.start()
+
+    def enqueue(self, entity: str, entity_id: int, data: Dict[str, Any], action: str = "update") -> bool:
+        """
+        Met un changement en file pour synchronisation en arrière-plan
+
+        Args:
+            entity: "task" ou "user"
+            entity_id: ID de la ligne
+            data: Données de la ligne
+            action: "create", "update", "delete"
+
+        Returns:
+            bool: False si la file est pleine (changement ignoré)
+        """
+        self._ensure_worker()
+        enqueued_at = time.monotonic()
+        try:
+            with self._last_enqueued_lock:
+                self._queue.put_nowait((entity, entity_id, data, action, enqueued_at, 0, 0.0))
+                self._last_enqueued[(entity, entity_id)] = enqueued_at
+            increment("vector_sync.enqueued")
+            return True
+        except queue.Full:
+            increment("vector_sync.overflow")
+            print(f"⚠️  File de synchronisation vectorielle pleine, {entity} {entity_id} ignoré")
+            return False
+
+    def _take_due_deferred(self) -> List[Tuple[str, int, Dict[str, Any], str, float, int, float]]:
+        """Retire les nouvelles tentatives arrivées à échéance (au plus batch_size)"""
+        now = time.monotonic()
+        due = [item for item in self._deferred if item[6] <= now][: self.batch_size]
+        if due:
+            taken = {id(item) for item in due}
+            self._deferred = [item for item in self._deferred if id(item) not in taken]
+        return due
+
+    def _collect_batch(self) -> List[Tuple[str, int, Dict[str, Any], str, float, int, float]]:
+        """
+        Attend un changement dû puis regroupe les suivants pendant `batch_window` secondes.
+        Les nouvelles tentatives pas encore dues sont mises de côté sans bloquer les autres
+        changements (elles restent comptées dans la file jusqu'à leur traitement).
+        """
+        items = self._take_due_deferred()
+        while not items:
+            timeout = None
+            if self._deferred:
+                timeout = max(0.0, min(item[6] for item in self._deferred) - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                items = self._take_due_deferred()
+                continue
+            if item[6] > time.monotonic():
+                self._deferred.append(item)
+            else:
+                items.append(item)
+
+        deadline = time.monotonic() + self.batch_window
+        while len(items) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item[6] > time.monotonic():
+                self._deferred.append(item)
+            else:
+                items.append(item)
+
+        return items
+
+    def _forget(self, entity: str, entity_id: int, enqueued_at: float) -> None:
+        """Oublie la ligne si ce changement était son dernier en file"""
+        with self._last_enqueued_lock:
+            if self._last_enqueued.get((entity, entity_id)) == enqueued_at:
+                del self._last_enqueued[(entity, entity_id)]
+
+    def _retry(self, entity: str, changes: List[Tuple[int, Dict[str, Any], str, float, int]]) -> None:
+        """
+        Remet en file les changements d'un lot en échec (au plus max_retries fois), à
+        traiter après un délai exponentiel pour laisser une panne passagère se résorber
+        """
+        for entity_id, data, action, enqueued_at, attempt in changes:
+            if self._last_enqueued.get((entity, entity_id), enqueued_at) > enqueued_at:
+                continue  # Un changement plus récent de la ligne est déjà en file
+            if attempt >= self.max_retries:
+                increment("vector_sync.dropped")
+                print(f"❌ Vecteur {entity} {entity_id} abandonné après {attempt + 1} tentative(s)")
+                self._forget(entity, entity_id, enqueued_at)
+                continue
+            not_before = time.monotonic() + min(self.retry_backoff * 2 ** attempt, 30.0)
+            try:
+                self._queue.put_nowait(
+                    (entity, entity_id, data, action, enqueued_at, attempt + 1, not_before)
+                )
+                increment("vector_sync.retried")
+            except queue.Full:
+                increment("vector_sync.overflow")
+                print(f"⚠️  File de synchronisation vectorielle pleine, {entity} {entity_id} ignoré")
+                self._forget(entity, entity_id, enqueued_at)
+
+    def _process_batch(self, items: List[Tuple[str, int, Dict[str, Any], str, float, int, float]]) -> None:
+        # Seul le dernier changement de chaque ligne compte (une nouvelle tentative
+        # garde son instant de mise en file d'origine)
+        latest: Dict[Tuple[str, int], Tuple[Dict[str, Any], str, float, int]] = {}
+        for entity, entity_id, data, action, enqueued_at, attempt, _ in items:
+            key = (entity, entity_id)
+            if key not in latest or enqueued_at >= latest[key][2]:
+                latest[key] = (data, action, enqueued_at, attempt)
+
+        writers = {
+            "task": (self.vector_manager.upsert_task_vectors, self.vector_manager.delete_task_vectors),
+            "user": (self.vector_manager.upsert_user_vectors, self.vector_manager.delete_user_vectors),
+        }
+
+        for entity, (upsert, delete) in writers.items():
+            upserts = [
+                (entity_id, *change)
+                for (kind, entity_id), change in latest.items()
+                if kind == entity and change[1] in ["create", "update"]
+            ]
+            deletes = [
+                (entity_id, *change)
+                for (kind, entity_id), change in latest.items()
+                if kind == entity and change[1] == "delete"
+            ]
+            rows = [(entity_id, data) for entity_id, data, *_ in upserts]
+            deleted_ids = [entity_id for entity_id, *_ in deletes]
+
+            if rows:
+                try:
+                    start = time.perf_counter()
+                    upsert(rows, batch_size=self.batch_size)
+                    record_timing(f"vector_sync.{entity}_batch", time.perf_counter() - start)
+                    increment("vector_sync.synced", len(rows))
+                    print(f"✅ {len(rows)} vecteur(s) {entity} synchronisé(s)")
+                    for entity_id, _, _, enqueued_at, _ in upserts:
+                        self._forget(entity, entity_id, enqueued_at)
+                except Exception as e:
+                    increment("vector_sync.failed", len(rows))
+                    print(f"❌ Erreur synchronisation vecteurs {entity}: {e}")
+                    self._retry(entity, upserts)
+
+            if deleted_ids:
+                try:
+                    delete(deleted_ids)
+                    increment("vector_sync.deleted", len(deleted_ids))
+                    print(f"🗑️  {len(deleted_ids)} vecteur(s) {entity} supprimé(s)")
+                    for entity_id, _, _, enqueued_at, _ in deletes:
+                        self._forget(entity, entity_id, enqueued_at)
+                except Exception as e:
+                    increment("vector_sync.failed", len(deleted_ids))
+                    print(f"❌ Erreur suppression vecteurs {entity}: {e}")
+                    self._retry(entity, deletes)
+
+    def _run(self) -> None:
+        while True:
+            items = self._collect_batch()
+            try:
+                self._process_batch(items)
+            except Exception as e:
+                print(f"❌ Erreur worker synchronisation vectorielle: {e}")
+            finally:
+                now = time.monotonic()
+                for item in items:
+                    # Délai entre l'écriture en base et la disponibilité du vecteur
+                    record_timing("vector_sync.lag", now - item[4])
+                    self._queue.task_done()
+
+    def compact(self) -> Dict[str, int]:
+        """Supprime les vecteurs orphelins (tâches/utilisateurs supprimés)"""
+        self.flush()
+        return self.vector_manager.compact()
+
+    def pending(self) -> int:
+        """Nombre de changements pas encore synchronisés"""
+        return self._queue.unfinished_tasks
+
+    def flush(self, timeout: float = 30.0) -> bool:
+        """Attend que tous les changements en file soient synchronisés (True si vidée)"""
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if time.monotonic() > deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def stats(self) -> Dict[str, int]:
+        return {"pending": self.pending(), "max_queue_size": self._queue.maxsize}
+
 
 # Instance globale du synchroniseur
-vector_sync = VectorSync()
+vector_sync = VectorSync(
+    batch_size=int(os.getenv("VECTOR_SYNC_BATCH_SIZE", 32)),
+    batch_window=float(os.getenv("VECTOR_SYNC_BATCH_WINDOW_MS", 500)) / 1000,
+    max_queue_size=int(os.getenv("VECTOR_SYNC_QUEUE_SIZE", 10000)),
+    max_retries=int(os.getenv("VECTOR_SYNC_MAX_RETRIES", 3)),
+)
+atexit.register(vector_sync.flush, 10.0)
 
 
 def auto_sync_task_vector(task_id: int, task_data: Dict[str, Any], action: str = "update") -> None:
     """
     Fonction helper pour synchroniser automatiquement un vecteur de tâche
-    Utilisée dans les outils MCP create_task et update_task
+    Utilisée dans les outils MCP create_task et update_task (mise en file, non bloquante)
     """
     try:
-        vector_sync.sync_task_vector(task_id, task_data, action)
+        vector_sync.enqueue("task", task_id, task_data, action)
     except Exception as e:
         # Ne pas faire échouer l'opération principale si la sync vectorielle échoue
         print(f"⚠️  Synchronisation vectorielle échouée pour tâche {task_id}: {e}")
@@ -100,10 +350,10 @@ def auto_sync_task_vector(task_id: int, task_data: Dict[str, Any], action: str =
 def auto_sync_user_vector(user_id: int, user_data: Dict[str, Any], action: str = "update") -> None:
     """
     Fonction helper pour synchroniser automatiquement un vecteur d'utilisateur
-    Utilisée dans les outils MCP create_user et update_user
+    Utilisée dans les outils MCP create_user et update_user (mise en file, non bloquante)
     """
     try:
-        vector_sync.sync_user_vector(user_id, user_data, action)
+        vector_sync.enqueue("user", user_id, user_data, action)
     except Exception as e:
         # Ne pas faire échouer l'opération principale si la sync vectorielle échoue
         print(f"⚠️  Synchronisation vectorielle échouée pour utilisateur {user_id}: {e}")
\ No newline at end of file